@@ -1,6 +1,6 @@
 # backend/api/admin.py
 from django.contrib import admin
-from .models import College, Department, Course, Issue
+from .models import College, Department, Course, Issue, IssueAgingStat, IssueEvent, Job
 
 @admin.register(College)
 class CollegeAdmin(admin.ModelAdmin):
@@ -104,3 +104,56 @@ class IssueAdmin(admin.ModelAdmin):
     list_filter = ('status', 'issue_type', 'course')
     search_fields = ('title', 'description', 'student__username', 'course__course_code')
     date_hierarchy = 'created_at'
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'attempts', 'run_after', 'updated_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(IssueEvent)
+class IssueEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'issue_id', 'kind', 'from_status', 'to_status', 'assigned_to_id', 'created_at')
+    list_filter = ('kind', 'to_status')
+    # Append-only: a big table with no useful sort but the primary key
+    ordering = ('-id',)
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(IssueAgingStat)
+class IssueAgingStatAdmin(admin.ModelAdmin):
+    """
+    The aging report's counters, kept by `manage.py refresh_aging`.
+    """
+    list_display = ('course', 'get_department_name', 'status', 'bucket', 'count')
+    list_filter = ('bucket', 'status', 'course__department')
+    list_select_related = ('course__department',)
+    ordering = ('course__department__department_name', 'course__course_name', 'status', 'bucket')
+
+    def get_department_name(self, obj):
+        return obj.course.department.department_name
+
+    get_department_name.admin_order_field = "course__department__department_name"
+    get_department_name.short_description = "Department"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(count__gt=0)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
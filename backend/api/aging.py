@@ -0,0 +1,171 @@
+"""
+The aging report: unsolved issues per course and status, counted by how
+long they have been open (under 7 days, 7 to 14, 14 to 30, over 30).
+
+refresh() brings IssueAgingStat up to date without reading the issue table
+as a whole. It follows a watermark on Issue.updated_at (a RollupMark) and
+only reads the issues changed since, comparing each with its OpenIssue row:
+the issue as last counted. Issues age with no change to their row, so it
+also moves the OpenIssue rows whose age crossed an edge since the last
+refresh, a range read on their created_at. Deleted issues are dropped as
+they go (forget(), from api.signals). Reports read the counters only, a
+table bounded by courses x statuses x buckets.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import Course, Department, Issue, IssueAgingStat, OpenIssue, RollupMark
+from .stats import adjust_counter
+
+ROLLUP = 'issue_aging'
+# Bucket b holds issues open for at least EDGES[b - 1] and less than EDGES[b]
+EDGES = (timedelta(days=7), timedelta(days=14), timedelta(days=30))
+OPEN_STATUSES = ('Pending', 'InProgress')
+# A save stamps updated_at before it commits, so a slow transaction can
+# commit behind the watermark. Refreshes re-read this far back; an issue
+# that matches its OpenIssue row is left alone, so reading it twice is harmless.
+OVERLAP = timedelta(minutes=5)
+
+
+def bucket_for(created_at, now):
+    age = now - created_at
+    return sum(age >= edge for edge in EDGES)
+
+
+def _count(deltas, counted, now, sign):
+    course_id, status, created_at = counted
+    deltas[course_id, status, bucket_for(created_at, now)] += sign
+
+
+def refresh(now=None, batch_size=2_000):
+    """
+    Bring the aging counters up to `now`. Concurrent runs are safe: one only
+    commits if the watermark hasn't moved since it was read. Returns the
+    number of changed issues read and of issues moved to an older bucket,
+    or None if another run got there first.
+    """
+    now = now or timezone.now()
+    RollupMark.objects.get_or_create(name=ROLLUP)
+    with transaction.atomic():
+        since = RollupMark.objects.values_list('last_at', flat=True).get(name=ROLLUP)
+        deltas = Counter()
+
+        aged = 0
+        if since is not None:
+            # Issues counted at `since` that are past an edge by `now`; one
+            # crossing several edges moves one bucket per edge
+            for bucket, edge in enumerate(EDGES):
+                crossed = (
+                    OpenIssue.objects.filter(created_at__gt=since - edge, created_at__lte=now - edge)
+                    .values_list('course_id', 'status').annotate(n=Count('pk')).order_by()
+                )
+                for course_id, status, count in crossed:
+                    deltas[course_id, status, bucket] -= count
+                    deltas[course_id, status, bucket + 1] += count
+                    aged += count
+            changed = Issue.objects.filter(updated_at__gte=since - OVERLAP)
+        else:
+            # First run: only open issues count
+            changed = Issue.objects.filter(status__in=OPEN_STATUSES)
+
+        rows = changed.values_list('pk', 'course_id', 'status', 'created_at').order_by().iterator(batch_size)
+        read = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                _apply(batch, deltas, now)
+                read += len(batch)
+                batch = []
+        _apply(batch, deltas, now)
+        read += len(batch)
+
+        for (course_id, status, bucket), count in deltas.items():
+            adjust_counter(IssueAgingStat, count, course_id=course_id, status=status, bucket=bucket)
+        if not RollupMark.objects.filter(name=ROLLUP, last_at=since).update(last_at=now):
+            transaction.set_rollback(True)
+            return None
+    return read, aged
+
+
+def _apply(batch, deltas, now):
+    """
+    Count a batch of changed issues, given as (pk, course_id, status,
+    created_at), against their OpenIssue rows.
+    """
+    if not batch:
+        return
+    counted = {
+        row[0]: row[1:] for row in
+        OpenIssue.objects.filter(pk__in=[row[0] for row in batch])
+        .values_list('pk', 'course_id', 'status', 'created_at')
+    }
+    stale, fresh = [], []
+    for pk, course_id, status, created_at in batch:
+        old = counted.get(pk)
+        new = (course_id, status, created_at) if status in OPEN_STATUSES else None
+        if old == new:
+            continue
+        if old is not None:
+            _count(deltas, old, now, -1)
+            stale.append(pk)
+        if new is not None:
+            _count(deltas, new, now, 1)
+            fresh.append(OpenIssue(issue_id=pk, course_id=course_id, status=status, created_at=created_at))
+    OpenIssue.objects.filter(pk__in=stale).delete()
+    OpenIssue.objects.bulk_create(fresh)
+
+
+def forget(issue_id):
+    """
+    Take a deleted issue out of the counters.
+    """
+    counted = OpenIssue.objects.filter(pk=issue_id).values_list('course_id', 'status', 'created_at').first()
+    if counted is None:
+        return
+    with transaction.atomic(savepoint=False):
+        since = RollupMark.objects.values_list('last_at', flat=True).get(name=ROLLUP)
+        OpenIssue.objects.filter(pk=issue_id).delete()
+        course_id, status, created_at = counted
+        adjust_counter(
+            IssueAgingStat, -1, course_id=course_id, status=status, bucket=bucket_for(created_at, since)
+        )
+
+
+def report(by='department', status=None):
+    """
+    Unsolved issues per department or course, in total and past each edge,
+    read from the counters. `status` narrows them to Pending or InProgress.
+    """
+    key = 'course_id' if by == 'course' else 'course__department_id'
+    rows = IssueAgingStat.objects.filter(count__gt=0)
+    if status is not None:
+        rows = rows.filter(status=status)
+    totals = {}
+    for group, bucket, count in (
+        rows.values_list(key, 'bucket').annotate(n=Sum('count')).order_by(key, 'bucket')
+    ):
+        totals.setdefault(group, [0] * (len(EDGES) + 1))[bucket] = count
+
+    if by == 'course':
+        codes = dict(Course.objects.filter(pk__in=totals).values_list('pk', 'course_code'))
+    else:
+        codes = dict(Department.objects.filter(pk__in=totals).values_list('pk', 'department_code'))
+    results = []
+    for group, counts in totals.items():
+        row = {'id': group, 'code': codes.get(group), 'open': sum(counts)}
+        for bucket, edge in enumerate(EDGES, start=1):
+            row[f'over_{edge.days}_days'] = sum(counts[bucket:])
+        results.append(row)
+    return results
+
+
+def as_of():
+    """
+    When the counters were last refreshed, or None if never.
+    """
+    return RollupMark.objects.filter(name=ROLLUP).values_list('last_at', flat=True).first()
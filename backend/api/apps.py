@@ -5,9 +5,5 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
 
-class IssuesConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'issues'
-
     def ready(self):
-        from . import signals 
\ No newline at end of file
+        from . import signals, sqlite_profile
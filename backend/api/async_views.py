@@ -0,0 +1,221 @@
+"""
+Async-native read endpoints for ASGI deployments.
+
+DRF views are synchronous, so under ASGI each request to one holds a worker
+thread for its whole lifetime. These coroutine views serve the hot GET paths
+with the async ORM instead, rendering the same bytes as their DRF
+counterparts: same serializers, query plans, keyset pagination and catalog
+cache. Other methods on the same URLs still go to the DRF views (see
+read_view). Responses are always JSON; the browsable API stays on WSGI.
+
+They are routed in only when settings.ASYNC_READ_VIEWS is on, which
+backend/asgi.py enables, so WSGI processes keep the plain sync views.
+
+issue_stream, the live update stream (api.push), is async only: it holds
+its connection open, which only the ASGI app can do without tying up a
+worker thread.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from users.authentication import CachedJWTAuthentication
+from . import catalog_cache, push
+from .fieldsets import fieldset_key, fieldset_options, plan_fieldset
+from .filters import filter_issues
+from .models import College, Department, Course, Issue
+from .projection import list_source
+from .serializers import CollegeSerializer, DepartmentSerializer, CourseSerializer, IssueSerializer
+from .views import CollegeListView, DepartmentListView, CourseListView, IssueViewSet, visible_issues
+
+authenticator = CachedJWTAuthentication()
+
+
+def read_view(sync_view, async_get):
+    """
+    `sync_view` as is, or with ASYNC_READ_VIEWS a coroutine view that serves
+    GET/HEAD with `async_get` and hands every other method to `sync_view`.
+    """
+    if not settings.ASYNC_READ_VIEWS:
+        return sync_view
+    sync_fallback = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_get(request, *args, **kwargs)
+        return await sync_fallback(request, *args, **kwargs)
+
+    view.csrf_exempt = getattr(sync_view, 'csrf_exempt', False)
+    return view
+
+
+def route_reads(patterns, async_gets):
+    """
+    Apply read_view() to the URL patterns named in `async_gets` (e.g. a
+    router's list and detail routes), leaving their order intact.
+    """
+    for pattern in patterns:
+        # Format-suffix variants pass a `format` kwarg the async views don't take
+        if pattern.name in async_gets and 'format' not in pattern.pattern.regex.groupindex:
+            pattern.callback = read_view(pattern.callback, async_gets[pattern.name])
+    return patterns
+
+
+def json_response(data, status=200, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status, content_type='application/json', headers=headers
+    )
+
+
+def api_view(view):
+    """
+    Wrap the request for DRF-style query_params and turn APIExceptions into
+    the error responses DRF's exception handler would produce.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(Request(request), *args, **kwargs)
+        except exceptions.APIException as exc:
+            headers = None
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                headers = {'WWW-Authenticate': authenticator.authenticate_header(request)}
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return json_response(data, exc.status_code, headers)
+    return wrapper
+
+
+async def authenticate(request):
+    result = await authenticator.aauthenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    request.user = result[0]
+    return result[0]
+
+
+async def list_response(request, view_class, queryset, serializer_class):
+    """
+    Serialize `queryset` in full (up to the unpaginated cap), or the requested
+    keyset page of it.
+    """
+    paginator = view_class.pagination_class()
+    rows, render = list_source(
+        queryset, serializer_class, fieldset_options(request), paginator.ordering_columns(view_class, request)
+    )
+    page = await paginator.apaginate_queryset(rows, request, view=view_class)
+    return json_response(paginator.get_paginated_data(render(page)))
+
+
+async def catalog_list(request, view_class, queryset, serializer_class):
+    queryset = plan_fieldset(request, queryset, serializer_class, view_class.keyset_ordering)
+    if view_class.pagination_class().wants_pagination(request):
+        return await list_response(request, view_class, queryset, serializer_class)
+
+    options = fieldset_options(request)
+    name = view_class.catalog_name
+    if options:
+        name = f'{name}:{fieldset_key(options)}'
+    rows, render = list_source(queryset, serializer_class, options)
+
+    async def arender():
+        return render(await view_class.pagination_class().apaginate_queryset(rows, request, view=view_class))
+
+    return await catalog_cache.aserve(request, name, arender)
+
+
+@api_view
+async def college_list(request):
+    return await catalog_list(request, CollegeListView, College.objects.all(), CollegeSerializer)
+
+
+@api_view
+async def department_list(request):
+    return await catalog_list(request, DepartmentListView, Department.objects.all(), DepartmentSerializer)
+
+
+@api_view
+async def course_list(request):
+    return await catalog_list(request, CourseListView, Course.objects.all(), CourseSerializer)
+
+
+def issue_queryset(request, user):
+    return plan_fieldset(
+        request, visible_issues(user), IssueSerializer, IssueViewSet.keyset_ordering, always=['student']
+    )
+
+
+@api_view
+async def issue_list(request):
+    user = await authenticate(request)
+    queryset = filter_issues(request, issue_queryset(request, user), IssueViewSet)
+    return await list_response(request, IssueViewSet, queryset, IssueSerializer)
+
+
+@api_view
+async def issue_detail(request, pk):
+    user = await authenticate(request)
+    try:
+        issue = await issue_queryset(request, user).aget(pk=pk)
+    except Issue.DoesNotExist:
+        raise exceptions.NotFound('No Issue matches the given query.')
+    except (TypeError, ValueError, DjangoValidationError):
+        raise exceptions.NotFound()
+    return json_response(IssueSerializer(issue, **fieldset_options(request)).data)
+
+
+@require_GET
+@api_view
+async def issue_stream(request):
+    """
+    Server-sent events for every creation, assignment and status change of
+    the issues the user owns or is assigned, or of all issues for staff.
+    """
+    if not isinstance(request._request, ASGIRequest):
+        return json_response({'detail': 'Live updates are served by the ASGI app (backend.asgi).'}, 501)
+    user = await authenticate(request)
+    response = StreamingHttpResponse(stream(user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def stream(user, batch_size=64):
+    subscription = push.hub.subscribe(user.pk, user.is_staff)
+    queue = subscription.queue
+    try:
+        # Reconnect after a second rather than the browsers' default three
+        yield b'retry: 1000\n\n'
+        while True:
+            try:
+                # Not wait_for(), which on Python 3.11 can swallow the
+                # cancellation of a client disconnecting as an item arrives
+                async with asyncio.timeout(settings.PUSH_HEARTBEAT_SECONDS):
+                    item = await queue.get()
+            except TimeoutError:
+                yield b': keep-alive\n\n'
+                continue
+            # Write whatever else is waiting along with it
+            frames = []
+            while item is not None:
+                frames.append(item.frame)
+                if len(frames) == batch_size or queue.empty():
+                    break
+                item = queue.get_nowait()
+            if frames:
+                yield b''.join(frames)
+            if item is None:
+                # Dropped for falling behind
+                yield b'event: dropped\ndata: {}\n\n'
+                return
+    finally:
+        push.hub.unsubscribe(subscription)
@@ -0,0 +1,269 @@
+"""
+Helpers shared by the benchmark management commands.
+
+Benchmarks never touch the configured database: they run inside a scratch
+test database that is created (and migrated) on entry and destroyed on exit.
+The one exception is seed_scale(), which `manage.py seed_scale` also uses to
+fill the configured database for manual load testing.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.models import User
+from .models import College, Department, Course, Issue, IssueChange, IssueEvent
+
+
+@contextmanager
+def scratch_database(verbosity=0, name=None):
+    """
+    Create, migrate and finally destroy a test database. SQLite test
+    databases live in memory unless `name` gives a file path; use one when
+    concurrent writers matter, since the in-memory shared cache fails lock
+    conflicts at once instead of waiting like a database file does.
+    """
+    old_name = connection.settings_dict['NAME']
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    if name is not None:
+        test_settings['NAME'] = name
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        test_settings['NAME'] = old_test_name
+
+
+def timed(func, repeat=5):
+    """
+    Run `func` `repeat` times and return (median milliseconds, last result).
+    """
+    samples, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+ISSUE_TEMPLATES = [
+    ('Missing Marks', 'Missing coursework marks for {course}',
+     'My coursework marks for {course} are missing from the portal.'),
+    ('Missing Marks', 'Final exam mark not recorded for {course}',
+     'The final exam mark for {course} was not recorded although I sat the paper.'),
+    ('Appeals', 'Appeal against {course} exam result',
+     'I would like to appeal my {course} result; the grade does not match my script.'),
+    ('Corrections', 'Wrong grade entered for {course}',
+     'The grade shown for {course} differs from the one announced in class.'),
+    ('Corrections', 'Registration number wrong on {course} results',
+     'My registration number is wrong on the {course} results sheet.'),
+]
+
+
+def issue_history(issues, opened, now, rng):
+    """
+    IssueEvent rows for seeded `issues` opened at the matching `opened`
+    times: creation, then assignment and solving as their status implies,
+    at random times between opening and `now`.
+    """
+    for issue, opened_at in zip(issues, opened):
+        yield IssueEvent(
+            issue_id=issue.pk, course_id=issue.course_id, kind='created', to_status='Pending',
+            status_since=opened_at, created_at=opened_at,
+        )
+        if issue.status == 'Pending':
+            continue
+        assigned_at = opened_at + (now - opened_at) * rng.random() / 2
+        yield IssueEvent(
+            issue_id=issue.pk, course_id=issue.course_id, kind='assigned', from_status='Pending',
+            to_status='InProgress', assigned_to_id=issue.assigned_to_id,
+            status_since=opened_at, created_at=assigned_at,
+        )
+        if issue.status == 'Solved':
+            yield IssueEvent(
+                issue_id=issue.pk, course_id=issue.course_id, kind='status', from_status='InProgress',
+                to_status='Solved', assigned_to_id=issue.assigned_to_id,
+                status_since=assigned_at, created_at=assigned_at + (now - assigned_at) * rng.random(),
+            )
+
+
+def seed_population(colleges=5, departments=4, courses=10, students=10_000, lecturers=500, password=None,
+                    prefix='S', seed=0, batch_size=10_000):
+    """
+    Bulk-create `colleges`, each with `departments` departments (one HOD
+    each) of `courses` courses, plus `students` and `lecturers` spread over
+    the colleges and departments, and an admin account.
+
+    Every account shares one password hash (unusable when `password` is None)
+    so only one hash is computed. Returns the created ids by kind.
+    """
+    from . import catalog_cache
+
+    rng = random.Random(seed)
+    hashed = make_password(password)
+
+    with transaction.atomic():
+        college_rows = College.objects.bulk_create(
+            College(name=f'{prefix} College {c}', code=f'{prefix}C{c:03d}') for c in range(colleges)
+        )
+        department_rows = Department.objects.bulk_create(
+            Department(
+                department_name=f'{prefix} Department {n}', department_code=f'{prefix}D{n:04d}', college=college,
+            )
+            for n, college in enumerate(college for college in college_rows for _ in range(departments))
+        )
+        course_rows = Course.objects.bulk_create(
+            (Course(course_name=f'{prefix} Course {n}', course_code=f'{prefix}{n:05d}', department=department)
+             for n, department in enumerate(d for d in department_rows for _ in range(courses))),
+            batch_size=batch_size,
+        )
+
+        def account(kind, n, role, **extra):
+            return User(
+                email=f'{prefix.lower()}-{kind}{n}@example.com', username=f'{prefix.lower()}-{kind}{n}',
+                password=hashed, role=role, is_verified=True, **extra
+            )
+
+        student_rows = User.objects.bulk_create(
+            (account('student', n, User.Role.STUDENT, college=rng.choice(college_rows)) for n in range(students)),
+            batch_size=batch_size,
+        )
+        lecturer_rows = User.objects.bulk_create(
+            (account('lecturer', n, User.Role.LECTURER, college=department.college)
+             for n, department in ((n, rng.choice(department_rows)) for n in range(lecturers))),
+            batch_size=batch_size,
+        )
+        hod_rows = User.objects.bulk_create(
+            account('hod', n, User.Role.HOD, college=department.college, department=department)
+            for n, department in enumerate(department_rows)
+        )
+        admin = User.objects.create(
+            email=f'{prefix.lower()}-admin@example.com', username=f'{prefix.lower()}-admin',
+            password=hashed, role=User.Role.ADMIN, is_staff=True, is_verified=True,
+        )
+
+    # Bulk inserts send no signals
+    catalog_cache.bump_version()
+    return {
+        'colleges': [c.pk for c in college_rows],
+        'departments': [d.pk for d in department_rows],
+        'courses': [c.pk for c in course_rows],
+        'students': [u.pk for u in student_rows],
+        'lecturers': [u.pk for u in lecturer_rows],
+        'hods': [u.pk for u in hod_rows],
+        'admin': admin.pk,
+    }
+
+
+def add_issues(count, population, days=365, seed=0, batch_size=10_000):
+    """
+    Bulk-insert `count` issues raised by the students of `population` (as
+    returned by seed_population()) against courses of their own college,
+    created over the last `days` days, with older issues more likely to be
+    assigned (to a lecturer or HOD of that college) and solved.
+
+    Each issue gets the event log entries its status implies. Bulk inserts
+    send no signals, so the dashboard counters and the duration histograms
+    are refreshed at the end. Calls with different `seed`s add different
+    issues, so a population can be grown in steps.
+    """
+    from . import aging, events, stats
+
+    rng = random.Random(f'{seed}:issues')
+    # Separate, so event times don't change the rest of the seeded data
+    timeline = random.Random(f'{seed}:events')
+    now = timezone.now()
+
+    # Everything in the population's colleges belongs to it
+    colleges = population['colleges']
+    students = list(
+        User.objects.filter(role=User.Role.STUDENT, college_id__in=colleges)
+        .order_by('pk').values_list('pk', 'college_id')
+    )
+    courses_by_college = {}
+    courses = Course.objects.filter(department__college_id__in=colleges).select_related('department')
+    for course in courses.order_by('pk'):
+        courses_by_college.setdefault(course.department.college_id, []).append(course)
+    assignees_by_college = {}
+    assignees = User.objects.filter(role__in=[User.Role.LECTURER, User.Role.HOD], college_id__in=colleges)
+    for pk, college_id in assignees.order_by('pk').values_list('pk', 'college_id'):
+        assignees_by_college.setdefault(college_id, []).append(pk)
+
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        rows, ages = [], []
+        for _ in range(size):
+            student_id, college_id = rng.choice(students)
+            course = rng.choice(courses_by_college[college_id])
+            issue_type, title, description = rng.choice(ISSUE_TEMPLATES)
+            age = min(int(rng.expovariate(3 / days)), days - 1)
+            # The older an issue, the further along triage it is
+            progress = rng.random() * (1 + age / max(days / 4, 1))
+            status = 'Pending' if progress < 0.5 else 'InProgress' if progress < 1 else 'Solved'
+            rows.append(Issue(
+                student_id=student_id, course_id=course.pk, issue_type=issue_type, status=status,
+                title=title.format(course=course.course_code),
+                description=description.format(course=course.course_name),
+                assigned_to_id=None if status == 'Pending' else rng.choice(assignees_by_college[college_id]),
+            ))
+            ages.append(age)
+        with transaction.atomic():
+            Issue.objects.bulk_create(rows, batch_size=batch_size)
+            # auto_now_add stamps every row with now; backdate them by age
+            by_age = {}
+            for issue, age in zip(rows, ages):
+                by_age.setdefault(age, []).append(issue.pk)
+            stamps = {}
+            for age, ids in by_age.items():
+                stamp = stamps[age] = now - timedelta(days=age, seconds=rng.randrange(86400))
+                Issue.objects.filter(pk__in=ids).update(created_at=stamp, updated_at=stamp)
+            IssueEvent.objects.bulk_create(
+                issue_history(rows, [stamps[age] for age in ages], now, timeline), batch_size=batch_size
+            )
+            IssueChange.objects.bulk_create(
+                [IssueChange(issue_id=issue.pk, student_id=issue.student_id) for issue in rows],
+                batch_size=batch_size,
+            )
+        created += size
+
+    stats.rebuild()
+    events.rollup()
+    aging.refresh()
+
+
+def seed_issues(count, seed=0, **population_options):
+    """
+    Seed a population and `count` issues; returns the population ids.
+    """
+    population = seed_population(seed=seed, **population_options)
+    add_issues(count, population, seed=seed)
+    return population
+
+
+def seed_scale(colleges=5, departments=4, courses=10, students=10_000, lecturers=500, issues=100_000,
+               days=365, password=None, prefix='S', seed=0, batch_size=10_000):
+    """
+    seed_population() plus add_issues(): a realistic hierarchy of
+    `colleges` x `departments` x `courses`, `students`, `lecturers` and HODs,
+    and `issues` created over the last `days` days. Returns the created ids
+    by kind.
+    """
+    population = seed_population(
+        colleges=colleges, departments=departments, courses=courses, students=students, lecturers=lecturers,
+        password=password, prefix=prefix, seed=seed, batch_size=batch_size,
+    )
+    add_issues(issues, population, days=days, seed=seed, batch_size=batch_size)
+    return population
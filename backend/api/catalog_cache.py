@@ -0,0 +1,166 @@
+"""
+Versioned response cache for the public college/department/course lists.
+
+All three lists share one version counter, since departments embed their
+college and courses embed their department. Committed writes bump the
+counter (see api.signals), which retires every cached body at once; nothing
+is ever deleted explicitly. Each list is rendered to JSON once per version
+and served with a strong ETag, so a client revalidating with If-None-Match
+gets a 304 for the cost of reading the counter.
+
+The counter is a database row (CatalogVersion), so a bump made by any
+process, including `manage.py import_catalog`, is seen by every other one
+on its next read. The bodies live in Django's default cache, keyed by
+version: with a per-process backend each process renders a version once.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from .fieldsets import SparseFieldsetMixin, fieldset_key
+from .models import CatalogVersion
+from .pagination import KeysetPaginatedListMixin
+from .projection import list_source
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def get_stats():
+    """
+    Hit/miss/304 counters for this process.
+    """
+    with _stats_lock:
+        return {
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'not_modified': _stats['not_modified'],
+            'version': get_version(),
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _initial_version():
+    # If the row is lost (a restored or rolled back database) while bodies
+    # survive, restarting from a clock value keeps the new versions from
+    # colliding with the old keys
+    return {'version': int(time.time() * 1000)}
+
+
+def get_version():
+    version = CatalogVersion.objects.filter(pk=1).values_list('version', flat=True).first()
+    if version is None:
+        version = CatalogVersion.objects.get_or_create(pk=1, defaults=_initial_version())[0].version
+    return version
+
+
+def bump_version(**kwargs):
+    """
+    Invalidate every cached catalog list. Usable directly as a signal receiver.
+    """
+    if not CatalogVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        CatalogVersion.objects.get_or_create(pk=1, defaults=_initial_version())
+
+
+def _entry(data):
+    body = JSONRenderer().render(data)
+    return ('"%s"' % hashlib.sha256(body).hexdigest(), body)
+
+
+def _cached_body(name, render):
+    key = f'catalog:{name}:{get_version()}'
+    entry = cache.get(key)
+    if entry is not None:
+        _record('hits')
+        return entry
+    _record('misses')
+    entry = _entry(render())
+    cache.set(key, entry, CACHE_TIMEOUT)
+    return entry
+
+
+def _respond(request, etag, body):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+        _record('not_modified')
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    # Let clients keep the body but always revalidate
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def serve(request, name, render):
+    """
+    Respond with the cached rendering of catalog list `name`, calling `render()`
+    for the serialized data only when this version has not been rendered yet.
+    """
+    return _respond(request, *_cached_body(name, render))
+
+
+async def aget_version():
+    version = await CatalogVersion.objects.filter(pk=1).values_list('version', flat=True).afirst()
+    if version is None:
+        version = (await CatalogVersion.objects.aget_or_create(pk=1, defaults=_initial_version()))[0].version
+    return version
+
+
+async def aserve(request, name, arender):
+    """
+    serve() for async views; `arender` is a coroutine function.
+    """
+    key = f'catalog:{name}:{await aget_version()}'
+    entry = await cache.aget(key)
+    if entry is not None:
+        _record('hits')
+    else:
+        _record('misses')
+        entry = _entry(await arender())
+        await cache.aset(key, entry, CACHE_TIMEOUT)
+    return _respond(request, *entry)
+
+
+class CachedCatalogListMixin(SparseFieldsetMixin, KeysetPaginatedListMixin):
+    """
+    Serve an APIView's unpaginated GET list from the catalog cache.
+    Each fieldset selection is cached as its own body.
+    """
+    catalog_name = None
+
+    def perform_authentication(self, request):
+        # These lists are public; authenticate lazily so a bearer token
+        # doesn't cost a user lookup on every cached read.
+        pass
+
+    def list_response(self, queryset, serializer_class):
+        options = self.fieldset_options()
+        queryset = self.plan_fieldset(queryset, serializer_class)
+        paginator = self.pagination_class()
+        if paginator.wants_pagination(self.request):
+            return super().list_response(queryset, serializer_class, **options)
+        name = self.catalog_name
+        if options:
+            name = f'{name}:{fieldset_key(options)}'
+        rows, render = list_source(queryset, serializer_class, options)
+        # Unpaginated, so the whole list, within the cap
+        return serve(self.request, name, lambda: render(paginator.paginate_queryset(rows, self.request, self)))
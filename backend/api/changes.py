@@ -0,0 +1,81 @@
+"""
+The issue change feed behind /api/issues/changes/.
+
+Every write to an issue replaces its IssueChange row with a new one, so the
+table holds one row per issue, numbered by the last time it changed, plus
+tombstones for deleted issues. A client keeps the highest seq it has read
+as its cursor and asks for the rows past it: the cost follows the number of
+changes, not the size of the issue table.
+
+seq is drawn when the row is inserted. The feed only hands out rows no
+lower seq can still commit behind (see api.watermarks): once a client has
+read up to a seq, no row below it can appear.
+
+Saves and deletes of single issues are recorded by receivers in
+api.signals; set-based UPDATEs call record_many() themselves.
+"""
+from django.db import transaction
+from django.db.models import Max
+
+from . import watermarks
+from .models import Issue, IssueChange
+
+
+def record(issue_id, student_id, deleted=False):
+    with transaction.atomic(savepoint=False):
+        # Keep one row per issue: drop the one this supersedes
+        IssueChange.objects.filter(issue_id=issue_id).delete()
+        IssueChange.objects.create(issue_id=issue_id, student_id=student_id, deleted=deleted)
+
+
+def record_issue(issue, deleted=False):
+    student_id = issue.__dict__.get('student_id')
+    if student_id is None:
+        # Deferred on this instance. The row being superseded has it, and
+        # still does once the issue itself is deleted.
+        student_id = (
+            IssueChange.objects.filter(issue_id=issue.pk).values_list('student_id', flat=True).first()
+            or Issue.objects.filter(pk=issue.pk).values_list('student_id', flat=True).first()
+        )
+        if student_id is None:
+            return
+    record(issue.pk, student_id, deleted)
+
+
+def record_many(rows):
+    """
+    Record a set-based UPDATE of `rows`, dicts holding each issue's pk and
+    student_id. Call in the UPDATE's transaction.
+    """
+    with transaction.atomic(savepoint=False):
+        IssueChange.objects.filter(issue_id__in=[row['pk'] for row in rows]).delete()
+        IssueChange.objects.bulk_create(
+            [IssueChange(issue_id=row['pk'], student_id=row['student_id']) for row in rows], batch_size=1000
+        )
+
+
+def latest():
+    """
+    The cursor for "now": the highest seq a client may read up to.
+    """
+    bound = watermarks.settled(IssueChange.objects.all(), 'changed_at')
+    if bound is not None:
+        return bound
+    return IssueChange.objects.aggregate(seq=Max('seq'))['seq'] or 0
+
+
+def since(changes, cursor, limit):
+    """
+    Up to `limit` of the `changes` rows past `cursor`, in seq order, as
+    {issue id: deleted}, with the cursor to continue from and whether more
+    rows are waiting.
+    """
+    rows = list(
+        watermarks.up_to_settled(changes.filter(seq__gt=cursor), 'changed_at')
+        .order_by('seq').values_list('seq', 'issue_id', 'deleted')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        cursor = rows[-1][0]
+    return {issue_id: deleted for _, issue_id, deleted in rows}, cursor, has_more
@@ -0,0 +1,138 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+settings.DATABASE_REPLICAS names database aliases holding copies of
+`default`. ReplicaRoutingMiddleware lets safe-method requests to the
+REPLICA_ROUTES endpoints read from one of them, picked per request; every
+other read, and every write, stays on `default`. Management commands and the
+job worker run outside a request, so they always use `default`.
+
+Replicas lag behind the primary, so a request that writes pins its client to
+`default` for settings.REPLICA_PIN_SECONDS, and the rest of that request
+reads from `default` too. Clients are told apart by their credentials
+(Authorization header, else session cookie, else address); pins live in the
+default cache, so processes share them when that backend is shared.
+"""
+import contextvars
+import hashlib
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+# Read-heavy list endpoints that tolerate replication lag
+REPLICA_ROUTES = frozenset({
+    'college_list', 'department-list', 'course-list', 'issue-list', 'user-list',
+})
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RoutingState:
+    """
+    The current request's routing: the replica it reads from (None for
+    `default`) and whether it has written.
+    """
+    __slots__ = ('replica', 'wrote')
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('db_routing', default=None)
+
+
+@contextmanager
+def primary():
+    """
+    Read from `default` inside the block, e.g. for lookups that must see a
+    row the client created moments ago.
+    """
+    token = _state.set(None)
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is not None and state.replica:
+            return state.replica
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            # Later reads in this request must see the write
+            state.replica = None
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        return db not in settings.DATABASE_REPLICAS
+
+
+def client_key(request):
+    credential = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return 'db-pin:' + hashlib.sha256(credential.encode()).hexdigest()[:32]
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            cache.set(client_key(request), True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        # Copied into the ORM's worker threads along with the rest of the context
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            await cache.aset(client_key(request), True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if (
+            state is None
+            or not settings.DATABASE_REPLICAS
+            or request.method not in SAFE_METHODS
+            or request.resolver_match.url_name not in REPLICA_ROUTES
+            or cache.get(client_key(request))
+        ):
+            return None
+        state.replica = random.choice(settings.DATABASE_REPLICAS)
+        return None
@@ -0,0 +1,228 @@
+"""
+The issue event log (IssueEvent) and the duration metrics rolled up from it.
+
+Saves of single issues are logged by a post_save receiver (api.signals),
+which runs inside the caller's transaction: views that change issues save
+them in atomic() blocks, so an event commits or rolls back with its change.
+Set-based UPDATEs send no signals and call record_bulk() themselves.
+Every logged transition is also pushed to live clients (api.push).
+
+rollup() folds the events past its high-water mark (a RollupMark) into
+IssueDurationStat histograms: every status change adds the time spent in
+the status it left, and every move to Solved the time since the issue was
+opened. It reads each event once, in primary key order, so its cost
+follows the rate of transitions rather than the size of the log. The mark
+stays behind events that may still be committing (see api.watermarks).
+"""
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from . import push, watermarks
+from .models import Course, Department, Issue, IssueDurationStat, IssueEvent, RollupMark
+from .stats import adjust_counter
+
+ROLLUP = 'issue_durations'
+# Four buckets per doubling: each ~19% wide, so a percentile is within ~9%
+BUCKETS_PER_DOUBLING = 4
+QUANTILES = (0.5, 0.9, 0.99)
+# Statuses whose duration is measured when an issue leaves them
+TIMED_STATUSES = ('Pending', 'InProgress')
+
+
+def bucket_for(seconds):
+    """
+    Histogram bucket of a duration: 0 below one second, otherwise bucket b
+    holds [2 ** ((b - 1) / k), 2 ** (b / k)) seconds for k BUCKETS_PER_DOUBLING.
+    """
+    if seconds < 1:
+        return 0
+    return int(math.log2(seconds) * BUCKETS_PER_DOUBLING) + 1
+
+
+def bucket_value(bucket):
+    """
+    The duration a bucket stands for: its geometric middle, in seconds.
+    """
+    if bucket == 0:
+        return 0.0
+    return 2 ** ((bucket - 0.5) / BUCKETS_PER_DOUBLING)
+
+
+def status_since(issue_ids):
+    """
+    {issue id: when it entered its current status} for the given issues
+    that have a logged creation or status change.
+    """
+    return dict(
+        IssueEvent.objects.filter(issue_id__in=issue_ids).exclude(from_status=F('to_status'))
+        .values('issue_id').annotate(at=Max('created_at')).values_list('issue_id', 'at').order_by()
+    )
+
+
+def transition(issue_id, course_id, old, new, opened_at, since=None, at=None):
+    """
+    The IssueEvent for an issue moving from `old` to `new` (status,
+    assigned_to_id) pairs, or None if neither changed. `since` is when it
+    entered its old status, defaulting to `opened_at`.
+    """
+    if old[1] != new[1]:
+        kind = 'assigned'
+    elif old[0] != new[0]:
+        kind = 'status'
+    else:
+        return None
+    event = IssueEvent(
+        issue_id=issue_id, course_id=course_id, kind=kind, from_status=old[0], to_status=new[0],
+        assigned_to_id=new[1], status_since=since or opened_at,
+    )
+    if at is not None:
+        event.created_at = at
+    return event
+
+
+def record_created(issue):
+    event = IssueEvent.objects.create(
+        issue_id=issue.pk, course_id=issue.course_id, kind='created', to_status=issue.status,
+        assigned_to_id=issue.assigned_to_id, status_since=issue.created_at, created_at=issue.created_at,
+    )
+    push.announce([(event, issue.student_id)])
+
+
+def record(issue, old, new):
+    """
+    Log a saved issue's change from `old` to `new` (status, assigned_to_id).
+    """
+    if old == new:
+        return
+    names = ('course_id', 'created_at', 'student_id')
+    stored = {name: issue.__dict__[name] for name in names if name in issue.__dict__}
+    if len(stored) < len(names):
+        # Deferred on this instance
+        stored = Issue.objects.values(*names).get(pk=issue.pk)
+    since = status_since([issue.pk]).get(issue.pk)
+    event = transition(issue.pk, stored['course_id'], old, new, stored['created_at'], since)
+    event.save()
+    push.announce([(event, stored['student_id'])])
+
+
+def record_bulk(rows, status, assigned_to_id=None, at=None):
+    """
+    Log a set-based UPDATE setting `status` (and `assigned_to_id` when
+    given) on `rows`: dicts of each issue's pk, status, assigned_to_id,
+    course_id, created_at and student_id read before the UPDATE, in the
+    same transaction.
+    """
+    since = status_since([row['pk'] for row in rows])
+    events, students = [], []
+    for row in rows:
+        old = (row['status'], row['assigned_to_id'])
+        new = (status, row['assigned_to_id'] if assigned_to_id is None else assigned_to_id)
+        event = transition(row['pk'], row['course_id'], old, new, row['created_at'], since.get(row['pk']), at)
+        if event is not None:
+            events.append(event)
+            students.append(row['student_id'])
+    IssueEvent.objects.bulk_create(events, batch_size=1000)
+    push.announce(list(zip(events, students)))
+
+
+def rollup(batch_size=10_000):
+    """
+    Fold the events logged since the last run into IssueDurationStat, one
+    batch per transaction. Concurrent runs are safe: a batch only commits if
+    the mark hasn't moved since it was read. Returns the events folded in.
+    Run by `manage.py rollup_issue_events`, not by the requests reading the
+    histograms.
+    """
+    RollupMark.objects.get_or_create(name=ROLLUP)
+    total = 0
+    while True:
+        with transaction.atomic():
+            last_id = RollupMark.objects.values_list('last_id', flat=True).get(name=ROLLUP)
+            # So that no event can commit below the mark once it has passed
+            events = list(
+                watermarks.up_to_settled(IssueEvent.objects.filter(pk__gt=last_id), 'created_at')
+                .order_by('pk').values_list(
+                    'pk', 'issue_id', 'course_id', 'from_status', 'to_status', 'status_since', 'created_at'
+                )[:batch_size]
+            )
+            if not events:
+                # Caught up: what as_of() reports
+                RollupMark.objects.filter(name=ROLLUP).update(last_at=timezone.now())
+                return total
+
+            solved = {event[1] for event in events if event[4] == 'Solved' and event[3] != 'Solved'}
+            opened = dict(Issue.objects.filter(pk__in=solved).values_list('pk', 'created_at'))
+            deltas = Counter()
+            for _, issue_id, course_id, from_status, to_status, since, at in events:
+                if from_status == to_status or not from_status:
+                    continue
+                if from_status in TIMED_STATUSES:
+                    deltas[course_id, from_status, bucket_for((at - since).total_seconds())] += 1
+                if to_status == 'Solved' and issue_id in opened:
+                    deltas[course_id, 'resolution', bucket_for((at - opened[issue_id]).total_seconds())] += 1
+
+            # Events outlive their course; drop what no longer has one
+            courses = set(Course.objects.filter(pk__in={key[0] for key in deltas}).values_list('pk', flat=True))
+            for (course_id, metric, bucket), count in deltas.items():
+                if course_id in courses:
+                    adjust_counter(IssueDurationStat, count, course_id=course_id, metric=metric, bucket=bucket)
+
+            if not RollupMark.objects.filter(name=ROLLUP, last_id=last_id).update(last_id=events[-1][0]):
+                # Another run folded these in first
+                transaction.set_rollback(True)
+                return total
+        total += len(events)
+
+
+def as_of():
+    """
+    When the rollup last caught up with the event log, or None if never.
+    """
+    return RollupMark.objects.filter(name=ROLLUP).values_list('last_at', flat=True).first()
+
+
+def percentiles(counts, quantiles=QUANTILES):
+    """
+    Nearest-rank percentiles, in seconds, of a histogram given as sorted
+    (bucket, count) pairs.
+    """
+    total = sum(count for _, count in counts)
+    result = {}
+    for quantile in quantiles:
+        rank = max(math.ceil(quantile * total), 1)
+        seen = 0
+        for bucket, count in counts:
+            seen += count
+            if seen >= rank:
+                result[f'p{quantile * 100:g}'] = round(bucket_value(bucket), 1)
+                break
+    return total, result
+
+
+def duration_percentiles(by='department', metric='resolution'):
+    """
+    Percentiles of `metric` per course or department, merging course
+    histograms for departments.
+    """
+    key = 'course_id' if by == 'course' else 'course__department_id'
+    histograms = defaultdict(list)
+    rows = (
+        IssueDurationStat.objects.filter(metric=metric, count__gt=0)
+        .values_list(key, 'bucket').annotate(n=Sum('count')).order_by(key, 'bucket')
+    )
+    for group, bucket, count in rows:
+        histograms[group].append((bucket, count))
+
+    if by == 'course':
+        codes = dict(Course.objects.filter(pk__in=histograms).values_list('pk', 'course_code'))
+    else:
+        codes = dict(Department.objects.filter(pk__in=histograms).values_list('pk', 'department_code'))
+    results = []
+    for group, counts in histograms.items():
+        count, values = percentiles(counts)
+        results.append({'id': group, 'code': codes.get(group), 'count': count, **values})
+    return results
@@ -0,0 +1,101 @@
+"""
+Constant-memory streaming export of issues.
+
+Rows come from a values() projection read with iterator(chunk_size=...), so
+no model instances or nested serializers are built, and are written out in
+chunks as the response is consumed.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
+
+# Output column -> values() lookup
+EXPORT_COLUMNS = {
+    'id': 'id',
+    'title': 'title',
+    'issue_type': 'issue_type',
+    'status': 'status',
+    'description': 'description',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'student_id': 'student_id',
+    'student_email': 'student__email',
+    'course_id': 'course_id',
+    'course_code': 'course__course_code',
+    'course_name': 'course__course_name',
+    'department_code': 'course__department__department_code',
+    'assigned_to_id': 'assigned_to_id',
+    'assigned_to_email': 'assigned_to__email',
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000
+
+
+def _format_value(value):
+    if isinstance(value, datetime):
+        # Same representation as the API's DateTimeFields
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+    return value
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yield one dict per issue, keyed by EXPORT_COLUMNS.
+    """
+    names = list(EXPORT_COLUMNS)
+    rows = queryset.order_by('-created_at', '-id').values_list(*EXPORT_COLUMNS.values())
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield dict(zip(names, map(_format_value, row)))
+
+
+def _chunked(lines, chunk_size):
+    buffer, count = [], 0
+    for line in lines:
+        buffer.append(line)
+        count += 1
+        if count >= chunk_size:
+            yield ''.join(buffer)
+            buffer, count = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_csv(rows, chunk_size=CHUNK_SIZE):
+    out = io.StringIO()
+    writer = csv.writer(out)
+
+    def lines():
+        writer.writerow(EXPORT_COLUMNS)
+        yield out.getvalue()
+        for row in rows:
+            out.seek(0)
+            out.truncate()
+            writer.writerow(row.values())
+            yield out.getvalue()
+
+    return _chunked(lines(), chunk_size)
+
+
+def stream_ndjson(rows, chunk_size=CHUNK_SIZE):
+    return _chunked((json.dumps(row) + '\n' for row in rows), chunk_size)
+
+
+def export_response(queryset, export_format, chunk_size=CHUNK_SIZE):
+    rows = export_rows(queryset, chunk_size)
+    if export_format == 'csv':
+        content = stream_csv(rows, chunk_size)
+    else:
+        content = stream_ndjson(rows, chunk_size)
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="issues.{export_format}"'
+    return response
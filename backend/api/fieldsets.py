@@ -0,0 +1,134 @@
+"""
+Sparse fieldsets and on-demand expansion of related objects.
+
+`?fields=id,title,status` keeps only the named top-level fields.
+`?expand=student,course.department` inlines the named relations (dotted
+names reach into nested ones); once `expand` is given, every expandable
+relation it doesn't name is rendered as its primary key. Without either
+parameter a serializer renders exactly as declared.
+
+Serializers opt in with DynamicFieldsMixin and list their relations in
+`Meta.expandable`; views with SparseFieldsetMixin read the parameters and
+pass them to the serializer and the query planner.
+"""
+import hashlib
+
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+from .queryplan import plan_queryset
+
+
+def parse_names(value):
+    """
+    Split a comma separated query parameter into a frozenset of names.
+    """
+    return frozenset(name.strip() for name in value.split(',') if name.strip())
+
+
+def split_expand(expand):
+    """
+    {'course.department', 'student'} -> {'course': {'department'}, 'student': set()}
+    """
+    nested = {}
+    for path in expand:
+        head, _, rest = path.partition('.')
+        nested.setdefault(head, set())
+        if rest:
+            nested[head].add(rest)
+    return nested
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer mixin accepting `fields` and `expand` keyword arguments.
+
+    `Meta.expandable` maps a relation field name to the serializer used when
+    it is expanded (a class, or a dotted path to avoid circular imports).
+    """
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse_fields = frozenset(fields) if fields is not None else None
+        self.expand = frozenset(expand) if expand is not None else None
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        if self.expand is not None:
+            expandable = getattr(self.Meta, 'expandable', {})
+            nested = split_expand(self.expand)
+            unknown = set(nested) - set(expandable)
+            if unknown:
+                raise serializers.ValidationError(
+                    {"expand": f"Cannot expand: {', '.join(sorted(unknown))}"}
+                )
+            for name, target in expandable.items():
+                if name not in fields:
+                    continue
+                if name in nested:
+                    serializer_class = import_string(target) if isinstance(target, str) else target
+                    fields[name] = serializer_class(read_only=True, expand=nested[name])
+                else:
+                    fields[name] = serializers.PrimaryKeyRelatedField(read_only=True)
+
+        if self.sparse_fields is not None:
+            readable = {name for name, field in fields.items() if not field.write_only}
+            unknown = self.sparse_fields - readable
+            if unknown:
+                raise serializers.ValidationError(
+                    {"fields": f"Unknown field(s): {', '.join(sorted(unknown))}"}
+                )
+            fields = {
+                name: field for name, field in fields.items()
+                if name in self.sparse_fields or field.write_only
+            }
+        return fields
+
+
+def fieldset_options(request):
+    """
+    The `fields` and `expand` selections in a DRF request's query string.
+    """
+    options = {}
+    params = request.query_params
+    if params.get('fields'):
+        options['fields'] = parse_names(params['fields'])
+    if 'expand' in params:
+        options['expand'] = parse_names(params['expand'])
+    return options
+
+
+def plan_fieldset(request, queryset, serializer_class, ordering=(), always=()):
+    """
+    Plan `queryset` for the fieldset requested in `request`, keeping the
+    keyset `ordering` columns loaded for the pagination cursor.
+    """
+    ordering = tuple(name.lstrip('-') for name in ordering)
+    return plan_queryset(
+        queryset, serializer_class, always=ordering + tuple(always), **fieldset_options(request)
+    )
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin reading `fields` and `expand` from the query string.
+    """
+    def fieldset_options(self):
+        return fieldset_options(self.request)
+
+    def plan_fieldset(self, queryset, serializer_class, always=()):
+        return plan_fieldset(
+            self.request, queryset, serializer_class, getattr(self, 'keyset_ordering', ()), always
+        )
+
+
+def fieldset_key(options):
+    """
+    A short stable token identifying a fieldset selection, for cache keys.
+    """
+    if not options:
+        return ''
+    text = '&'.join(
+        f"{name}={','.join(sorted(options[name]))}" for name in sorted(options)
+    )
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
@@ -0,0 +1,59 @@
+"""
+Server-side filtering for the issue list.
+
+Every filter compiles to a condition one of the Issue indexes can serve:
+status, course and assigned_to lead an index each, created_at bounds range
+over issue_created_idx or the tail of the others, and department/college
+become `course_id IN (subquery)` rather than joins, so the course index
+still applies. issue_type has no index of its own and only narrows rows
+another condition (or the ordering's index scan) has found.
+"""
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Course
+from .serializers import IssueFilterSerializer
+
+
+def filter_issues(request, queryset, view):
+    """
+    `queryset` narrowed by the request's validated filters and put in the
+    ?ordering= order `view` allows (see KeysetPagination.get_ordering).
+    Raises ValidationError for invalid parameters.
+    """
+    params = IssueFilterSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    data = params.validated_data
+
+    for field in ('status', 'issue_type'):
+        if field in data:
+            queryset = queryset.filter(**{field: data[field]})
+    if 'course' in data:
+        queryset = queryset.filter(course_id=data['course'])
+    if 'department' in data:
+        queryset = queryset.filter(course__in=Course.objects.filter(department_id=data['department']).values('pk'))
+    if 'college' in data:
+        queryset = queryset.filter(
+            course__in=Course.objects.filter(department__college_id=data['college']).values('pk')
+        )
+    if 'assigned_to' in data:
+        if data['assigned_to'] is None:
+            queryset = queryset.filter(assigned_to__isnull=True)
+        else:
+            queryset = queryset.filter(assigned_to_id=data['assigned_to'])
+    if 'created_after' in data:
+        queryset = queryset.filter(created_at__gte=data['created_after'])
+    if 'created_before' in data:
+        queryset = queryset.filter(created_at__lt=data['created_before'])
+
+    return queryset.order_by(*view.pagination_class().get_ordering(view, request))
+
+
+class IssueFilterBackend(BaseFilterBackend):
+    """
+    filter_issues() for IssueViewSet's list and work queue. Detail routes
+    ignore the parameters, like the async detail view.
+    """
+    def filter_queryset(self, request, queryset, view):
+        if view.detail:
+            return queryset
+        return filter_issues(request, queryset, view)
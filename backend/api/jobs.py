@@ -0,0 +1,139 @@
+"""
+Durable, database-backed job queue.
+
+Jobs are plain rows (api.models.Job) written with enqueue() inside the
+caller's transaction, so a job exists exactly when the change that caused it
+committed. `manage.py run_worker` claims due jobs in batches, runs them
+through the handler registered for their kind, and retries failures with
+exponential backoff until `max_attempts` is reached.
+
+A handler takes a list of payloads and returns one list of EmailMessages per
+payload; the worker sends a batch's messages over a single mail connection.
+"""
+import logging
+import uuid
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {
+    'issue.assigned': 'api.notifications.issue_assigned',
+    'issue.status_changed': 'api.notifications.issue_status_changed',
+}
+
+RETRY_BASE_DELAY = 30  # seconds; doubles on every attempt
+RETRY_MAX_DELAY = 60 * 60
+LEASE = timedelta(minutes=5)  # a running job older than this is presumed orphaned
+
+
+def enqueue(kind, payload):
+    return enqueue_many(kind, [payload])[0]
+
+
+def enqueue_many(kind, payloads):
+    """
+    Queue one `kind` job per payload in a single INSERT. Call inside the
+    transaction that makes the change, so the jobs commit or roll back with it.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind {kind!r}")
+    return Job.objects.bulk_create(Job(kind=kind, payload=payload) for payload in payloads)
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+def claim(batch_size, worker_id=None):
+    """
+    Atomically mark up to `batch_size` due jobs as running for this worker and
+    return them, oldest first. Jobs left running by a dead worker are reclaimed
+    once their lease expires.
+    """
+    worker_id = worker_id or uuid.uuid4().hex
+    now = timezone.now()
+    due = (
+        Q(status='pending', run_after__lte=now)
+        | Q(status='running', locked_at__lt=now - LEASE)
+    )
+    candidates = list(
+        Job.objects.filter(due).order_by('run_after', 'id').values_list('id', flat=True)[:batch_size]
+    )
+    # The status condition is re-checked by the UPDATE itself, so two
+    # workers racing for the same row can't both win it
+    Job.objects.filter(due, pk__in=candidates).update(
+        status='running', locked_by=worker_id, locked_at=now, updated_at=now
+    )
+    return list(Job.objects.filter(pk__in=candidates, locked_by=worker_id, locked_at=now).order_by('run_after', 'id'))
+
+
+def _finish(job, error=None):
+    job.attempts += 1
+    if error is None:
+        job.status = 'done'
+        job.last_error = ''
+    elif job.attempts >= job.max_attempts:
+        job.status = 'failed'
+        job.last_error = error
+    else:
+        job.status = 'pending'
+        job.run_after = timezone.now() + backoff(job.attempts)
+        job.last_error = error
+    job.locked_by = ''
+    job.locked_at = None
+    # bulk_update() skips auto_now
+    job.updated_at = timezone.now()
+
+
+def run_batch(jobs):
+    """
+    Run claimed jobs, grouped by kind, and record each outcome.
+    Returns (succeeded, failed) counts.
+    """
+    by_kind = {}
+    for job in jobs:
+        by_kind.setdefault(job.kind, []).append(job)
+
+    errors = {}
+    try:
+        with get_connection(fail_silently=False) as connection:
+            for kind, group in by_kind.items():
+                try:
+                    messages = import_string(HANDLERS[kind])([job.payload for job in group])
+                except Exception as exc:
+                    logger.exception("Job handler %s failed", kind)
+                    messages = [exc] * len(group)
+
+                for job, job_messages in zip(group, messages):
+                    if isinstance(job_messages, Exception):
+                        errors[job.pk] = repr(job_messages)
+                        continue
+                    try:
+                        if job_messages:
+                            connection.send_messages(job_messages)
+                        errors[job.pk] = None
+                    except Exception as exc:
+                        logger.warning("Delivering job %s failed: %r", job.pk, exc)
+                        errors[job.pk] = repr(exc)
+    except Exception as exc:
+        # The mail connection itself failed; retry whatever wasn't sent
+        logger.warning("Mail connection failed: %r", exc)
+        for job in jobs:
+            errors.setdefault(job.pk, repr(exc))
+
+    for job in jobs:
+        _finish(job, errors[job.pk])
+    with transaction.atomic():
+        Job.objects.bulk_update(
+            jobs, ['status', 'attempts', 'run_after', 'locked_by', 'locked_at', 'last_error', 'updated_at']
+        )
+    succeeded = sum(1 for error in errors.values() if error is None)
+    return succeeded, len(jobs) - succeeded
@@ -0,0 +1,165 @@
+import asyncio
+import importlib
+import io
+import statistics
+import sys
+import threading
+import time
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.urls import clear_url_caches
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+from api.benchmarks import add_issues, scratch_database, seed_population
+from api.models import Issue
+
+
+def load_urls(async_reads):
+    """
+    Rebuild the URLconf with the read routes sync or async, as a WSGI or
+    ASGI process would see it.
+    """
+    with override_settings(ASYNC_READ_VIEWS=async_reads):
+        for module in ('users.urls', 'api.urls', 'backend.urls'):
+            importlib.reload(sys.modules[module])
+    clear_url_caches()
+
+
+def percentile(latencies, fraction):
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare WSGI and ASGI throughput and latency (p50/p99) of the read endpoints "
+        "at increasing concurrency. Both handlers are driven in-process, closed loop: "
+        "each simulated client sends its next request when the previous one completes. "
+        "WSGI gets a fixed thread pool, as a threaded WSGI worker would; ASGI runs on "
+        "one event loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50, 100])
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per run")
+        parser.add_argument('--wsgi-threads', type=int, default=8)
+        parser.add_argument('--issues', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            population = seed_population(courses=5, students=500, lecturers=50)
+            add_issues(options['issues'], population)
+            staff = User.objects.create_user(email='bench-asgi@example.com', is_staff=True)
+            issue_id = Issue.objects.values_list('pk', flat=True).first()
+            headers = {'authorization': f'Bearer {AccessToken.for_user(staff)}'}
+            routes = [
+                ('/api/college/', '', {}),
+                ('/api/course/', 'page_size=50', {}),
+                ('/api/issues/', 'page_size=50', headers),
+                ('/api/issues/', 'page_size=50&fields=id,title,status', headers),
+                (f'/api/issues/{issue_id}/', '', headers),
+                ('/api/users/me/', '', headers),
+            ]
+
+            self.stdout.write(
+                f"{'server':>6} {'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}"
+            )
+            try:
+                for concurrency in options['concurrency']:
+                    load_urls(async_reads=False)
+                    self.report('wsgi', concurrency, *self.run_wsgi(routes, concurrency, options))
+                    load_urls(async_reads=True)
+                    self.report('asgi', concurrency, *self.run_asgi(routes, concurrency, options))
+            finally:
+                load_urls(async_reads=False)
+
+    def report(self, server, concurrency, elapsed, latencies):
+        latencies.sort()
+        self.stdout.write(
+            f"{server:>6} {concurrency:>8} {len(latencies) / elapsed:>9,.0f} "
+            f"{statistics.median(latencies) * 1000:>8.2f} {percentile(latencies, 0.99) * 1000:>8.2f}"
+        )
+
+    def run_wsgi(self, routes, concurrency, options):
+        handler = WSGIHandler()
+        # A threaded WSGI worker serves at most this many requests at once
+        workers = threading.BoundedSemaphore(options['wsgi_threads'])
+        per_client = options['requests'] // concurrency
+        latencies = []
+        lock = threading.Lock()
+
+        def call(path, query, headers):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+                'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+                'wsgi.errors': sys.stderr,
+            }
+            environ.update((f"HTTP_{name.upper().replace('-', '_')}", value) for name, value in headers.items())
+            response = handler(environ, lambda status, response_headers: None)
+            b''.join(response)
+            response.close()
+
+        def client(offset):
+            for i in range(per_client):
+                start = time.perf_counter()
+                with workers:
+                    call(*routes[(offset + i) % len(routes)])
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start, latencies
+
+    def run_asgi(self, routes, concurrency, options):
+        handler = ASGIHandler()
+        per_client = options['requests'] // concurrency
+        latencies = []
+
+        async def call(path, query, headers):
+            done = asyncio.Event()
+            received = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # Stay connected until the response is complete
+                await done.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.body' and not message.get('more_body'):
+                    done.set()
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+                'query_string': query.encode(), 'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+                'headers': [(b'host', b'localhost')] + [
+                    (name.encode(), value.encode()) for name, value in headers.items()
+                ],
+            }
+            await handler(scope, receive, send)
+
+        async def client(offset):
+            for i in range(per_client):
+                start = time.perf_counter()
+                await call(*routes[(offset + i) % len(routes)])
+                latencies.append(time.perf_counter() - start)
+
+        async def main():
+            start = time.perf_counter()
+            await asyncio.gather(*(client(n) for n in range(concurrency)))
+            return time.perf_counter() - start
+
+        return asyncio.run(main()), latencies
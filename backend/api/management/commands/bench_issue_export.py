@@ -0,0 +1,56 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from users.models import User
+from api.benchmarks import add_issues, scratch_database, seed_population
+from api.views import IssueViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch database and measure throughput and peak Python memory "
+        "of GET /api/issues/export/ in CSV and NDJSON at growing table sizes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[100_000, 1_000_000],
+            help="Table sizes to measure (seeded incrementally)",
+        )
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        view = IssueViewSet.as_view({'get': 'export'}, **IssueViewSet.export.kwargs)
+
+        with scratch_database():
+            staff = User.objects.create_user(email='bench-staff@example.com', is_staff=True)
+            population = seed_population(students=2_000, lecturers=100)
+            seeded = 0
+            self.stdout.write(f"{'rows':>10} {'format':>7} {'seconds':>8} {'rows/s':>10} {'MB':>8} {'peak MB':>8}")
+            for rows in sorted(options['rows']):
+                add_issues(rows - seeded, population, seed=seeded)
+                seeded = rows
+                for export_format in ('csv', 'ndjson'):
+                    request = factory.get('/api/issues/export/', {'format': export_format})
+                    force_authenticate(request, user=staff)
+
+                    # Throughput without tracing overhead
+                    start = time.perf_counter()
+                    size = sum(len(chunk) for chunk in view(request).streaming_content)
+                    elapsed = time.perf_counter() - start
+
+                    # Peak allocations while streaming the whole body
+                    tracemalloc.start()
+                    for _ in view(request).streaming_content:
+                        pass
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+                    self.stdout.write(
+                        f"{rows:>10,} {export_format:>7} {elapsed:>8.2f} {rows / elapsed:>10,.0f} "
+                        f"{size / 2**20:>8.1f} {peak / 2**20:>8.2f}"
+                    )
+
@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from users.models import User
+from api.benchmarks import analyze, scratch_database, seed_issues, timed
+from api.models import Issue
+from api.views import IssueViewSet
+
+
+def viewset_queryset(user):
+    """
+    The queryset IssueViewSet.get_queryset builds for `user`'s list request.
+    """
+    request = APIRequestFactory().get('/api/issues/')
+    force_authenticate(request, user=user)
+    view = IssueViewSet(action_map={'get': 'list'}, format_kwarg=None)
+    # Also sets view.action, which get_queryset reads
+    view.request = view.initialize_request(request)
+    return view.get_queryset()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch database with issues and print EXPLAIN plans and timings "
+        "for each IssueViewSet.get_queryset access pattern, without and with the "
+        "composite indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Number of issues to seed")
+        parser.add_argument('--page-size', type=int, default=50, help="Rows fetched per query")
+        parser.add_argument('--repeat', type=int, default=5, help="Timing runs per query (median is reported)")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            self.stdout.write(f"Seeding {options['rows']:,} issues...")
+            seeded = seed_issues(options['rows'])
+            scenarios = self.scenarios(seeded)
+            indexes = Issue._meta.indexes
+
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(Issue, index)
+            analyze()
+            before = self.run_phase('Without composite indexes', scenarios, options)
+
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(Issue, index)
+            analyze()
+            after = self.run_phase('With composite indexes', scenarios, options)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nSummary (median ms)'))
+        for name in scenarios:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            self.stdout.write(f"  {name:<40} {before[name]:>10.2f} -> {after[name]:>8.2f}  ({speedup:.1f}x)")
+
+    def scenarios(self, seeded):
+        staff = User(is_staff=True)
+        student = User(pk=seeded['students'][0])
+        return {
+            'staff: all, newest first': lambda: viewset_queryset(staff),
+            'student: my issues, newest first': lambda: viewset_queryset(student),
+            'staff: by status, newest first': lambda: viewset_queryset(staff).filter(status='Pending'),
+            'assigned to me and open': lambda: viewset_queryset(staff).filter(
+                assigned_to_id=seeded['lecturers'][0], status='InProgress'
+            ),
+            'per course backlog': lambda: viewset_queryset(staff).filter(
+                course_id=seeded['courses'][0], status='Pending'
+            ),
+        }
+
+    def run_phase(self, title, scenarios, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{title}'))
+        results = {}
+        for name, build in scenarios.items():
+            queryset = build()[:options['page_size']]
+            elapsed, _ = timed(lambda: list(queryset.all()), repeat=options['repeat'])
+            results[name] = elapsed
+            self.stdout.write(f"\n  {name}: {elapsed:.2f} ms")
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f"    {line}")
+        return results
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from api.benchmarks import add_issues, analyze, scratch_database, seed_population, timed
+from api.models import Issue
+from api.search import search_issues
+
+PLANTED = 50
+RARE_TERM = 'quasar'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch database at growing sizes and compare full-text search "
+        "latency with an icontains scan, for a rare term (a fixed number of "
+        "matches) and a term every issue contains."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--limit', type=int, default=20, help="Results fetched per search")
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            population = seed_population(students=2_000, lecturers=100)
+            seeded = 0
+            self.stdout.write(
+                f"{'rows':>10} {'term':>8} {'fts ms':>9} {'icontains ms':>13} {'matches':>9}"
+            )
+            for rows in sorted(options['rows']):
+                add_issues(rows - seeded, population, seed=seeded)
+                if not seeded:
+                    # The same few issues carry the rare term at every size
+                    Issue.objects.filter(
+                        pk__in=Issue.objects.order_by('?').values('pk')[:PLANTED]
+                    ).update(description=f'Lab marks for the {RARE_TERM} module were not recorded.')
+                seeded = rows
+                analyze()
+
+                for label, term in (('rare', RARE_TERM), ('common', 'course')):
+                    fts, _ = timed(
+                        lambda: list(search_issues(Issue.objects.all(), term)[:options['limit']].values_list('pk', flat=True)),
+                        repeat=options['repeat'],
+                    )
+                    scan, _ = timed(
+                        lambda: list(
+                            Issue.objects.filter(Q(title__icontains=term) | Q(description__icontains=term))
+                            .values_list('pk', flat=True)[:options['limit']]
+                        ),
+                        repeat=options['repeat'],
+                    )
+                    total = search_issues(Issue.objects.all(), term).count()
+                    self.stdout.write(f"{seeded:>10,} {label:>8} {fts:>9.2f} {scan:>13.2f} {total:>9,}")
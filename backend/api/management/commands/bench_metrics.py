@@ -0,0 +1,74 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+from api import metrics
+from api.benchmarks import analyze, scratch_database, seed_scale
+
+METRICS_MIDDLEWARE = 'api.metrics.MetricsMiddleware'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what MetricsMiddleware costs per request: send the same requests "
+        "through a client with the middleware and one without it, alternating "
+        "rounds so drift hits both alike, and print the median time per request "
+        "of each and the difference."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1_000, help="Requests per round and scenario")
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--issues', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            ids = seed_scale(students=1_000, lecturers=50, issues=options['issues'])
+            analyze()
+            staff = {'Authorization': f"Bearer {AccessToken.for_user(User.objects.get(pk=ids['admin']))}"}
+            scenarios = {
+                'college_list (cached)': (reverse('college_list'), {}),
+                'issue-list page': (reverse('issue-list') + '?page_size=50', staff),
+            }
+            with_metrics = self.client(settings.MIDDLEWARE, scenarios)
+            without = self.client([name for name in settings.MIDDLEWARE if name != METRICS_MIDDLEWARE], scenarios)
+
+            self.stdout.write(f"{'scenario':<24} {'without µs':>11} {'with µs':>9} {'overhead':>9}")
+            for name, (path, headers) in scenarios.items():
+                samples = {with_metrics: [], without: []}
+                for n in range(options['rounds']):
+                    # Take turns going first
+                    for client in (with_metrics, without) if n % 2 else (without, with_metrics):
+                        samples[client].append(self.round(client, path, headers, options['requests']))
+                base, measured = statistics.median(samples[without]), statistics.median(samples[with_metrics])
+                self.stdout.write(
+                    f"{name:<24} {base:>11.1f} {measured:>9.1f} {(measured - base) / base * 100:>8.1f}%"
+                )
+        metrics.registry.reset()
+
+    def client(self, middleware, scenarios):
+        """
+        A test client whose handler is built with `middleware`, warmed up on
+        every scenario.
+        """
+        client = Client(HTTP_HOST='localhost')
+        with override_settings(MIDDLEWARE=middleware):
+            # The handler loads its middleware on the first request and keeps it
+            for path, headers in scenarios.values():
+                client.get(path, headers=headers)
+        return client
+
+    def round(self, client, path, headers, requests):
+        """
+        Microseconds per request over `requests` requests.
+        """
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(path, headers=headers)
+        return (time.perf_counter() - start) / requests * 1_000_000
@@ -0,0 +1,154 @@
+import asyncio
+import random
+import re
+import statistics
+import time
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import User
+from api import push
+from api.benchmarks import add_issues, scratch_database, seed_population
+from api.management.commands.bench_asgi import percentile
+from api.models import Issue
+
+FRAME_ID = re.compile(rb'^id: (\d+)$', re.MULTILINE)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hold --clients live update streams (/api/issues/stream/) open against the ASGI "
+        "app in-process, publish issue transitions to the hub and measure fan-out "
+        "latency: from publishing a transition to each recipient's stream writing it. "
+        "Staff streams receive every transition, students and lecturers their own. "
+        "--slow staff streams stop reading after the first write, to show they are "
+        "dropped without holding up the rest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=5_000)
+        parser.add_argument('--staff', type=int, default=250, help="How many of the clients are staff")
+        parser.add_argument('--slow', type=int, default=10, help="How many staff clients never read")
+        parser.add_argument('--events', type=int, default=1_000)
+        parser.add_argument('--rate', type=float, default=200, help="Transitions published per second")
+        parser.add_argument('--issues', type=int, default=20_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not options['slow'] <= options['staff'] <= options['clients']:
+            raise CommandError("Need --slow <= --staff <= --clients")
+        with scratch_database(), override_settings(PUSH_BUS='api.push.LocalBus'):
+            lecturers = max(options['clients'] // 100, 1)
+            students = options['clients'] - options['staff'] - lecturers
+            if students < 1:
+                raise CommandError("--clients leaves no room for students")
+            population = seed_population(departments=1, courses=10, students=students, lecturers=lecturers)
+            add_issues(options['issues'], population, seed=options['seed'])
+            staff = User.objects.create_user(email='bench-push@example.com', is_staff=True)
+            # The slow clients get their own account, so the drain can tell them apart
+            slow_staff = User.objects.create_user(email='bench-push-slow@example.com', is_staff=True)
+            users = [*population['students'], *population['lecturers']]
+            tokens = {pk: str(AccessToken.for_user(User(pk=pk))) for pk in users}
+            # Staff clients share one account, as several admins' tabs would
+            staff_tokens = [str(AccessToken.for_user(user)) for user in (staff, slow_staff)]
+            clients = (
+                [(tokens[pk], False) for pk in users]
+                + [(staff_tokens[n < options['slow']], n < options['slow']) for n in range(options['staff'])]
+            )
+            issues = list(Issue.objects.values_list(
+                'pk', 'student_id', 'assigned_to_id', 'course_id', 'status',
+            ))
+            result = asyncio.run(self.run(clients, issues, slow_staff.pk, options))
+
+        latencies = sorted(result['latencies'])
+        self.stdout.write(f"clients         {len(clients):>10,}")
+        self.stdout.write(f"connect time    {result['connect']:>10.2f} s")
+        self.stdout.write(f"transitions     {options['events']:>10,}")
+        self.stdout.write(f"deliveries      {len(latencies):>10,}")
+        self.stdout.write(f"deliveries/s    {len(latencies) / result['elapsed']:>10,.0f}")
+        if latencies:
+            self.stdout.write(f"latency p50     {statistics.median(latencies) * 1000:>10.2f} ms")
+            self.stdout.write(f"latency p99     {percentile(latencies, 0.99) * 1000:>10.2f} ms")
+            self.stdout.write(f"latency max     {latencies[-1] * 1000:>10.2f} ms")
+        self.stdout.write(f"dropped clients {result['dropped']:>10,}")
+
+    async def run(self, clients, issues, slow_id, options):
+        handler = ASGIHandler()
+        rng = random.Random(options['seed'])
+        published = {}
+        latencies = []
+        disconnect = asyncio.Event()
+
+        async def client(token, slow):
+            received = wrote = False
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                nonlocal wrote
+                if message['type'] == 'http.response.start':
+                    if message['status'] != 200:
+                        raise CommandError(f"Stream refused with {message['status']}")
+                    return
+                if slow and wrote:
+                    # A client whose socket stopped draining
+                    await disconnect.wait()
+                wrote = True
+                if slow:
+                    # What reaches it once released at the end isn't a delivery
+                    return
+                now = time.perf_counter()
+                for event_id in FRAME_ID.findall(message.get('body', b'')):
+                    latencies.append(now - published[int(event_id)])
+
+            path = '/api/issues/stream/'
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+                'query_string': b'', 'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+                'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+            }
+            await handler(scope, receive, send)
+
+        tasks = [asyncio.create_task(client(token, slow)) for token, slow in clients]
+        start = time.perf_counter()
+        while push.hub.count < len(clients):
+            if any(task.done() for task in tasks):
+                # Surfaces the error of a client that failed to connect
+                await next(task for task in tasks if task.done())
+            await asyncio.sleep(0.05)
+        connect = time.perf_counter() - start
+
+        now = timezone.now()
+        start = time.perf_counter()
+        for event_id in range(1, options['events'] + 1):
+            pk, student_id, assigned_to_id, course_id, status = rng.choice(issues)
+            published[event_id] = time.perf_counter()
+            push.hub.publish([push.message(
+                event_id, pk, 'status', status, status, assigned_to_id, course_id, now, student_id,
+            )])
+            await asyncio.sleep(1 / options['rate'])
+        # Let the last deliveries drain. Slow clients never do: with fewer
+        # events than a queue holds, they are never dropped either.
+        subscriptions = [
+            *(s for s in push.hub.staff if s.user_id != slow_id),
+            *(s for group in push.hub.by_user.values() for s in group),
+        ]
+        while any(not subscription.queue.empty() for subscription in subscriptions):
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        dropped = push.hub.dropped
+
+        disconnect.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return {'connect': connect, 'elapsed': elapsed, 'latencies': latencies, 'dropped': dropped}
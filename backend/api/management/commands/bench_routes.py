@@ -0,0 +1,314 @@
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Callable, NamedTuple, Optional
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.benchmarks import analyze, scratch_database, seed_scale
+from api.models import Issue, IssueChange
+from users.models import User
+
+PASSWORD = 'bench-routes-password'
+
+
+class Scenario(NamedTuple):
+    route: str  # URL name
+    label: str
+    method: str
+    user: Optional[str]  # 'admin', 'student', 'lecturer', 'hod' or None for anonymous
+    path: Callable  # (context) -> path
+    body: Optional[Callable] = None  # (context, n) -> JSON body
+    slow: bool = False  # hashes a password per request; run fewer of them
+
+
+def issue_path(route):
+    return lambda ctx: reverse(route, kwargs={'pk': ctx.issue_id()})
+
+
+# Every named route in api/urls.py and users/urls.py needs at least one
+# scenario; BenchmarkSuiteTests fails when a route is added without one.
+SCENARIOS = [
+    Scenario('admin_dashboard', 'dashboard', 'GET', 'admin', lambda ctx: reverse('admin_dashboard')),
+    Scenario('college_list', 'list', 'GET', None, lambda ctx: reverse('college_list')),
+    Scenario('department-list', 'list', 'GET', None, lambda ctx: reverse('department-list')),
+    Scenario('course-list', 'list', 'GET', None, lambda ctx: reverse('course-list')),
+    Scenario('course-list', 'page', 'GET', None, lambda ctx: reverse('course-list') + '?page_size=50'),
+    Scenario('resolution-times', 'departments', 'GET', 'admin', lambda ctx: reverse('resolution-times')),
+    Scenario('issue-aging', 'departments', 'GET', 'admin', lambda ctx: reverse('issue-aging')),
+    # Streams need the ASGI app (see bench_push); the test client gets the WSGI refusal
+    Scenario('issue-stream', 'wsgi refusal', 'GET', 'student', lambda ctx: reverse('issue-stream')),
+    Scenario('issue-changes', 'staff poll', 'GET', 'admin',
+             lambda ctx: reverse('issue-changes') + f'?since={ctx.change_cursor}'),
+    Scenario('issue-changes', 'student poll', 'GET', 'student',
+             lambda ctx: reverse('issue-changes') + f'?since={ctx.change_cursor}'),
+    Scenario('catalog-cache-stats', 'stats', 'GET', 'admin', lambda ctx: reverse('catalog-cache-stats')),
+    Scenario('college-add', 'create', 'POST', 'admin', lambda ctx: reverse('college-add'),
+             lambda ctx, n: {'name': f'Routes College {n}', 'code': f'RC{n}'}),
+    Scenario('department-add', 'create', 'POST', 'admin', lambda ctx: reverse('department-add'),
+             lambda ctx, n: {'department_name': f'Routes Department {n}', 'department_code': f'RD{n}',
+                             'college_id': ctx.ids['colleges'][0]}),
+    Scenario('course-add', 'create', 'POST', 'admin', lambda ctx: reverse('course-add'),
+             lambda ctx, n: {'course_name': f'Routes Course {n}', 'course_code': f'RK{n}',
+                             'department': ctx.ids['departments'][0]}),
+    Scenario('issue-add', 'create', 'POST', 'student', lambda ctx: reverse('issue-add'), lambda ctx, n: {
+        'course': ctx.ids['courses'][0], 'issue_type': 'Missing Marks',
+        'title': f'Routes issue {n}', 'description': 'Coursework marks are missing.',
+    }),
+    Scenario('api-root', 'root', 'GET', 'admin', lambda ctx: reverse('api-root')),
+    Scenario('issue-list', 'staff page', 'GET', 'admin', lambda ctx: reverse('issue-list') + '?page_size=50'),
+    Scenario('issue-list', 'staff sparse', 'GET', 'admin',
+             lambda ctx: reverse('issue-list') + '?page_size=50&fields=id,title,status'),
+    Scenario('issue-list', 'staff filtered', 'GET', 'admin',
+             lambda ctx: reverse('issue-list') + f"?status=Pending&course={ctx.ids['courses'][0]}&page_size=50"),
+    Scenario('issue-list', 'own', 'GET', 'student', lambda ctx: reverse('issue-list')),
+    Scenario('issue-list', 'create', 'POST', 'student', lambda ctx: reverse('issue-list'), lambda ctx, n: {
+        'course': ctx.ids['courses'][0], 'issue_type': 'Appeals',
+        'title': f'Routes appeal {n}', 'description': 'I would like to appeal my result.',
+    }),
+    Scenario('issue-detail', 'read', 'GET', 'admin', issue_path('issue-detail')),
+    Scenario('issue-detail', 'patch', 'PATCH', 'admin', issue_path('issue-detail'),
+             lambda ctx, n: {'title': f'Edited issue {n}'}),
+    Scenario('issue-update-status', 'patch', 'PATCH', 'admin', issue_path('issue-update-status'),
+             lambda ctx, n: {'status': ('Pending', 'InProgress', 'Solved')[n % 3]}),
+    Scenario('issue-assign', 'assign', 'POST', 'admin', issue_path('issue-assign'),
+             lambda ctx, n: {'user_id': ctx.ids['lecturers'][n % len(ctx.ids['lecturers'])]}),
+    Scenario('issue-queue', 'lecturer', 'GET', 'lecturer', lambda ctx: reverse('issue-queue')),
+    Scenario('issue-queue', 'hod', 'GET', 'hod', lambda ctx: reverse('issue-queue')),
+    Scenario('issue-export', 'ndjson', 'GET', 'student', lambda ctx: reverse('issue-export') + '?format=ndjson'),
+    Scenario('issue-search', 'search', 'GET', 'admin', lambda ctx: reverse('issue-search') + '?q=appeal'),
+    Scenario('issue-bulk', 'status', 'POST', 'admin', lambda ctx: reverse('issue-bulk'), lambda ctx, n: {
+        'action': 'update_status', 'status': ('Pending', 'InProgress', 'Solved')[n % 3],
+        'ids': [ctx.issue_id() for _ in range(50)],
+    }),
+    Scenario('token_obtain_pair', 'login', 'POST', None, lambda ctx: reverse('token_obtain_pair'),
+             lambda ctx, n: {'email': ctx.emails['student'], 'password': PASSWORD}, slow=True),
+    Scenario('token_refresh', 'refresh', 'POST', None, lambda ctx: reverse('token_refresh'),
+             lambda ctx, n: {'refresh': ctx.refresh}),
+    Scenario('user_info', 'me', 'GET', 'student', lambda ctx: reverse('user_info')),
+    Scenario('user_register', 'register', 'POST', None, lambda ctx: reverse('user_register'),
+             lambda ctx, n: {'email': f'routes-{n}@example.com', 'password': PASSWORD}, slow=True),
+    Scenario('user-list', 'page', 'GET', 'admin', lambda ctx: reverse('user-list') + '?page_size=50'),
+]
+
+
+def route_names():
+    """
+    Names of the routes declared in api/urls.py and users/urls.py.
+    """
+    from api import urls as api_urls
+    from users import urls as user_urls
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif pattern.name:
+                yield pattern.name
+
+    return set(walk(api_urls.urlpatterns)) | set(walk(user_urls.urlpatterns))
+
+
+def percentile(samples, fraction):
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Context:
+    """
+    Seeded ids and credentials the scenarios draw from.
+    """
+    def __init__(self, ids, seed=0):
+        self.ids = ids
+        self.issue_ids = list(Issue.objects.values_list('pk', flat=True))
+        # A poll that is a few hundred changes behind
+        self.change_cursor = max((IssueChange.objects.aggregate(seq=Max('seq'))['seq'] or 0) - 200, 0)
+        users = {
+            'admin': User.objects.get(pk=ids['admin']),
+            'student': User.objects.get(pk=Issue.objects.values_list('student_id', flat=True).first()),
+            'lecturer': User.objects.get(pk=ids['lecturers'][0]),
+            'hod': User.objects.get(pk=ids['hods'][0]),
+        }
+        self.emails = {role: user.email for role, user in users.items()}
+        self.headers = {
+            role: {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+            for role, user in users.items()
+        }
+        self.refresh = str(RefreshToken.for_user(users['student']))
+        self._counter = itertools.count()
+        self._streams = itertools.count()
+        self._local = threading.local()
+        self._seed = seed
+
+    def issue_id(self):
+        # One generator per client thread
+        rng = getattr(self._local, 'rng', None)
+        if rng is None:
+            rng = self._local.rng = random.Random(f'{self._seed}:{next(self._streams)}')
+        return rng.choice(self.issue_ids)
+
+    def next_number(self):
+        return next(self._counter)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch database with seed_scale() and drive every route in api/urls.py "
+        "and users/urls.py with concurrent clients. Writes p50/p95/p99 latency, "
+        "throughput, status codes and SQL queries per request for each scenario to a "
+        "JSON report, so runs on two commits can be diffed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='bench-routes.json')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=400, help="Requests per scenario")
+        parser.add_argument(
+            '--slow-requests', type=int, default=16,
+            help="Requests for scenarios that hash a password on every call",
+        )
+        parser.add_argument('--route', action='append', help="Only run these route names (repeatable)")
+        parser.add_argument('--colleges', type=int, default=5)
+        parser.add_argument('--students', type=int, default=5_000)
+        parser.add_argument('--lecturers', type=int, default=200)
+        parser.add_argument('--issues', type=int, default=50_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        scale = {key: options[key] for key in ('colleges', 'students', 'lecturers', 'issues', 'seed')}
+        # Failed requests are counted in the report, not logged one by one
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                # A database file, so concurrent writers wait on locks as they would in production
+                with scratch_database(name=os.path.join(directory, 'bench-routes.sqlite3')):
+                    uncovered, results = self.run_all(options, scale)
+        finally:
+            request_logger.setLevel(level)
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'git_revision': git_revision(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'scale': scale,
+            'concurrency': options['concurrency'],
+            'uncovered_routes': uncovered,
+            'scenarios': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def run_all(self, options, scale):
+        start = time.perf_counter()
+        ids = seed_scale(password=PASSWORD, **scale)
+        analyze()
+        self.stdout.write(f"Seeded in {time.perf_counter() - start:.1f}s")
+        context = Context(ids, seed=options['seed'])
+
+        uncovered = sorted(route_names() - {scenario.route for scenario in SCENARIOS})
+        for name in uncovered:
+            self.stderr.write(self.style.WARNING(f"No scenario for route {name!r}"))
+
+        self.stdout.write(
+            f"{'scenario':<36} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>7}"
+        )
+        results = []
+        for scenario in SCENARIOS:
+            if options['route'] and scenario.route not in options['route']:
+                continue
+            requests = options['slow_requests'] if scenario.slow else options['requests']
+            result = self.run(scenario, context, requests, options['concurrency'])
+            results.append(result)
+            self.stdout.write(
+                f"{result['name']:<36} {result['throughput']:>8,.0f} {result['p50_ms']:>8.2f} "
+                f"{result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} {result['queries']['median']:>8g} "
+                f"{result['errors']:>7}"
+            )
+        return uncovered, results
+
+    def run(self, scenario, context, requests, concurrency):
+        """
+        Send `requests` requests split over `concurrency` threads, each with
+        its own client, and summarise them.
+        """
+        latencies, queries, statuses = [], [], Counter()
+        lock = threading.Lock()
+        headers = context.headers.get(scenario.user, {})
+
+        def client(count):
+            http = Client(raise_request_exception=False, HTTP_HOST='localhost')
+            for _ in range(count):
+                path = scenario.path(context)
+                kwargs = {'headers': headers}
+                if scenario.body is not None:
+                    kwargs.update(data=json.dumps(scenario.body(context, context.next_number())),
+                                  content_type='application/json')
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    response = http.generic(scenario.method, path, **kwargs)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    queries.append(len(captured.captured_queries))
+                    statuses[response.status_code] += 1
+            connection.close()
+
+        shares = [requests // concurrency + (n < requests % concurrency) for n in range(concurrency)]
+        threads = [threading.Thread(target=client, args=(share,)) for share in shares if share]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        latencies.sort()
+        return {
+            'name': f'{scenario.route} {scenario.label}',
+            'route': scenario.route,
+            'method': scenario.method,
+            'user': scenario.user,
+            'requests': len(latencies),
+            'throughput': round(len(latencies) / wall, 1),
+            'p50_ms': round(statistics.median(latencies) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'queries': {'median': statistics.median(queries), 'max': max(queries)},
+            'statuses': {str(code): count for code, count in sorted(statuses.items())},
+            'errors': sum(count for code, count in statuses.items() if code >= 500),
+        }
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarks import scratch_database, seed_scale, timed
+from api.models import Course, Issue
+from api.projection import project
+from api.queryplan import plan_queryset
+from api.serializers import CourseSerializer, IssueSerializer
+from users.models import User
+from users.serializers import UserSerializer
+
+CASES = [
+    ('issue', Issue, IssueSerializer, {}),
+    ('issue sparse', Issue, IssueSerializer, {'fields': frozenset({'id', 'title', 'status', 'created_at'})}),
+    ('issue unexpanded', Issue, IssueSerializer, {'expand': frozenset()}),
+    ('user', User, UserSerializer, {}),
+    ('course', Course, CourseSerializer, {}),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF serializers with the compiled projections (api.projection) "
+        "over the same rows: serialization alone, and fetch + serialize + JSON render. "
+        "Times are milliseconds per 10k rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+        per_10k = 10_000 / rows
+        with scratch_database():
+            # Enough courses and users for `rows` of each
+            seed_scale(colleges=10, departments=10, courses=-(-rows // 100), students=rows, issues=rows)
+            self.stdout.write(
+                f"{'case':<18} {'drf ser':>9} {'proj ser':>9} {'drf e2e':>9} {'proj e2e':>9} {'same':>5}"
+            )
+            for label, model, serializer_class, fieldset in CASES:
+                queryset = plan_queryset(model.objects.order_by('pk'), serializer_class, **fieldset)[:rows]
+                projection = project(serializer_class, **fieldset)
+                instances = list(queryset)
+                values = list(projection.values_list(queryset))
+
+                drf_ser, _ = timed(
+                    lambda: serializer_class(instances, many=True, **fieldset).data, repeat=repeat
+                )
+                proj_ser, _ = timed(lambda: projection.render(values), repeat=repeat)
+                drf_e2e, drf_body = timed(
+                    lambda: JSONRenderer().render(serializer_class(list(queryset), many=True, **fieldset).data),
+                    repeat=repeat,
+                )
+                proj_e2e, proj_body = timed(
+                    lambda: projection.render_json(list(projection.values_list(queryset))), repeat=repeat
+                )
+                self.stdout.write(
+                    f"{label:<18} {drf_ser * per_10k:>9.1f} {proj_ser * per_10k:>9.1f} "
+                    f"{drf_e2e * per_10k:>9.1f} {proj_e2e * per_10k:>9.1f} {str(drf_body == proj_body):>5}"
+                )
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test import Client, override_settings
+
+from api.benchmarks import analyze, scratch_database, seed_scale
+from api.management.commands.bench_routes import PASSWORD, SCENARIOS, Context, percentile
+
+MODES = ('stock', 'profile')
+# bench_routes scenarios making up the workload. The bulk change reads
+# before it writes, the case deferred transactions fail on.
+READS = [('issue-list', 'staff page'), ('issue-detail', 'read')]
+WRITES = [('issue-add', 'create'), ('issue-bulk', 'status')]
+
+
+def scenarios(names):
+    return [scenario for scenario in SCENARIOS if (scenario.route, scenario.label) in names]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a mixed read/write workload (issue lists and details, issue creation and "
+        "bulk status changes) through concurrent clients against a SQLite database file, "
+        "once with the stock configuration and once with the production profile "
+        "(api.sqlite_profile). Reports successful requests per second, latency and "
+        "'database is locked' failures for each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=800, help="Requests per mode")
+        parser.add_argument('--write-ratio', type=float, default=0.3)
+        parser.add_argument('--students', type=int, default=2_000)
+        parser.add_argument('--issues', type=int, default=20_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                with scratch_database(name=os.path.join(directory, 'bench-sqlite.sqlite3')):
+                    ids = seed_scale(
+                        students=options['students'], lecturers=100, issues=options['issues'],
+                        password=PASSWORD, seed=options['seed'],
+                    )
+                    analyze()
+                    context = Context(ids, seed=options['seed'])
+                    self.stdout.write(
+                        f"{'mode':<8} {'ok/s':>7} {'read p95':>9} {'write p95':>10} "
+                        f"{'locked':>7} {'errors':>7}"
+                    )
+                    for mode in MODES:
+                        result = self.run(mode, context, options)
+                        self.stdout.write(
+                            f"{mode:<8} {result['throughput']:>7,.0f} {result['read_p95_ms']:>9.1f} "
+                            f"{result['write_p95_ms']:>10.1f} {result['locked']:>7} {result['errors']:>7}"
+                        )
+        finally:
+            request_logger.setLevel(level)
+
+    def run(self, mode, context, options):
+        profile = mode == 'profile'
+        settings_options = connection.settings_dict['OPTIONS']
+        if profile:
+            settings_options['transaction_mode'] = 'IMMEDIATE'
+        else:
+            settings_options.pop('transaction_mode', None)
+            # WAL persists in the file; start the stock run from a rollback journal
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode = DELETE')
+        # Every client thread opens a connection configured for this mode
+        connection.close()
+
+        reads, writes, outcomes = [], [], Counter()
+        lock = threading.Lock()
+        reads_mix, writes_mix = scenarios(READS), scenarios(WRITES)
+
+        def client(count, number):
+            rng = random.Random(f"{options['seed']}:{mode}:{number}")
+            http = Client(raise_request_exception=False, HTTP_HOST='localhost')
+            for _ in range(count):
+                if rng.random() < options['write_ratio']:
+                    samples, scenario = writes, rng.choice(writes_mix)
+                else:
+                    samples, scenario = reads, rng.choice(reads_mix)
+                kwargs = {'headers': context.headers[scenario.user]}
+                if scenario.body is not None:
+                    kwargs.update(data=json.dumps(scenario.body(context, context.next_number())),
+                                  content_type='application/json')
+                start = time.perf_counter()
+                response = http.generic(scenario.method, scenario.path(context), **kwargs)
+                elapsed = time.perf_counter() - start
+                exc = response.exc_info[1] if getattr(response, 'exc_info', None) else None
+                if isinstance(exc, OperationalError) and 'locked' in str(exc):
+                    outcome = 'locked'
+                elif response.status_code >= 500:
+                    outcome = 'error'
+                else:
+                    outcome = 'ok'
+                with lock:
+                    samples.append(elapsed)
+                    outcomes[outcome] += 1
+            connection.close()
+
+        concurrency, requests = options['concurrency'], options['requests']
+        shares = [requests // concurrency + (n < requests % concurrency) for n in range(concurrency)]
+        threads = [threading.Thread(target=client, args=(share, n)) for n, share in enumerate(shares) if share]
+        with override_settings(SQLITE_PROFILE=profile):
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - start
+
+        reads.sort()
+        writes.sort()
+        return {
+            # Failed requests return early; counting them would flatter the stock mode
+            'throughput': outcomes['ok'] / wall,
+            'read_p95_ms': percentile(reads, 0.95) * 1000 if reads else 0,
+            'write_p95_ms': percentile(writes, 0.95) * 1000 if writes else 0,
+            'locked': outcomes['locked'],
+            'errors': outcomes['error'],
+        }
@@ -0,0 +1,188 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from api import catalog_cache
+from api.models import College, Department, Course
+
+
+def read_records(path, file_format=None):
+    """
+    Yield (line number, record) from a CSV or JSON Lines file, one row at a time.
+    CSV records are dicts; JSONL records are left as text for parse_record().
+    """
+    file_format = file_format or ('csv' if Path(path).suffix.lower() == '.csv' else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as handle:
+        if file_format == 'csv':
+            reader = csv.DictReader(handle)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_num, line in enumerate(handle, start=1):
+                if line.strip():
+                    yield line_num, line
+
+
+def parse_record(record):
+    row = json.loads(record) if isinstance(record, str) else record
+    if not isinstance(row, dict):
+        raise ValueError("Expected an object per line")
+    return row
+
+
+def required(row, column):
+    value = str(row.get(column) or '').strip()
+    if not value:
+        raise ValueError(f"'{column}' is required")
+    return value
+
+
+def optional(row, column):
+    return str(row.get(column) or '').strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream colleges, departments and courses from CSV or JSONL files and upsert "
+        "them in batches on their unique codes. Bad rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--colleges', help="File with code, name, description")
+        parser.add_argument('--departments', help="File with department_code, department_name, college (code), details")
+        parser.add_argument('--courses', help="File with course_code, course_name, department_code, details")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Override format detection by file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not any(options[kind] for kind in ('colleges', 'departments', 'courses')):
+            raise CommandError("Nothing to import: pass --colleges, --departments and/or --courses")
+
+        # Codes of parents resolved in memory instead of one query per row
+        self.college_ids = dict(College.objects.values_list('code', 'id'))
+        self.department_ids = dict(Department.objects.values_list('department_code', 'id'))
+
+        specs = {
+            'colleges': (College, 'code', ['name', 'description'], self.build_college),
+            'departments': (Department, 'department_code', ['department_name', 'details', 'college'], self.build_department),
+            'courses': (Course, 'course_code', ['course_name', 'details', 'department'], self.build_course),
+        }
+        total_errors = 0
+        # Parents first so children can resolve their codes
+        for kind in ('colleges', 'departments', 'courses'):
+            if options[kind]:
+                total_errors += self.import_file(kind, options[kind], specs[kind], options)
+
+        # Bulk writes don't send post_save, so invalidate the catalog cache once here
+        catalog_cache.bump_version()
+
+        if total_errors:
+            self.stderr.write(self.style.WARNING(f"Finished with {total_errors} rejected row(s)"))
+
+    def build_college(self, row):
+        return College(
+            code=required(row, 'code'),
+            name=required(row, 'name'),
+            description=optional(row, 'description'),
+        )
+
+    def build_department(self, row):
+        college_code = required(row, 'college')
+        if college_code not in self.college_ids:
+            raise ValueError(f"Unknown college code {college_code!r}")
+        return Department(
+            department_code=required(row, 'department_code'),
+            department_name=required(row, 'department_name'),
+            details=optional(row, 'details'),
+            college_id=self.college_ids[college_code],
+        )
+
+    def build_course(self, row):
+        department_code = required(row, 'department_code')
+        if department_code not in self.department_ids:
+            raise ValueError(f"Unknown department code {department_code!r}")
+        return Course(
+            course_code=required(row, 'course_code'),
+            course_name=required(row, 'course_name'),
+            details=optional(row, 'details'),
+            department_id=self.department_ids[department_code],
+        )
+
+    def import_file(self, kind, path, spec, options):
+        model, key, update_fields, build = spec
+        self.errors = 0
+        rows = written = 0
+        batch = []
+        start = time.perf_counter()
+
+        try:
+            for line_num, record in read_records(path, options['format']):
+                rows += 1
+                try:
+                    obj = build(parse_record(record))
+                    obj.clean_fields(exclude=['college', 'department'])
+                except (ValueError, ValidationError) as exc:
+                    self.report(path, line_num, exc)
+                    continue
+                batch.append((line_num, obj))
+                if len(batch) >= options['batch_size']:
+                    written += self.flush(path, model, key, update_fields, batch)
+                    batch = []
+            if batch:
+                written += self.flush(path, model, key, update_fields, batch)
+        except (OSError, UnicodeDecodeError, csv.Error) as exc:
+            raise CommandError(f"{path}: {exc}")
+
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{kind}: {rows} rows read, {written} upserted, {self.errors} rejected "
+            f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+        ))
+        return self.errors
+
+    def flush(self, path, model, key, update_fields, batch):
+        # A key repeated within one batch can't be upserted twice in one
+        # statement; the last occurrence wins
+        unique = list({getattr(obj, key): (line_num, obj) for line_num, obj in batch}.values())
+        upsert = dict(
+            update_conflicts=True,
+            unique_fields=[key],
+            update_fields=update_fields + ['updated_at'],
+        )
+
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in unique], **upsert)
+            written = len(unique)
+        except DatabaseError:
+            # Typically a clash on another unique column (e.g. the name).
+            # Retry row by row so only the offending rows are rejected.
+            written = 0
+            for line_num, obj in unique:
+                try:
+                    with transaction.atomic():
+                        model.objects.bulk_create([obj], **upsert)
+                    written += 1
+                except DatabaseError as exc:
+                    self.report(path, line_num, exc)
+
+        codes = [getattr(obj, key) for _, obj in unique]
+        if model is College:
+            self.college_ids.update(College.objects.filter(code__in=codes).values_list('code', 'id'))
+        elif model is Department:
+            self.department_ids.update(
+                Department.objects.filter(department_code__in=codes).values_list('department_code', 'id')
+            )
+        return written
+
+    def report(self, path, line_num, exc):
+        self.errors += 1
+        if isinstance(exc, ValidationError):
+            exc = '; '.join(f"{field}: {', '.join(messages)}" for field, messages in exc.message_dict.items())
+        self.stderr.write(f"{path}:{line_num}: {exc}")
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import stats
+from api.models import IssueStat, UserRoleStat
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard summary tables (IssueStat, UserRoleStat) from scratch."
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {IssueStat.objects.count()} issue buckets and "
+            f"{UserRoleStat.objects.count()} role counters in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import aging
+from api.models import IssueAgingStat, OpenIssue, RollupMark
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the aging report up to date from the issues changed since the "
+        "last refresh, once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help="Keep refreshing, pausing this many seconds between runs")
+        parser.add_argument('--batch-size', type=int, default=2_000)
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Discard the counters and count every open issue again",
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            with transaction.atomic():
+                IssueAgingStat.objects.all().delete()
+                OpenIssue.objects.all().delete()
+                RollupMark.objects.filter(name=aging.ROLLUP).update(last_at=None)
+
+        while True:
+            start = time.perf_counter()
+            result = aging.refresh(batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - start
+            if result is None:
+                self.stdout.write("Another refresh ran concurrently; nothing to do")
+            else:
+                read, aged = result
+                self.stdout.write(
+                    f"Read {read} changed issues and aged {aged} in {elapsed:.2f}s"
+                )
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api import events
+from api.models import IssueDurationStat, RollupMark
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new issue events into the duration histograms behind the "
+        "resolution-time percentiles, once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help="Keep rolling up, pausing this many seconds between runs")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help="Discard the histograms and fold in the whole event log again",
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            with transaction.atomic():
+                IssueDurationStat.objects.all().delete()
+                RollupMark.objects.filter(name=events.ROLLUP).update(last_id=0, last_at=None)
+
+        while True:
+            start = time.perf_counter()
+            count = events.rollup(batch_size=options['batch_size'])
+            self.stdout.write(f"Rolled up {count} events in {time.perf_counter() - start:.2f}s")
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,39 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from api import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued jobs (issue notification emails) in batches, retrying "
+        "failures with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Exit once no job is due instead of polling")
+
+    def handle(self, *args, **options):
+        worker_id = uuid.uuid4().hex
+        succeeded = failed = 0
+        self.stdout.write(f"Worker {worker_id} started")
+        try:
+            while True:
+                batch = jobs.claim(options['batch_size'], worker_id)
+                if not batch:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                ok, errors = jobs.run_batch(batch)
+                succeeded += ok
+                failed += errors
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"Ran {len(batch)} job(s): {ok} succeeded, {errors} failed")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"{succeeded} job(s) succeeded, {failed} failed"))
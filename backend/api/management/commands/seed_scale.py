@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import seed_scale
+from api.models import College
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the configured database with a synthetic College -> Department -> Course "
+        "hierarchy, students, lecturers, HODs and issues, using bulk inserts. Every "
+        "account shares one password; the admin account is <prefix>-admin@example.com."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--colleges', type=int, default=5)
+        parser.add_argument('--departments', type=int, default=4, help="Per college")
+        parser.add_argument('--courses', type=int, default=10, help="Per department")
+        parser.add_argument('--students', type=int, default=10_000)
+        parser.add_argument('--lecturers', type=int, default=500)
+        parser.add_argument('--issues', type=int, default=100_000)
+        parser.add_argument('--days', type=int, default=365, help="Spread issue creation over this many days")
+        parser.add_argument('--password', help="Password for every account (default: unusable)")
+        parser.add_argument(
+            '--prefix', default='S',
+            help="Prefix for generated names and codes (at most 3 characters), so runs can coexist",
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if not 1 <= len(prefix) <= 3:
+            raise CommandError("--prefix must be 1 to 3 characters")
+        if options['students'] < 1 and options['issues']:
+            raise CommandError("Issues need at least one student")
+        if min(options['colleges'], options['departments'], options['courses']) < 1:
+            raise CommandError("--colleges, --departments and --courses must be at least 1")
+        if College.objects.filter(code__startswith=f'{prefix}C').exists():
+            raise CommandError(f"Data with prefix {prefix!r} already exists; pick another --prefix")
+
+        start = time.perf_counter()
+        created = seed_scale(
+            colleges=options['colleges'], departments=options['departments'], courses=options['courses'],
+            students=options['students'], lecturers=options['lecturers'], issues=options['issues'],
+            days=options['days'], password=options['password'], prefix=prefix, seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(created['colleges'])} colleges, {len(created['departments'])} departments, "
+            f"{len(created['courses'])} courses, {len(created['students'])} students, "
+            f"{len(created['lecturers'])} lecturers, {len(created['hods'])} HODs and "
+            f"{options['issues']} issues in {elapsed:.2f}s"
+        ))
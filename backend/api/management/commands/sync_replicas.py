@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def copy_database(source, path):
+    """
+    Copy the SQLite database behind connection `source` into the file at
+    `path` with SQLite's online backup, so readers of either never see a
+    half-written file.
+    """
+    source.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Stand-in for replication when the replicas are local SQLite files "
+        "(AITS_DB_REPLICAS): copy the primary database into every replica, "
+        "once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help="Keep copying, pausing this many seconds between rounds")
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replicas configured; set AITS_DB_REPLICAS")
+        for alias in ['default', *settings.DATABASE_REPLICAS]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f"{alias} is not SQLite; use the database's own replication")
+
+        while True:
+            start = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(connections['default'], connections[alias].settings_dict['NAME'])
+            self.stdout.write(
+                f"Copied the primary to {len(settings.DATABASE_REPLICAS)} replica(s) "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
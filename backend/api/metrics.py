@@ -0,0 +1,213 @@
+"""
+Per-endpoint performance metrics.
+
+MetricsMiddleware records, per resolved URL name and method: request count,
+a latency histogram, SQL query count and time (through a DB execute_wrapper
+on every connection), and DRF render time. Each response carries a
+Server-Timing header; the aggregates are served as Prometheus text by
+metrics_view, to staff signed in to the admin or to a scraper sending
+settings.METRICS_TOKEN as a bearer token. `manage.py bench_metrics` measures
+what the middleware costs per request.
+"""
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import catalog_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class EndpointStats:
+    __slots__ = ('requests', 'buckets', 'duration', 'queries', 'db_time', 'render_time')
+
+    def __init__(self):
+        self.requests = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, method, duration, queries, db_time, render_time):
+        with self._lock:
+            stats = self._endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self._endpoints[(endpoint, method)] = EndpointStats()
+            stats.requests += 1
+            stats.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+            stats.duration += duration
+            stats.queries += queries
+            stats.db_time += db_time
+            stats.render_time += render_time
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: (stats.requests, list(stats.buckets), stats.duration,
+                      stats.queries, stats.db_time, stats.render_time)
+                for key, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+registry = Registry()
+
+
+class QueryTimer:
+    """
+    execute_wrapper that counts queries and sums their time for one request.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.queries += 1
+
+
+def _wrap_connections(stack, timer):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timer))
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        request._metrics_render_time = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            _wrap_connections(stack, timer)
+            response = self.get_response(request)
+        return self.record(request, response, timer, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        request._metrics_render_time = 0.0
+        start = time.perf_counter()
+        # Connections are per thread, and the ORM runs this request's queries
+        # in its thread-sensitive worker, so install the wrappers there
+        stack = ExitStack()
+        await sync_to_async(_wrap_connections)(stack, timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.record(request, response, timer, time.perf_counter() - start)
+
+    def record(self, request, response, timer, duration):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.url_name or match.view_name) if match else 'unmatched'
+        render_time = request._metrics_render_time
+        registry.record(endpoint, request.method, duration, timer.queries, timer.elapsed, render_time)
+
+        app_time = max(duration - timer.elapsed - render_time, 0.0)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timer.elapsed * 1000:.2f};desc="{timer.queries} queries"',
+            f'app;dur={app_time * 1000:.2f}',
+            f'render;dur={render_time * 1000:.2f}',
+            f'total;dur={duration * 1000:.2f}',
+        ])
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render right after this hook returns
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._metrics_render_time += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def _labels(endpoint, method, **extra):
+    labels = {'endpoint': endpoint, 'method': method, **extra}
+    return '{%s}' % ','.join(
+        '%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+
+
+def render_prometheus():
+    snapshot = registry.snapshot()
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+
+    family('aits_http_request_duration_seconds', 'histogram', 'Request latency by endpoint.')
+    for (endpoint, method), (requests, buckets, duration, *_rest) in sorted(snapshot.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+            cumulative += count
+            lines.append(
+                f'aits_http_request_duration_seconds_bucket{_labels(endpoint, method, le=bound)} {cumulative}'
+            )
+        lines.append(f'aits_http_request_duration_seconds_sum{_labels(endpoint, method)} {duration:.6f}')
+        lines.append(f'aits_http_request_duration_seconds_count{_labels(endpoint, method)} {requests}')
+
+    for name, index, help_text in (
+        ('aits_db_queries_total', 3, 'SQL queries executed by endpoint.'),
+        ('aits_db_duration_seconds_total', 4, 'Time spent in SQL by endpoint.'),
+        ('aits_render_duration_seconds_total', 5, 'Time spent rendering responses by endpoint.'),
+    ):
+        family(name, 'counter', help_text)
+        for (endpoint, method), values in sorted(snapshot.items()):
+            lines.append(f'{name}{_labels(endpoint, method)} {values[index]:g}')
+
+    cache_stats = catalog_cache.get_stats()
+    for event in ('hits', 'misses', 'not_modified'):
+        name = f'aits_catalog_cache_{event}_total'
+        family(name, 'counter', f'Catalog cache {event.replace("_", " ")} in this process.')
+        lines.append(f'{name} {cache_stats[event]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def may_scrape(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode()):
+            return True
+    return request.user.is_staff
+
+
+def metrics_view(request):
+    # Traffic and latency per endpoint are not for everyone
+    if not may_scrape(request):
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 19:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_stats(apps, schema_editor):
+    Issue = apps.get_model('api', 'Issue')
+    IssueStat = apps.get_model('api', 'IssueStat')
+    UserRoleStat = apps.get_model('api', 'UserRoleStat')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    IssueStat.objects.bulk_create(
+        IssueStat(course_id=row['course_id'], status=row['status'], issue_type=row['issue_type'], count=row['n'])
+        for row in Issue.objects.values('course_id', 'status', 'issue_type').annotate(n=Count('pk')).order_by()
+    )
+    UserRoleStat.objects.bulk_create(
+        UserRoleStat(role=row['role'], count=row['n'])
+        for row in User.objects.values('role').annotate(n=Count('pk')).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_issue_access_pattern_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRoleStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(max_length=10, unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IssueStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('InProgress', 'In Progress'), ('Solved', 'Solved')], max_length=20)),
+                ('issue_type', models.CharField(choices=[('Missing Marks', 'Missing Marks'), ('Appeals', 'Appeals'), ('Corrections', 'Corrections')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='issue_stats', to='api.course')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('course', 'status', 'issue_type'), name='unique_issue_stat_bucket')],
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
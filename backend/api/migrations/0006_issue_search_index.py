@@ -0,0 +1,75 @@
+from django.db import migrations
+
+SQLITE_FORWARDS = [
+    # External-content FTS5 index over api_issue; triggers keep it in sync
+    """
+    CREATE VIRTUAL TABLE api_issue_fts USING fts5(
+        title, description, content='api_issue', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER api_issue_fts_insert AFTER INSERT ON api_issue BEGIN
+        INSERT INTO api_issue_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_issue_fts_delete AFTER DELETE ON api_issue BEGIN
+        INSERT INTO api_issue_fts(api_issue_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_issue_fts_update AFTER UPDATE OF title, description ON api_issue BEGIN
+        INSERT INTO api_issue_fts(api_issue_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO api_issue_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO api_issue_fts(api_issue_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS api_issue_fts_update",
+    "DROP TRIGGER IF EXISTS api_issue_fts_delete",
+    "DROP TRIGGER IF EXISTS api_issue_fts_insert",
+    "DROP TABLE IF EXISTS api_issue_fts",
+]
+
+POSTGRES_FORWARDS = [
+    # A stored generated column is maintained by Postgres on every write
+    """
+    ALTER TABLE api_issue ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX api_issue_search_vector_idx ON api_issue USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS api_issue_search_vector_idx",
+    "ALTER TABLE api_issue DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_issue_and_user_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARDS, 'postgresql': POSTGRES_FORWARDS}),
+            _run({'sqlite': SQLITE_BACKWARDS, 'postgresql': POSTGRES_BACKWARDS}),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-18 21:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_job_queue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IssueDurationStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('resolution', 'Created to solved'), ('Pending', 'Time in Pending'), ('InProgress', 'Time in progress')], max_length=20)),
+                ('bucket', models.SmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.course')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('course', 'metric', 'bucket'), name='unique_issue_duration_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IssueEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('status', 'Status changed'), ('assigned', 'Assigned')], max_length=10)),
+                ('from_status', models.CharField(blank=True, choices=[('Pending', 'Pending'), ('InProgress', 'In Progress'), ('Solved', 'Solved')], max_length=20)),
+                ('to_status', models.CharField(choices=[('Pending', 'Pending'), ('InProgress', 'In Progress'), ('Solved', 'Solved')], max_length=20)),
+                ('status_since', models.DateTimeField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('assigned_to', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('course', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.course')),
+                ('issue', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='api.issue')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['issue', 'id'], name='issue_event_issue_idx')],
+            },
+        ),
+    ]
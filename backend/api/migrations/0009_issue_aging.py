@@ -0,0 +1,60 @@
+# Generated by Django 5.2 on 2026-10-18 21:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_issue_event_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueAgingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('InProgress', 'In Progress'), ('Solved', 'Solved')], max_length=20)),
+                ('bucket', models.SmallIntegerField(choices=[(0, 'Under 7 days'), (1, '7 to 14 days'), (2, '14 to 30 days'), (3, 'Over 30 days')])),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OpenIssue',
+            fields=[
+                ('issue', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='api.issue')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('InProgress', 'In Progress'), ('Solved', 'Solved')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='rollupmark',
+            name='last_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['updated_at'], name='issue_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='issueagingstat',
+            name='course',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.course'),
+        ),
+        migrations.AddField(
+            model_name='openissue',
+            name='course',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.course'),
+        ),
+        migrations.AddConstraint(
+            model_name='issueagingstat',
+            constraint=models.UniqueConstraint(fields=('course', 'status', 'bucket'), name='unique_issue_aging_bucket'),
+        ),
+        migrations.AddIndex(
+            model_name='openissue',
+            index=models.Index(fields=['created_at'], name='open_issue_created_idx'),
+        ),
+    ]
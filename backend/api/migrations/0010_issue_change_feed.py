@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 21:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_changes(apps, schema_editor):
+    Issue = apps.get_model('api', 'Issue')
+    IssueChange = apps.get_model('api', 'IssueChange')
+
+    # Existing issues enter the feed in the order they last changed
+    IssueChange.objects.bulk_create(
+        (
+            IssueChange(issue_id=issue_id, student_id=student_id)
+            for issue_id, student_id in
+            Issue.objects.order_by('updated_at', 'id').values_list('id', 'student_id').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_issue_aging'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('deleted', models.BooleanField(default=False)),
+                ('issue', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.issue')),
+                ('student', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'seq'], name='issue_change_student_idx')],
+            },
+        ),
+        migrations.RunPython(populate_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-18 22:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_issue_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issuechange',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
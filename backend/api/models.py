@@ -2,6 +2,7 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
+from django.utils import timezone
 
 class College(models.Model):
     name = models.CharField(
@@ -172,3 +173,267 @@ class Issue(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Staff list, newest first (keyset pagination walks created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='issue_created_idx'),
+            # "My issues" newest first
+            models.Index(fields=['student', '-created_at'], name='issue_student_created_idx'),
+            # Staff triage by status, newest first
+            models.Index(fields=['status', '-created_at'], name='issue_status_created_idx'),
+            # "Assigned to me and open"; created_at lets the newest-first order skip the sort
+            models.Index(fields=['assigned_to', 'status', '-created_at'], name='issue_assignee_status_idx'),
+            # Per-course backlog
+            models.Index(fields=['course', 'status', '-created_at'], name='issue_course_status_idx'),
+
+            # Issues changed since a watermark (api.aging)
+            models.Index(fields=['updated_at'], name='issue_updated_idx'),
+        ]
+
+
+class IssueStat(models.Model):
+    """
+    Running issue count per (course, status, issue_type), maintained
+    incrementally on Issue writes (see api.stats). Department and college
+    totals are rolled up from this small table instead of scanning issues.
+    """
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='issue_stats')
+    status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES)
+    issue_type = models.CharField(max_length=50, choices=Issue.ISSUE_TYPE_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['course', 'status', 'issue_type'],
+                name='unique_issue_stat_bucket'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} / {self.status} / {self.issue_type}: {self.count}"
+
+
+class IssueEvent(models.Model):
+    """
+    Append-only log of issue transitions: creation, status changes and
+    assignments. Written in the same transaction as the change (see
+    api.events) and never updated or deleted. Rows keep plain ids without
+    foreign key constraints, so deleting an issue, course or user neither
+    cascades into this table nor scans it.
+    """
+    KIND_CHOICES = [
+        ('created', 'Created'),
+        ('status', 'Status changed'),
+        ('assigned', 'Assigned'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    issue = models.ForeignKey(
+        Issue, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='events'
+    )
+    course = models.ForeignKey(
+        Course, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Blank for creation
+    from_status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES)
+    assigned_to = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+        null=True, blank=True, related_name='+'
+    )
+    # When the issue entered from_status (its creation time for `created`)
+    status_since = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # An issue's history, and its latest transition
+            models.Index(fields=['issue', 'id'], name='issue_event_issue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.issue_id}: {self.from_status or '-'} -> {self.to_status} ({self.kind})"
+
+
+class IssueDurationStat(models.Model):
+    """
+    Histogram of issue durations per (course, metric) on a log scale (see
+    api.events.bucket_for), rolled up incrementally from IssueEvent.
+    Histograms add up, so department figures merge their courses' rows.
+    """
+    METRIC_CHOICES = [
+        ('resolution', 'Created to solved'),
+        ('Pending', 'Time in Pending'),
+        ('InProgress', 'Time in progress'),
+    ]
+
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    bucket = models.SmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['course', 'metric', 'bucket'],
+                name='unique_issue_duration_bucket'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} / {self.metric} / {self.bucket}: {self.count}"
+
+
+class RollupMark(models.Model):
+    """
+    High-water mark of an incremental rollup: the last source row id it
+    has folded in, or the time it last ran up to for one that follows a
+    timestamp.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    last_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_id}"
+
+
+class UserRoleStat(models.Model):
+    """
+    Running user count per role, maintained incrementally on User writes.
+    """
+    role = models.CharField(max_length=10, unique=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.role}: {self.count}"
+
+
+class Job(models.Model):
+    """
+    A unit of out-of-band work (e.g. a notification email), written in the
+    same transaction as the change that caused it and run by
+    `manage.py run_worker` (see api.jobs).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest due jobs
+            models.Index(fields=['status', 'run_after'], name='job_ready_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} - {self.kind} ({self.status})"
+
+
+class OpenIssue(models.Model):
+    """
+    The unsolved issues as the aging report last counted them (see
+    api.aging), so a refresh knows which bucket a changed issue leaves.
+    """
+    issue = models.OneToOneField(
+        Issue, on_delete=models.DO_NOTHING, db_constraint=False, primary_key=True, related_name='+'
+    )
+    course = models.ForeignKey(
+        Course, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Issues crossing an age edge between two refreshes
+            models.Index(fields=['created_at'], name='open_issue_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.issue_id} ({self.status})"
+
+
+class IssueAgingStat(models.Model):
+    """
+    Unsolved issues per (course, status, age bucket) as of the last aging
+    refresh.
+    """
+    # Bounded by api.aging.EDGES
+    BUCKET_CHOICES = [
+        (0, 'Under 7 days'),
+        (1, '7 to 14 days'),
+        (2, '14 to 30 days'),
+        (3, 'Over 30 days'),
+    ]
+
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=20, choices=Issue.STATUS_CHOICES)
+    bucket = models.SmallIntegerField(choices=BUCKET_CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['course', 'status', 'bucket'],
+                name='unique_issue_aging_bucket'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} / {self.status} / {self.get_bucket_display()}: {self.count}"
+
+
+class IssueChange(models.Model):
+    """
+    The latest change to each issue, numbered in order for clients syncing
+    deltas (see api.changes). A deleted issue leaves a tombstone.
+    """
+    # AUTOINCREMENT on SQLite: a seq is never handed out twice, even after
+    # the row holding the highest one is superseded
+    seq = models.BigAutoField(primary_key=True)
+    issue = models.ForeignKey(Issue, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    # Owner of the issue, for scoping the feed without a join
+    student = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False,
+        related_name='+'
+    )
+    deleted = models.BooleanField(default=False)
+    # When seq was drawn (see api.watermarks)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # A student's changes past their cursor
+            models.Index(fields=['student', 'seq'], name='issue_change_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.seq}: {self.issue_id}{' (deleted)' if self.deleted else ''}"
+
+
+class CatalogVersion(models.Model):
+    """
+    Version of the cached college/department/course lists (see
+    api.catalog_cache). One row, bumped after each committed catalog write.
+    """
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return str(self.version)
@@ -0,0 +1,71 @@
+"""
+Emails sent for issue lifecycle events. These are job handlers (see
+api.jobs): each takes a batch of event payloads and returns the messages to
+send for each one, loading the issues for the whole batch in one query.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage
+
+from .models import Issue
+
+
+def _issues(payloads):
+    ids = [payload['issue_id'] for payload in payloads]
+    return Issue.objects.select_related('student', 'assigned_to', 'course').in_bulk(ids)
+
+
+def _message(subject, body, recipient):
+    return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [recipient])
+
+
+def issue_assigned(payloads):
+    """
+    Tell the assignee about their new issue, and the student who is handling it.
+    """
+    issues = _issues(payloads)
+    batches = []
+    for payload in payloads:
+        issue = issues.get(payload['issue_id'])
+        # Deleted, or reassigned again before delivery: nothing left to say
+        if issue is None or issue.assigned_to_id != payload['assigned_to_id']:
+            batches.append([])
+            continue
+        assignee = issue.assigned_to
+        batches.append([
+            _message(
+                f"Issue #{issue.pk} assigned to you: {issue.title}",
+                f"{issue.student.get_full_name() or issue.student.email} raised a "
+                f"{issue.issue_type} issue for {issue.course.course_code}:\n\n{issue.description}",
+                assignee.email,
+            ),
+            _message(
+                f"Your issue #{issue.pk} is being handled",
+                f"'{issue.title}' has been assigned to "
+                f"{assignee.get_full_name() or assignee.email} and is now in progress.",
+                issue.student.email,
+            ),
+        ])
+    return batches
+
+
+def issue_status_changed(payloads):
+    """
+    Tell the student their issue's new status.
+    """
+    issues = _issues(payloads)
+    labels = dict(Issue.STATUS_CHOICES)
+    batches = []
+    for payload in payloads:
+        issue = issues.get(payload['issue_id'])
+        if issue is None:
+            batches.append([])
+            continue
+        status = labels.get(payload['status'], payload['status'])
+        batches.append([
+            _message(
+                f"Your issue #{issue.pk} is now {status}",
+                f"The status of '{issue.title}' ({issue.course.course_code}) changed to {status}.",
+                issue.student.email,
+            ),
+        ])
+    return batches
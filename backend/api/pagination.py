@@ -0,0 +1,210 @@
+import base64
+import binascii
+import json
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError as APIValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .projection import list_source
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a unique ordering such as (created_at, id).
+
+    Each page filters past the last row of the previous one instead of using
+    OFFSET, so page 1000 costs the same as page 1. Cursors are opaque tokens
+    holding the ordering values of that last row.
+
+    Views opt in with `pagination_class = KeysetPagination` and may set
+    `keyset_ordering` to a tuple of non-nullable columns ending in a unique one.
+    Views that let clients pick the order with `?ordering=` list the allowed
+    values in `keyset_orderings`, mapping each to such a tuple.
+    Unless `paginate_by_default` or settings.PAGINATE_LISTS_BY_DEFAULT is set,
+    pagination only kicks in when the client sends `cursor` or `page_size`, so
+    existing callers keep getting a plain list. Setting
+    settings.UNPAGINATED_LIST_LIMIT caps that list: a longer one is refused
+    with 400 and has to be read in pages.
+    """
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 500
+    ordering = ('-created_at', '-id')
+    paginate_by_default = False
+    invalid_cursor_message = 'Invalid cursor'
+    too_many_rows_message = 'More than {limit} rows. Request this list in pages with ?page_size= and ?cursor=.'
+
+    def get_ordering(self, view, request=None):
+        """
+        The view's keyset_ordering, or when `request` is given and the view
+        has keyset_orderings, the entry the client chose with ?ordering=.
+        """
+        orderings = getattr(view, 'keyset_orderings', None)
+        choice = request.query_params.get(self.ordering_query_param) if request is not None else None
+        if orderings is not None and choice:
+            if choice not in orderings:
+                raise APIValidationError({self.ordering_query_param: [
+                    f'"{choice}" is not a valid choice. Choose from: {", ".join(orderings)}.'
+                ]})
+            return tuple(orderings[choice])
+        return tuple(getattr(view, 'keyset_ordering', self.ordering))
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def wants_pagination(self, request):
+        params = request.query_params
+        return (
+            self.paginate_by_default
+            or settings.PAGINATE_LISTS_BY_DEFAULT
+            or self.cursor_query_param in params
+            or self.page_size_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        The requested page, or when the client didn't ask for pagination the
+        whole list, which get_paginated_response() then returns as is.
+        """
+        return self.take(list(self.page_queryset(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() for async views, fetching the page with the async ORM.
+        """
+        return self.take([row async for row in self.page_queryset(queryset, request, view)])
+
+    def page_queryset(self, queryset, request, view=None):
+        """
+        The (unevaluated) query for the requested page plus one lookahead
+        row, or if the client didn't ask for pagination, for the list up to
+        one row past the cap, if there is one.
+        """
+        self.request = request
+        self.paginated = self.wants_pagination(request)
+        if not self.paginated:
+            limit = settings.UNPAGINATED_LIST_LIMIT
+            return queryset if limit is None else queryset[:limit + 1]
+
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view, request)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering
+        ]
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+        return queryset[:self.page_size + 1]
+
+    def take(self, rows):
+        if not self.paginated:
+            limit = settings.UNPAGINATED_LIST_LIMIT
+            if limit is not None and len(rows) > limit:
+                raise APIValidationError({
+                    self.page_size_query_param: [self.too_many_rows_message.format(limit=limit)]
+                })
+            return rows
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_more else None
+        return rows
+
+    def seek_filter(self, position):
+        """
+        Rows strictly after `position` in the ordering:
+        (a > x) OR (a = x AND b > y) OR ..., with the leading column also
+        bounded on its own so the database can range-scan an index.
+        """
+        condition = Q()
+        equal_so_far = Q()
+        for name, value in zip(self.ordering, position):
+            column = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal_so_far & Q(**{f'{column}__{lookup}': value})
+            equal_so_far &= Q(**{column: value})
+
+        leading = self.ordering[0]
+        bound = 'lte' if leading.startswith('-') else 'gte'
+        return Q(**{f'{leading.lstrip("-")}__{bound}': position[0]}) & condition
+
+    def ordering_columns(self, view=None, request=None):
+        return [name.lstrip('-') for name in self.get_ordering(view, request)]
+
+    def encode_cursor(self, row):
+        if isinstance(row, tuple):
+            # A values_list() row ending in the ordering columns (see api.projection)
+            row = SimpleNamespace(**{
+                field.attname: value for field, value in zip(self.fields, row[-len(self.fields):])
+            })
+        values = [field.value_to_string(row) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(token.encode()))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_data(self, data):
+        if not self.paginated:
+            return data
+        return {
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class PagedKeysetPagination(KeysetPagination):
+    """
+    KeysetPagination that pages even when the client sends neither `cursor`
+    nor `page_size`, for endpoints that never return everything at once.
+    """
+    paginate_by_default = True
+
+
+class KeysetPaginatedListMixin:
+    """
+    Lets plain APIView list endpoints opt into keyset pagination.
+    """
+    pagination_class = KeysetPagination
+
+    def list_response(self, queryset, serializer_class, **serializer_kwargs):
+        paginator = self.pagination_class()
+        rows, render = list_source(
+            queryset, serializer_class, serializer_kwargs, paginator.ordering_columns(self, self.request)
+        )
+        page = paginator.paginate_queryset(rows, self.request, view=self)
+        return paginator.get_paginated_response(render(page))
@@ -0,0 +1,231 @@
+"""
+Compiled read-only serialization for high-volume lists.
+
+A DRF serializer builds every row field by field: model instances first, then
+get_attribute() and to_representation() per field. For the plain shapes our
+list endpoints use, the same output can come straight from a values_list()
+projection. compile_projection() walks a serializer once, collects the
+lookups it reads, and generates a function turning one row tuple into the
+dict the serializer would have produced.
+
+Only fields whose output is known are compiled: model columns rendered as
+char, integer, boolean, choice, datetime or primary key fields, dotted
+sources across non-nullable relations, and nested serializers of those (None
+when the relation is null). Anything else (method fields, source='*',
+properties, many=True) makes project() return None, and callers fall back to
+the serializer.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .fieldsets import DynamicFieldsMixin
+
+# DRF fields whose to_representation() returns the value of these model
+# columns unchanged
+IDENTITY_FIELDS = {
+    serializers.CharField.to_representation: (models.CharField, models.TextField),
+    serializers.ChoiceField.to_representation: (models.CharField,),
+    serializers.IntegerField.to_representation: (models.IntegerField,),
+    serializers.BooleanField.to_representation: (models.BooleanField,),
+}
+
+
+class UnsupportedField(Exception):
+    pass
+
+
+def datetime_converter(field):
+    """
+    DateTimeField.to_representation() for the default ISO 8601 output, taking
+    the current timezone as an argument instead of looking it up per value.
+    """
+    def convert(value, tz):
+        if tz is None or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+class Projection:
+    """
+    The values_list() lookups a serializer reads and a compiled function
+    building its output dict from one row of them.
+    """
+    def __init__(self, lookups, build):
+        self.lookups = tuple(lookups)
+        # build(row, tz): tz is the current timezone, resolved once per render
+        self.build = build
+
+    def values_list(self, queryset, extra=()):
+        """
+        `queryset` as rows for build(). `extra` lookups are appended after the
+        projected ones (e.g. pagination ordering columns) and ignored by build().
+        """
+        # As expressions, so a lookup already projected still gets its own column
+        return queryset.values_list(*self.lookups, *(F(name) for name in extra))
+
+    def render(self, rows):
+        build = self.build
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        return [build(row, tz) for row in rows]
+
+    def render_json(self, rows):
+        return JSONRenderer().render(self.render(rows))
+
+
+class _Compiler:
+    def __init__(self):
+        self.lookups = {}
+        self.converters = {}
+
+    def column(self, lookup):
+        if lookup not in self.lookups:
+            self.lookups[lookup] = len(self.lookups)
+        return f'r[{self.lookups[lookup]}]'
+
+    def convert(self, converter, expression, *args):
+        name = f'c{len(self.converters)}'
+        self.converters[name] = converter
+        call = ', '.join((expression,) + args)
+        return f'(None if {expression} is None else {name}({call}))'
+
+    def value(self, field, model_field, lookup):
+        expression = self.column(lookup)
+        to_representation = type(field).to_representation
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None or not model_field.many_to_one:
+                raise UnsupportedField(field.field_name)
+            return expression
+        if isinstance(model_field, IDENTITY_FIELDS.get(to_representation, ())):
+            return expression
+        if (
+            to_representation is serializers.DateTimeField.to_representation
+            and isinstance(model_field, models.DateTimeField)
+        ):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if output_format and output_format.lower() == ISO_8601 and not hasattr(field, 'timezone'):
+                return self.convert(datetime_converter(field), expression, 'tz')
+            return self.convert(field.to_representation, expression)
+        raise UnsupportedField(field.field_name)
+
+    def serializer(self, serializer, model, prefix=''):
+        """
+        Source of a dict display for `serializer` rendering `model` rows
+        reached through the lookup `prefix`.
+        """
+        items = []
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, (serializers.SerializerMethodField, serializers.ListSerializer)):
+                raise UnsupportedField(field.field_name)
+            if field.source == '*':
+                raise UnsupportedField(field.field_name)
+
+            source_attrs = field.source.split('.')
+            current = model
+            for depth, attr in enumerate(source_attrs):
+                try:
+                    model_field = current._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    raise UnsupportedField(field.field_name)
+                if model_field.many_to_many or model_field.one_to_many:
+                    raise UnsupportedField(field.field_name)
+                if depth < len(source_attrs) - 1:
+                    # DRF omits the key when a hop is null; keep to the hops that can't be
+                    if not model_field.is_relation or model_field.null:
+                        raise UnsupportedField(field.field_name)
+                    current = model_field.related_model
+            lookup = prefix + '__'.join(source_attrs)
+
+            if isinstance(field, serializers.BaseSerializer):
+                if not model_field.is_relation:
+                    raise UnsupportedField(field.field_name)
+                nested = self.serializer(field, model_field.related_model, lookup + '__')
+                expression = f'(None if {self.column(lookup)} is None else {nested})'
+            else:
+                expression = self.value(field, model_field, lookup)
+            items.append(f'{field.field_name!r}: {expression}')
+        return '{' + ', '.join(items) + '}'
+
+
+def compile_projection(serializer):
+    """
+    Compile a Projection for a serializer instance, raising UnsupportedField
+    if any of its readable fields can't be compiled.
+    """
+    compiler = _Compiler()
+    body = compiler.serializer(serializer, serializer.Meta.model)
+    namespace = dict(compiler.converters)
+    exec(f'def build(r, tz):\n    return {body}\n', namespace)
+    return Projection(compiler.lookups, namespace['build'])
+
+
+@lru_cache(maxsize=256)
+def _projection(serializer_class, fields, expand):
+    if issubclass(serializer_class, DynamicFieldsMixin):
+        serializer = serializer_class(fields=fields, expand=expand)
+    else:
+        serializer = serializer_class()
+    try:
+        return compile_projection(serializer)
+    except UnsupportedField:
+        return None
+
+
+def project(serializer_class, fields=None, expand=None):
+    """
+    The compiled Projection for `serializer_class` with an optional sparse
+    fieldset (see api.fieldsets), or None if it can't be compiled.
+    Compiled once per class and fieldset.
+    """
+    return _projection(
+        serializer_class,
+        frozenset(fields) if fields is not None else None,
+        frozenset(expand) if expand is not None else None,
+    )
+
+
+def list_source(queryset, serializer_class, options=None, extra=()):
+    """
+    (rows, render) for listing `queryset` with `serializer_class` and a
+    fieldset selection: the projected values_list() rows and the compiled
+    renderer when the serializer compiles, otherwise the queryset itself and
+    the serializer. Rows may be sliced or paginated before render(rows).
+    """
+    options = options or {}
+    projection = project(serializer_class, **options)
+    if projection is None:
+        return queryset, lambda rows: serializer_class(rows, many=True, **options).data
+    return projection.values_list(queryset, extra), projection.render
+
+
+class ProjectedListMixin:
+    """
+    Serve a generic view's list() through the compiled projection when its
+    serializer compiles, falling back to the regular list() otherwise.
+    Expects SparseFieldsetMixin for the fieldset selection.
+    """
+    def list(self, request, *args, **kwargs):
+        options = self.fieldset_options()
+        if project(self.get_serializer_class(), **options) is None:
+            return super().list(request, *args, **kwargs)
+        ordering_columns = getattr(self.paginator, 'ordering_columns', None)
+        extra = ordering_columns(self, request) if ordering_columns is not None else ()
+        rows, render = list_source(
+            self.filter_queryset(self.get_queryset()), self.get_serializer_class(), options, extra
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(render(page))
+        return Response(render(rows))
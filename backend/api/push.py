@@ -0,0 +1,217 @@
+"""
+Live issue updates pushed to clients over server-sent events.
+
+Issue creations, assignments and status changes (the transitions api.events
+logs) reach the issue's student, its assignee and every staff user holding
+a stream open at /api/issues/stream/. Each ASGI process keeps a Hub: the
+streams it serves subscribe to it, each with a bounded queue. Delivery
+never waits on a client. One whose queue is full has fallen too far behind:
+it is dropped, told so, and expected to reconnect and catch up with
+/api/issues/changes/, which is also how a client catches up after any
+reconnect.
+
+Transitions get to the hubs over a bus, settings.PUSH_BUS:
+
+- LocalBus hands them to this process's hub when the writing transaction
+  commits. Enough for one ASGI process, and for tests.
+- EventLogBus tails the IssueEvent table, so each process sees the changes
+  made by every other (and by WSGI processes and the worker), at the cost
+  of settings.PUSH_POLL_SECONDS of delay, plus on databases other than
+  SQLite settings.COMMIT_SETTLE_SECONDS (see api.watermarks).
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from . import watermarks
+from .models import IssueEvent
+
+# Named like the job kinds in api.jobs
+EVENT_NAMES = {
+    'created': 'issue.created',
+    'assigned': 'issue.assigned',
+    'status': 'issue.status_changed',
+}
+
+
+class Message(NamedTuple):
+    student_id: Optional[int]
+    assigned_to_id: Optional[int]
+    frame: bytes  # rendered once, written as is to every recipient
+
+
+def message(event_id, issue_id, kind, from_status, to_status, assigned_to_id, course_id, at, student_id):
+    data = json.dumps({
+        'issue': issue_id,
+        'from_status': from_status or None,
+        'status': to_status,
+        'assigned_to': assigned_to_id,
+        'course': course_id,
+        'at': at.isoformat(),
+    }, separators=(',', ':'))
+    frame = f'id: {event_id}\nevent: {EVENT_NAMES[kind]}\ndata: {data}\n\n'
+    return Message(student_id, assigned_to_id, frame.encode())
+
+
+def event_message(event, student_id):
+    return message(
+        event.pk, event.issue_id, event.kind, event.from_status, event.to_status,
+        event.assigned_to_id, event.course_id, event.created_at, student_id,
+    )
+
+
+class Subscription:
+    __slots__ = ('user_id', 'staff', 'queue', 'dropped')
+
+    def __init__(self, user_id, staff, size):
+        self.user_id = user_id
+        self.staff = staff
+        self.queue = asyncio.Queue(size)
+        self.dropped = False
+
+
+class Hub:
+    """
+    This process's subscribers, indexed by user so a message only visits
+    its recipients. Subscriptions are made and served on the event loop;
+    publish() may be called from any thread.
+    """
+    def __init__(self):
+        self.by_user = defaultdict(set)
+        self.staff = set()
+        self.count = 0
+        self.dropped = 0
+        self.loop = None
+        self.listener = None
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id, staff=False):
+        loop = asyncio.get_running_loop()
+        subscription = Subscription(user_id, staff, settings.PUSH_QUEUE_SIZE)
+        with self.lock:
+            if self.loop is not None and self.loop.is_closed():
+                # Left behind by a loop that is gone (tests run one each)
+                self.by_user.clear()
+                self.staff.clear()
+                self.count = 0
+                self.loop = None
+            if self.loop is None:
+                self.loop = loop
+                self.listener = loop.create_task(get_bus().listen(self))
+            (self.staff if staff else self.by_user[user_id]).add(subscription)
+            self.count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            group = self.staff if subscription.staff else self.by_user.get(subscription.user_id)
+            if group is None or subscription not in group:
+                return
+            group.discard(subscription)
+            if not group and not subscription.staff:
+                del self.by_user[subscription.user_id]
+            self.count -= 1
+            if not self.count:
+                # The next subscriber may come on another loop
+                self.listener.cancel()
+                self.loop = self.listener = None
+
+    def publish(self, messages):
+        loop = self.loop
+        if loop is None or loop.is_closed() or not messages:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.deliver(messages)
+        else:
+            loop.call_soon_threadsafe(self.deliver, messages)
+
+    def deliver(self, messages):
+        for item in messages:
+            recipients = set(self.staff)
+            for user_id in (item.student_id, item.assigned_to_id):
+                if user_id is not None:
+                    recipients.update(self.by_user.get(user_id, ()))
+            for subscription in recipients:
+                try:
+                    subscription.queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    self.drop(subscription)
+
+    def drop(self, subscription):
+        """
+        Cut off a subscriber that can't keep up: free its backlog and leave
+        it the None that ends its stream.
+        """
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        self.dropped += 1
+        queue = subscription.queue
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+
+hub = Hub()
+
+
+def get_bus():
+    return import_string(settings.PUSH_BUS)
+
+
+def announce(events):
+    """
+    Push logged transitions, given as (IssueEvent, student id) pairs, once
+    the current transaction commits.
+    """
+    if events:
+        get_bus().publish(events)
+
+
+class LocalBus:
+    @staticmethod
+    def publish(events):
+        messages = [event_message(event, student_id) for event, student_id in events]
+        transaction.on_commit(lambda: hub.publish(messages))
+
+    @staticmethod
+    async def listen(hub):
+        pass
+
+
+class EventLogBus:
+    @staticmethod
+    def publish(events):
+        # Committed events are found by listen()
+        pass
+
+    @staticmethod
+    async def listen(hub, batch_size=1_000):
+        events = IssueEvent.objects.order_by('pk').values_list(
+            'pk', 'issue_id', 'kind', 'from_status', 'to_status', 'assigned_to_id', 'course_id',
+            'created_at', 'issue__student_id',
+        )
+        latest = await watermarks.asettled(IssueEvent.objects.all(), 'created_at')
+        if latest is None:
+            latest = await IssueEvent.objects.order_by('-pk').values_list('pk', flat=True).afirst()
+        last_id = latest or 0
+        while True:
+            await asyncio.sleep(settings.PUSH_POLL_SECONDS)
+            pending = events.filter(pk__gt=last_id)
+            # Only up to where no event can still commit below the ones read
+            bound = await watermarks.asettled(pending, 'created_at')
+            if bound is not None:
+                pending = pending.filter(pk__lte=bound)
+            rows = [row async for row in pending[:batch_size]]
+            if rows:
+                last_id = rows[-1][0]
+                hub.publish([message(*row) for row in rows])
@@ -0,0 +1,137 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    The joins and columns a serializer needs from the database.
+    """
+    def __init__(self, select_related=(), prefetch_related=(), only=()):
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.only = tuple(only)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def _all_columns(model, prefix):
+    return [prefix + field.name for field in model._meta.concrete_fields]
+
+
+def _walk(serializer, model, prefix, plan):
+    """
+    Collect the select_related paths and only() columns needed to render
+    `serializer` for instances of `model` reached through `prefix`.
+    """
+    columns = {prefix + model._meta.pk.name}
+    load_everything = False
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+            # We can't see what the method touches, so load the whole row
+            load_everything = True
+            continue
+
+        source_attrs = field.source.split('.')
+        current_model, current_prefix = model, prefix
+        owner_columns = columns
+
+        for depth, attr in enumerate(source_attrs):
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A property or method on the model
+                if depth == 0:
+                    load_everything = True
+                else:
+                    owner_columns.update(_all_columns(current_model, current_prefix))
+                break
+
+            path = current_prefix + attr
+            is_last = depth == len(source_attrs) - 1
+
+            if model_field.many_to_many or model_field.one_to_many:
+                plan['prefetch_related'].add(path)
+                break
+
+            if not model_field.is_relation:
+                owner_columns.add(path)
+                break
+
+            # Forward foreign key / one-to-one
+            owner_columns.add(path)
+            related_model = model_field.related_model
+
+            if is_last:
+                nested = field.child if isinstance(field, serializers.ListSerializer) else field
+                if isinstance(nested, serializers.BaseSerializer):
+                    plan['select_related'].add(path)
+                    plan['only'].update(_walk(nested, related_model, path + '__', plan))
+                # A primary key related field only needs the local column
+                break
+
+            # Dotted source such as "department.department_name"
+            plan['select_related'].add(path)
+            owner_columns = plan['only']
+            owner_columns.add(path + '__' + related_model._meta.pk.name)
+            current_model, current_prefix = related_model, path + '__'
+
+    if load_everything:
+        columns.update(_all_columns(model, prefix))
+    return columns
+
+
+@lru_cache(maxsize=None)
+def plan_for(serializer_class):
+    """
+    Derive (once per serializer class) the query plan needed to render it.
+    """
+    return build_plan(serializer_class())
+
+
+def build_plan(serializer):
+    model = serializer.Meta.model
+    plan = {'select_related': set(), 'prefetch_related': set(), 'only': set()}
+    plan['only'].update(_walk(serializer, model, '', plan))
+
+    # Prefetched relations can't be combined with a restricted column list
+    # on the same path, so leave those rows fully loaded
+    only = plan['only'] if not plan['prefetch_related'] else ()
+    return QueryPlan(
+        select_related=sorted(plan['select_related']),
+        prefetch_related=sorted(plan['prefetch_related']),
+        only=sorted(only),
+    )
+
+
+@lru_cache(maxsize=256)
+def _plan_for_fieldset(serializer_class, fields, expand, always):
+    plan = build_plan(serializer_class(fields=fields, expand=expand))
+    if plan.only and always:
+        plan.only = tuple(sorted(set(plan.only) | set(always)))
+    return plan
+
+
+def plan_queryset(queryset, serializer_class, fields=None, expand=None, always=()):
+    """
+    Return `queryset` with the joins and columns `serializer_class` reads,
+    so rendering it runs a constant number of queries.
+
+    `fields` and `expand` narrow the plan to a sparse fieldset (see
+    api.fieldsets); `always` names extra local columns the view itself
+    reads, such as its ordering or permission columns.
+    """
+    if fields is None and expand is None:
+        return plan_for(serializer_class).apply(queryset)
+    return _plan_for_fieldset(serializer_class, fields, expand, tuple(always)).apply(queryset)
@@ -0,0 +1,18 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class CSVRenderer(JSONRenderer):
+    """
+    Lets `?format=csv` pass content negotiation for views that stream their
+    own body. Anything rendered through it (errors) is still JSON.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Newline-delimited JSON counterpart of CSVRenderer.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
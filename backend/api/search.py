@@ -0,0 +1,59 @@
+"""
+Full-text search over issue titles and descriptions.
+
+Backed by the index created in migration 0006: an FTS5 table on SQLite and a
+GIN-indexed tsvector column on PostgreSQL, both kept in sync by the database
+itself. Other backends fall back to an (unindexed) icontains filter.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query or '')
+
+
+def _fts5_query(tokens):
+    # Quote every token so user input can't inject FTS5 syntax; the last
+    # token is a prefix match for search-as-you-type
+    terms = ['"%s"' % token for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_issues(queryset, query):
+    """
+    Filter `queryset` to issues matching every word in `query`, best match first.
+    Returns None when `query` contains no searchable words.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+
+    if connection.vendor == 'sqlite':
+        return queryset.extra(
+            tables=['api_issue_fts'],
+            where=['api_issue_fts.rowid = api_issue.id', 'api_issue_fts MATCH %s'],
+            params=[_fts5_query(tokens)],
+            select={'rank': 'bm25(api_issue_fts, 10.0, 1.0)'},
+            order_by=['rank'],
+        )
+
+    if connection.vendor == 'postgresql':
+        text = ' '.join(tokens)
+        return queryset.extra(
+            where=["api_issue.search_vector @@ plainto_tsquery('english', %s)"],
+            params=[text],
+            select={'rank': "ts_rank(api_issue.search_vector, plainto_tsquery('english', %s))"},
+            select_params=[text],
+            order_by=['-rank'],
+        )
+
+    condition = Q()
+    for token in tokens:
+        condition &= Q(title__icontains=token) | Q(description__icontains=token)
+    return queryset.filter(condition)
@@ -1,8 +1,10 @@
 # backend/api/serializers.py
+from django.db import transaction
 from rest_framework import serializers
 from users.models import User
 from .models import College, Department, Course, Issue
 from users.serializers import UserSerializer
+from .fieldsets import DynamicFieldsMixin
 
 # Course related serializers
 class CourseSerializer(serializers.Serializer):
@@ -40,13 +42,6 @@ class PendingGradingSerializer(serializers.Serializer):
     submissions = serializers.IntegerField()
     course = serializers.CharField(max_length=255)
 
-# Activity serializer
-class ActivitySerializer(serializers.Serializer):
-    id = serializers.IntegerField()
-    type = serializers.CharField(max_length=255)
-    details = serializers.CharField(max_length=255)
-    date = serializers.DateField()
-
 # Dashboard serializers
 class StudentDashboardSerializer(serializers.Serializer):
     courses = StudentCourseSerializer(many=True)
@@ -62,31 +57,36 @@ class UserStatsSerializer(serializers.Serializer):
     total = serializers.IntegerField()
     students = serializers.IntegerField()
     lecturers = serializers.IntegerField()
+    hods = serializers.IntegerField()
     admins = serializers.IntegerField()
 
-class CourseStatsSerializer(serializers.Serializer):
-    active = serializers.IntegerField()
-    archived = serializers.IntegerField()
-
-class SystemHealthSerializer(serializers.Serializer):
+class IssueBreakdownSerializer(serializers.Serializer):
+    college_id = serializers.IntegerField()
+    college_name = serializers.CharField()
+    department_id = serializers.IntegerField()
+    department_name = serializers.CharField()
     status = serializers.CharField()
-    uptime = serializers.CharField()
-    recent_issues = serializers.ListField(child=serializers.CharField(), required=False)
+    issue_type = serializers.CharField()
+    count = serializers.IntegerField()
+
+class IssueStatsSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    by_status = serializers.DictField(child=serializers.IntegerField())
+    by_issue_type = serializers.DictField(child=serializers.IntegerField())
+    by_department = IssueBreakdownSerializer(many=True)
 
 class AdminDashboardSerializer(serializers.Serializer):
     users = UserStatsSerializer()
-    courses = CourseStatsSerializer()
-    system_health = SystemHealthSerializer()
-    recent_activities = ActivitySerializer(many=True)
+    issues = IssueStatsSerializer()
 
-class CollegeSerializer(serializers.ModelSerializer):
+class CollegeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = College
         fields = ['id', 'name', 'code', 'description', 'created_at', 'updated_at']
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     college = CollegeSerializer(read_only=True)
-    college_name = serializers.SerializerMethodField()
+    college_name = serializers.CharField(source='college.name', read_only=True)
     college_id = serializers.PrimaryKeyRelatedField(
         source='college',
         queryset=College.objects.all(),
@@ -97,19 +97,18 @@ class DepartmentSerializer(serializers.ModelSerializer):
         model = Department
         fields = ['id', 'department_name', 'department_code', 'details', 'college', 'college_name', 'college_id']
         read_only_fields = ['id']
-    
-    def get_college_name(self, obj):
-        return obj.college.name if obj.college else None
+        expandable = {'college': CollegeSerializer}
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     department_name = serializers.CharField(source="department.department_name", read_only=True)  # Get department name
     department_code = serializers.CharField(source="department.department_code", read_only=True)  # Get department code
 
     class Meta:
         model = Course  # Correct the model
         fields = ['id', 'course_code', 'course_name', 'details', 'department', 'department_name', 'department_code', 'created_at', 'updated_at']
+        expandable = {'department': DepartmentSerializer}
 
-class IssueSerializer(serializers.ModelSerializer):
+class IssueSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     student = UserSerializer(read_only=True)
     course = CourseSerializer(read_only=True)
     assigned_to = UserSerializer(read_only=True)
@@ -121,6 +120,7 @@ class IssueSerializer(serializers.ModelSerializer):
             'description', 'status', 'created_at', 'updated_at', 'assigned_to'
         ]
         read_only_fields = ['student', 'created_at', 'updated_at']
+        expandable = {'student': UserSerializer, 'course': CourseSerializer, 'assigned_to': UserSerializer}
 
 class IssueCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -135,5 +135,82 @@ class IssueCreateSerializer(serializers.ModelSerializer):
         validated_data['student'] = user
         validated_data['status'] = 'Pending'
         
-        # Create and return the issue
-        return Issue.objects.create(**validated_data)
+        # Create and return the issue, logging its creation in the same transaction
+        with transaction.atomic():
+            return Issue.objects.create(**validated_data)
+
+class IssueBulkActionSerializer(serializers.Serializer):
+    """
+    Validates a bulk triage request: a list of issue ids plus one action.
+    """
+    ACTION_CHOICES = ['assign', 'update_status']
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000
+    )
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
+    user_id = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Issue.STATUS_CHOICES, required=False)
+
+    def validate(self, data):
+        if data['action'] == 'assign':
+            if not data.get('user_id'):
+                raise serializers.ValidationError({"user_id": "User ID is required"})
+            # Resolve and check the assignee once for the whole batch
+            try:
+                assignee = User.objects.only('id', 'role').get(id=data['user_id'])
+            except User.DoesNotExist:
+                raise serializers.ValidationError({"user_id": "User not found"})
+            if assignee.role not in [User.Role.LECTURER, User.Role.HOD]:
+                raise serializers.ValidationError(
+                    {"user_id": "Issues can only be assigned to lecturers or heads of department"}
+                )
+            data['assignee'] = assignee
+        elif not data.get('status'):
+            raise serializers.ValidationError({"status": "Status is required"})
+
+        # Keep the first occurrence of each id, in request order
+        data['ids'] = list(dict.fromkeys(data['ids']))
+        return data
+
+
+class IssueChangesSerializer(serializers.Serializer):
+    """
+    Validates the change feed's query parameters (see api.changes).
+    """
+    # A cursor from an earlier call; without one only the cursor is returned
+    since = serializers.IntegerField(min_value=0, required=False)
+
+
+class IssueFilterSerializer(serializers.Serializer):
+    """
+    Validates the issue list's filter query parameters (see api.filters).
+    """
+    status = serializers.ChoiceField(choices=Issue.STATUS_CHOICES, required=False)
+    issue_type = serializers.ChoiceField(choices=Issue.ISSUE_TYPE_CHOICES, required=False)
+    course = serializers.IntegerField(min_value=1, required=False)
+    department = serializers.IntegerField(min_value=1, required=False)
+    college = serializers.IntegerField(min_value=1, required=False)
+    # A user id, or "none" for unassigned issues
+    assigned_to = serializers.CharField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    def validate_assigned_to(self, value):
+        if value.lower() == 'none':
+            return None
+        try:
+            user_id = int(value)
+        except ValueError:
+            raise serializers.ValidationError('Must be a user id or "none".')
+        if user_id < 1:
+            raise serializers.ValidationError('Must be a user id or "none".')
+        return user_id
+
+    def validate(self, data):
+        after, before = data.get('created_after'), data.get('created_before')
+        if after is not None and before is not None and after >= before:
+            raise serializers.ValidationError({"created_before": "Must be later than created_after"})
+        return data
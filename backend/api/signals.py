@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import aging, catalog_cache, changes, events, stats
+from .models import College, Department, Course, Issue
+
+
+@receiver([post_save, post_delete], sender=College)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_catalog_cache(sender, **kwargs):
+    # Bump after commit so a concurrent read can't cache the old rows
+    # under the new version
+    transaction.on_commit(catalog_cache.bump_version)
+
+
+# The dashboard aggregates and the event log start from the stored row, not
+# from the values an instance was loaded with: a concurrent write may have
+# changed or deleted the issue since. The row stays locked until the
+# caller's transaction ends, so a concurrent save or delete of the same
+# issue waits and then sees this one's outcome.
+
+EVENT_FIELDS = ('status', 'assigned_to_id')
+
+
+@receiver([pre_save, pre_delete], sender=Issue)
+def load_stored_issue(sender, instance, using, **kwargs):
+    instance._stats_key = instance._event_state = None
+    if instance._state.adding:
+        return
+    stored = Issue.objects.using(using).filter(pk=instance.pk)
+    if transaction.get_connection(using).in_atomic_block:
+        stored = stored.select_for_update()
+    row = stored.values(*dict.fromkeys(stats.ISSUE_KEY_FIELDS + EVENT_FIELDS)).first()
+    if row is not None:
+        instance._stats_key = stats.issue_key(row)
+        instance._event_state = tuple(row[field] for field in EVENT_FIELDS)
+
+
+# Dashboard aggregates: a save moves the issue from its stored bucket to its
+# new one. An issue already deleted by someone else has no bucket to leave.
+
+@receiver(post_save, sender=Issue)
+def update_issue_stats(sender, instance, created, **kwargs):
+    # Columns that are still deferred weren't changed, so keep their old values
+    new_key = stats.issue_key(instance.__dict__, fallback=instance._stats_key)
+    stats.move_issue(None if created else instance._stats_key, new_key)
+    instance._stats_key = new_key
+
+
+@receiver(post_delete, sender=Issue)
+def remove_issue_stats(sender, instance, **kwargs):
+    stats.move_issue(instance._stats_key, None)
+
+
+# Issue event log: a save logs the move from the stored status and assignee.
+
+@receiver(post_save, sender=Issue)
+def log_issue_event(sender, instance, created, **kwargs):
+    if created:
+        events.record_created(instance)
+        new = (instance.status, instance.assigned_to_id)
+    else:
+        old = instance._event_state
+        new = tuple(instance.__dict__.get(field, value) for field, value in zip(EVENT_FIELDS, old))
+        events.record(instance, old, new)
+    instance._event_state = new
+
+
+# Aging report. Changes are picked up by aging.refresh(); deleted issues
+# leave nothing for it to find, so they are taken out here.
+
+@receiver(post_delete, sender=Issue)
+def forget_issue_aging(sender, instance, **kwargs):
+    aging.forget(instance.pk)
+
+
+# Change feed for delta sync
+
+@receiver(post_save, sender=Issue)
+def record_issue_change(sender, instance, **kwargs):
+    changes.record_issue(instance)
+
+
+@receiver(post_delete, sender=Issue)
+def record_issue_tombstone(sender, instance, **kwargs):
+    changes.record_issue(instance, deleted=True)
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_user_role(sender, instance, **kwargs):
+    instance._stats_role = instance.__dict__.get('role') if instance.pk else None
+
+
+@receiver([pre_save, pre_delete], sender=settings.AUTH_USER_MODEL)
+def load_user_role(sender, instance, **kwargs):
+    if instance.pk and instance._stats_role is None and not instance._state.adding:
+        instance._stats_role = (
+            sender.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_user_stats(sender, instance, created, **kwargs):
+    new_role = instance.__dict__.get('role', instance._stats_role)
+    stats.move_user(None if created else instance._stats_role, new_role)
+    instance._stats_role = new_role
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def remove_user_stats(sender, instance, **kwargs):
+    stats.move_user(instance._stats_role, None)
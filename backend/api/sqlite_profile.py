@@ -0,0 +1,46 @@
+"""
+Opt-in SQLite tuning for production, enabled by settings.SQLITE_PROFILE.
+
+Stock SQLite keeps a rollback journal, so readers and the writer block each
+other. Its transactions begin DEFERRED: one that reads before it writes asks
+for the write lock only at its first write, and if another connection holds
+it SQLite fails at once with "database is locked" instead of waiting, since
+waiting could deadlock. The profile:
+
+- switches the database to WAL, so readers run alongside the writer and
+  never see its uncommitted pages;
+- relaxes synchronous to NORMAL, which under WAL can lose the last commits
+  on power loss but never corrupts the database;
+- waits up to busy_timeout for locks instead of failing;
+- gives every connection a larger page cache and memory-maps the file;
+- begins atomic() blocks with BEGIN IMMEDIATE (transaction_mode in the
+  database OPTIONS, see settings.py), so a writer takes the write lock up
+  front, where busy_timeout applies.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # milliseconds
+    'cache_size': -64_000,  # negative: KiB, so 64 MB per connection
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_profile(connection):
+    pragmas = dict(PRAGMAS)
+    if connection.is_in_memory_db() or connection.alias in settings.DATABASE_REPLICAS:
+        # WAL needs a database file, and switching to it writes to the file
+        del pragmas['journal_mode']
+    for name, value in pragmas.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_PROFILE:
+        apply_profile(connection)
@@ -0,0 +1,149 @@
+"""
+Incrementally maintained dashboard aggregates.
+
+IssueStat keeps one counter per (course, status, issue_type) and UserRoleStat
+one per role. Writes adjust the affected counters by +/-1 (see api.signals),
+and the dashboard sums these small tables instead of running COUNT(*) over
+issues and users. rebuild() recomputes everything from scratch.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import Issue, IssueStat, UserRoleStat
+
+ISSUE_KEY_FIELDS = ('course_id', 'status', 'issue_type')
+
+
+def adjust_counter(model, delta, **key):
+    """
+    Add `delta` to the `count` of the `model` row identified by `key`,
+    creating it for a positive delta. Shared by the counter tables here and
+    in api.events and api.aging.
+    """
+    if not delta:
+        return
+    if model.objects.filter(**key).update(count=F('count') + delta) or delta < 0:
+        # Nothing to decrement when the bucket is gone (e.g. its course was deleted)
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=delta, **key)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**key).update(count=F('count') + delta)
+
+
+def issue_key(values, fallback=None):
+    """
+    The IssueStat bucket for a dict of Issue column values, or None if unknown.
+    Columns missing from `values` are taken from the `fallback` key.
+    """
+    if fallback is not None:
+        values = {**dict(zip(ISSUE_KEY_FIELDS, fallback)), **values}
+    if any(values.get(field) is None for field in ISSUE_KEY_FIELDS):
+        return None
+    return tuple(values[field] for field in ISSUE_KEY_FIELDS)
+
+
+def move_issue(old_key, new_key, count=1):
+    """
+    Move `count` issues from bucket `old_key` to `new_key`. Either may be None
+    for a creation or deletion.
+    """
+    if old_key == new_key:
+        return
+    # Joins the caller's transaction when there is one, without a savepoint
+    with transaction.atomic(savepoint=False):
+        if old_key is not None:
+            adjust_counter(IssueStat, -count, **dict(zip(ISSUE_KEY_FIELDS, old_key)))
+        if new_key is not None:
+            adjust_counter(IssueStat, count, **dict(zip(ISSUE_KEY_FIELDS, new_key)))
+
+
+def move_issues_to_status(issue_ids, status):
+    """
+    Account for a set-based UPDATE that sets `status` on `issue_ids`.
+    Call inside the same transaction, before the UPDATE runs.
+    """
+    buckets = (
+        Issue.objects.filter(pk__in=issue_ids).exclude(status=status)
+        .values(*ISSUE_KEY_FIELDS).annotate(n=Count('pk')).order_by()
+    )
+    for bucket in buckets:
+        old_key = issue_key(bucket)
+        move_issue(old_key, (old_key[0], status, old_key[2]), count=bucket['n'])
+
+
+def move_user(old_role, new_role, count=1):
+    if old_role == new_role:
+        return
+    with transaction.atomic(savepoint=False):
+        if old_role:
+            adjust_counter(UserRoleStat, -count, role=old_role)
+        if new_role:
+            adjust_counter(UserRoleStat, count, role=new_role)
+
+
+@transaction.atomic
+def rebuild():
+    """
+    Recompute both summary tables from the source rows.
+    """
+    IssueStat.objects.all().delete()
+    IssueStat.objects.bulk_create(
+        IssueStat(count=row['n'], **{field: row[field] for field in ISSUE_KEY_FIELDS})
+        for row in Issue.objects.values(*ISSUE_KEY_FIELDS).annotate(n=Count('pk')).order_by()
+    )
+    UserRoleStat.objects.all().delete()
+    UserRoleStat.objects.bulk_create(
+        UserRoleStat(role=row['role'], count=row['n'])
+        for row in get_user_model().objects.values('role').annotate(n=Count('pk')).order_by()
+    )
+
+
+def dashboard():
+    """
+    Issue counts by status, issue type and department/college, plus user
+    counts by role, read from the summary tables.
+    """
+    role_counts = dict(UserRoleStat.objects.values_list('role', 'count'))
+    users = {
+        'total': sum(role_counts.values()),
+        'students': role_counts.get('STUDENT', 0),
+        'lecturers': role_counts.get('LECTURER', 0),
+        'hods': role_counts.get('HOD', 0),
+        'admins': role_counts.get('ADMIN', 0),
+    }
+
+    rows = (
+        IssueStat.objects.filter(count__gt=0)
+        .values(
+            'status', 'issue_type',
+            department_id=F('course__department_id'),
+            department_name=F('course__department__department_name'),
+            college_id=F('course__department__college_id'),
+            college_name=F('course__department__college__name'),
+        )
+        .annotate(total=Sum('count'))
+        .order_by('college_name', 'department_name', 'status', 'issue_type')
+    )
+    breakdown = []
+    for row in rows:
+        row['count'] = row.pop('total')
+        breakdown.append(row)
+    by_status = {choice: 0 for choice, _ in Issue.STATUS_CHOICES}
+    by_issue_type = {choice: 0 for choice, _ in Issue.ISSUE_TYPE_CHOICES}
+    for row in breakdown:
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['count']
+        by_issue_type[row['issue_type']] = by_issue_type.get(row['issue_type'], 0) + row['count']
+
+    return {
+        'users': users,
+        'issues': {
+            'total': sum(by_status.values()),
+            'by_status': by_status,
+            'by_issue_type': by_issue_type,
+            'by_department': breakdown,
+        },
+    }
@@ -1,3 +1,1682 @@
-from django.test import TestCase
+import asyncio
+import csv
+import itertools
+import json
+import sqlite3
+import tempfile
+from contextlib import closing, nullcontext
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.core import mail
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, router, transaction
+from django.db.models import F, Sum
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from users import async_views as user_async_views
+from users.models import User
+from users.serializers import UserSerializer
+from . import aging, async_views, catalog_cache, db_router, events, jobs, metrics, push, sqlite_profile
+from .async_views import read_view
+from .benchmarks import analyze, seed_scale
+from .filters import filter_issues
+from .management.commands.sync_replicas import copy_database
+from .models import (
+    College, Department, Course, Issue, IssueChange, IssueDurationStat, IssueEvent, IssueStat, Job, OpenIssue,
+    RollupMark,
+)
+from .queryplan import plan_for
+from .projection import list_source, project
+from .serializers import (
+    CollegeSerializer, CourseSerializer, DepartmentSerializer, IssueSerializer,
+)
+from .views import CollegeListView, IssueViewSet, visible_changes, visible_issues
+
+
+class CatalogMixin:
+    """
+    Shared fixtures: one college/department/course, a student, a lecturer and a staff user.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.college = College.objects.create(name='College of Science', code='SCI')
+        cls.department = Department.objects.create(
+            department_name='Computer Science', department_code='DCS', college=cls.college
+        )
+        cls.course = Course.objects.create(
+            course_name='Intro to Programming', course_code='CS101', department=cls.department
+        )
+        cls.student = User.objects.create_user(
+            email='student@example.com', password='pass', role='STUDENT', college=cls.college
+        )
+        cls.lecturer = User.objects.create_user(
+            email='lecturer@example.com', password='pass', role='LECTURER'
+        )
+        cls.staff = User.objects.create_user(
+            email='staff@example.com', password='pass', role='ADMIN', is_staff=True
+        )
+
+    @classmethod
+    def make_issues(cls, count, **kwargs):
+        kwargs.setdefault('student', cls.student)
+        kwargs.setdefault('course', cls.course)
+        return [
+            Issue.objects.create(
+                title=f'Issue {i}', description='Missing marks', issue_type='Missing Marks', **kwargs
+            )
+            for i in range(count)
+        ]
+
+
+class QueryPlanTests(CatalogMixin, TestCase):
+    def test_plan_joins_every_nested_relation(self):
+        plan = plan_for(IssueSerializer)
+        self.assertEqual(
+            set(plan.select_related),
+            {'student', 'assigned_to', 'course', 'course__department'},
+        )
+        self.assertIn('course__department__department_code', plan.only)
+        self.assertNotIn('student__password', plan.only)
+
+    def test_planned_rows_render_without_extra_queries(self):
+        self.make_issues(3, assigned_to=self.lecturer)
+        issues = list(plan_for(IssueSerializer).apply(Issue.objects.all()))
+        with self.assertNumQueries(0):
+            IssueSerializer(issues, many=True).data
+
+
+class IssueQueryCountTests(CatalogMixin, APITestCase):
+    def count_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 300, response.data)
+        return len(ctx)
+
+    def test_list_query_count_is_constant(self):
+        self.client.force_authenticate(self.staff)
+        self.make_issues(2, assigned_to=self.lecturer)
+        small = self.count_queries('get', reverse('issue-list'))
+        self.make_issues(20, assigned_to=self.lecturer)
+        large = self.count_queries('get', reverse('issue-list'))
+        self.assertEqual(small, large)
+        self.assertEqual(large, 1)
+
+    def test_student_list_query_count_is_constant(self):
+        self.client.force_authenticate(self.student)
+        self.make_issues(2)
+        small = self.count_queries('get', reverse('issue-list'))
+        self.make_issues(20)
+        self.assertEqual(small, self.count_queries('get', reverse('issue-list')))
+
+    def test_retrieve_runs_one_query(self):
+        self.client.force_authenticate(self.student)
+        issue, = self.make_issues(1, assigned_to=self.lecturer)
+        self.assertEqual(self.count_queries('get', reverse('issue-detail', args=[issue.pk])), 1)
+
+    def test_update_status_query_count(self):
+        self.client.force_authenticate(self.staff)
+        warm, issue = self.make_issues(2)
+        # The first transition creates the target stats bucket
+        self.count_queries('patch', reverse('issue-update-status', args=[warm.pk]), {'status': 'Solved'})
+        url = reverse('issue-update-status', args=[issue.pk])
+        # One read, the locked re-read of the stored row, one UPDATE, two
+        # dashboard counter UPDATEs, the event log's status lookup and INSERT,
+        # the change feed's DELETE and INSERT, one queued job
+        self.assertEqual(self.count_queries('patch', url, {'status': 'Solved'}), 10)
+        issue.refresh_from_db()
+        self.assertEqual(issue.status, 'Solved')
+
+    def test_assign_query_count(self):
+        self.client.force_authenticate(self.staff)
+        warm, issue = self.make_issues(2)
+        self.count_queries('post', reverse('issue-assign', args=[warm.pk]), {'user_id': self.lecturer.pk})
+        url = reverse('issue-assign', args=[issue.pk])
+        # Issue read, assignee read, the locked re-read of the stored row,
+        # UPDATE, two dashboard counter UPDATEs, the event log's status lookup
+        # and INSERT, the change feed's DELETE and INSERT, one queued job
+        self.assertEqual(self.count_queries('post', url, {'user_id': self.lecturer.pk}), 11)
+        issue.refresh_from_db()
+        self.assertEqual(issue.assigned_to, self.lecturer)
+        self.assertEqual(issue.status, 'InProgress')
+
+
+class KeysetPaginationTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(self.staff)
+        self.issues = self.make_issues(7)
+        # Force ties on created_at so the id tie-breaker matters
+        Issue.objects.filter(pk__in=[i.pk for i in self.issues[:4]]).update(
+            created_at=self.issues[0].created_at
+        )
+
+    def walk(self, url, **params):
+        seen, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            pages += 1
+            seen.extend(row['id'] for row in response.data['results'])
+            if not response.data['has_more']:
+                return seen, pages
+            response = self.client.get(response.data['next'])
+
+    def test_pages_cover_every_row_once_in_order(self):
+        seen, pages = self.walk(reverse('issue-list'), page_size=3)
+        expected = list(
+            Issue.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+
+    def test_unpaginated_request_returns_plain_list(self):
+        response = self.client.get(reverse('issue-list'))
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    @override_settings(UNPAGINATED_LIST_LIMIT=6)
+    def test_unpaginated_lists_are_capped(self):
+        Course.objects.bulk_create([
+            Course(course_name=f'Course {i}', course_code=f'C{i}', department=self.department) for i in range(6)
+        ])
+        for name in ('issue-list', 'course-list'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('page_size', response.data)
+                self.assertEqual(self.client.get(reverse(name), {'page_size': 10}).status_code, 200)
+        Issue.objects.filter(pk=self.issues[0].pk).delete()
+        self.assertEqual(len(self.client.get(reverse('issue-list')).data), 6)
+
+    @override_settings(PAGINATE_LISTS_BY_DEFAULT=True)
+    def test_lists_can_be_paginated_by_default(self):
+        for name in ('issue-list', 'course-list', 'user-list'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('has_more', response.json())
+
+    def test_deep_page_costs_the_same_as_first(self):
+        first = self.client.get(reverse('issue-list'), {'page_size': 2})
+        with CaptureQueriesContext(connection) as first_ctx:
+            self.client.get(reverse('issue-list'), {'page_size': 2})
+        with CaptureQueriesContext(connection) as deep_ctx:
+            self.client.get(reverse('issue-list'), {
+                'page_size': 2, 'cursor': first.data['next_cursor'],
+            })
+        self.assertEqual(len(first_ctx), len(deep_ctx))
+        self.assertNotIn('OFFSET', deep_ctx.captured_queries[-1]['sql'])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('issue-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_catalog_and_user_lists_opt_in(self):
+        Course.objects.create(course_name='Algorithms', course_code='CS201', department=self.department)
+        seen, _ = self.walk(reverse('course-list'), page_size=1)
+        self.assertEqual(seen, list(Course.objects.order_by('course_name', 'id').values_list('id', flat=True)))
+        seen, _ = self.walk(reverse('user-list'), page_size=2)
+        self.assertEqual(seen, list(User.objects.order_by('id').values_list('id', flat=True)))
+
+
+@skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN output is SQLite specific")
+class IssueIndexTests(CatalogMixin, TestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(f'USING INDEX {index_name}', queryset.explain())
+
+    def test_access_patterns_use_composite_indexes(self):
+        issues = Issue.objects.all()
+        self.assertUsesIndex(issues, 'issue_created_idx')
+        self.assertUsesIndex(issues.filter(student=self.student), 'issue_student_created_idx')
+        self.assertUsesIndex(issues.filter(status='Pending'), 'issue_status_created_idx')
+        self.assertUsesIndex(
+            issues.filter(assigned_to=self.lecturer, status='InProgress'), 'issue_assignee_status_idx'
+        )
+        self.assertUsesIndex(
+            issues.filter(course=self.course, status='Pending'), 'issue_course_status_idx'
+        )
+        self.assertUsesIndex(
+            Issue.objects.filter(updated_at__gte=timezone.now()).order_by(), 'issue_updated_idx'
+        )
+
+    def test_every_filter_combination_uses_an_index(self):
+        ids = seed_scale(colleges=2, departments=2, courses=5, students=200, lecturers=20, issues=10_000)
+        analyze()
+        now = timezone.now()
+        values = {
+            'status': 'Pending', 'issue_type': 'Appeals', 'course': ids['courses'][0],
+            'department': ids['departments'][0], 'college': ids['colleges'][0],
+            'assigned_to': ids['lecturers'][0], 'created_after': (now - timedelta(days=90)).isoformat(),
+            'created_before': (now - timedelta(days=30)).isoformat(),
+        }
+        for user in (self.staff, self.student):
+            for size in range(len(values) + 1):
+                for names in itertools.combinations(values, size):
+                    for ordering in IssueViewSet.keyset_orderings:
+                        params = {name: values[name] for name in names}
+                        request = Request(APIRequestFactory().get('/', {**params, 'ordering': ordering}))
+                        plan = filter_issues(request, visible_issues(user), IssueViewSet).explain()
+                        with self.subTest(user=user.email, filters=names, ordering=ordering):
+                            # Never a full pass over the table
+                            self.assertFalse(
+                                [line for line in plan.splitlines() if line.endswith('SCAN api_issue')], plan
+                            )
+
+
+class IssueFilterTests(CatalogMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        college = College.objects.create(name='College of Arts', code='ART')
+        department = Department.objects.create(
+            department_name='History', department_code='HIS', college=college
+        )
+        cls.other_course = Course.objects.create(
+            course_name='Modern History', course_code='HI101', department=department
+        )
+        cls.pending = cls.make_issues(2)
+        cls.assigned = cls.make_issues(2, status='InProgress', assigned_to=cls.lecturer)
+        cls.appeal = Issue.objects.create(
+            title='Appeal', description='Appeal my grade', issue_type='Appeals',
+            student=cls.student, course=cls.other_course,
+        )
+        cls.old = cls.make_issues(1)[0]
+        Issue.objects.filter(pk=cls.old.pk).update(created_at=timezone.now() - timedelta(days=60))
+
+    def setUp(self):
+        self.client.force_authenticate(self.staff)
+
+    def ids(self, **params):
+        response = self.client.get(reverse('issue-list'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [issue['id'] for issue in response.data]
+
+    def assertFilters(self, params, expected):
+        self.assertEqual(set(self.ids(**params)), {issue.pk for issue in expected})
+
+    def test_filters(self):
+        everything = self.pending + self.assigned + [self.appeal, self.old]
+        self.assertFilters({}, everything)
+        self.assertFilters({'status': 'InProgress'}, self.assigned)
+        self.assertFilters({'issue_type': 'Appeals'}, [self.appeal])
+        self.assertFilters({'course': self.course.pk}, self.pending + self.assigned + [self.old])
+        self.assertFilters({'department': self.other_course.department_id}, [self.appeal])
+        self.assertFilters({'college': self.college.pk}, self.pending + self.assigned + [self.old])
+        self.assertFilters({'assigned_to': self.lecturer.pk}, self.assigned)
+        self.assertFilters({'assigned_to': 'none'}, self.pending + [self.appeal, self.old])
+        cutoff = (timezone.now() - timedelta(days=30)).isoformat()
+        self.assertFilters({'created_before': cutoff}, [self.old])
+        self.assertFilters({'created_after': cutoff}, self.pending + self.assigned + [self.appeal])
+        self.assertFilters({'status': 'Pending', 'course': self.course.pk, 'created_after': cutoff}, self.pending)
+
+    def test_ordering(self):
+        newest_first = self.ids()
+        self.assertEqual(newest_first[-1], self.old.pk)
+        self.assertEqual(self.ids(ordering='-created_at'), newest_first)
+        self.assertEqual(self.ids(ordering='created_at'), newest_first[::-1])
+        # Keyset pages follow the chosen order
+        seen, url = [], reverse('issue-list') + '?ordering=created_at&page_size=2'
+        while url:
+            page = self.client.get(url).data
+            seen += [issue['id'] for issue in page['results']]
+            url = page['next']
+        self.assertEqual(seen, newest_first[::-1])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in [
+            {'status': 'Closed'}, {'issue_type': 'Complaint'}, {'course': 'CS101'}, {'college': 0},
+            {'assigned_to': 'me'}, {'created_after': 'yesterday'}, {'ordering': 'title'},
+            {'created_after': '2025-02-01', 'created_before': '2025-01-01'},
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get(reverse('issue-list'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(reversed(params)), response.data)
+
+    def test_students_filter_their_own_issues(self):
+        Issue.objects.create(
+            title='Other', description='Other', issue_type='Appeals',
+            student=User.objects.create_user(email='other@example.com', password='pass', role='STUDENT'),
+            course=self.other_course,
+        )
+        self.client.force_authenticate(self.student)
+        self.assertFilters({'issue_type': 'Appeals'}, [self.appeal])
+
+
+class WorkQueueTests(CatalogMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.hod = User.objects.create_user(
+            email='hod@example.com', password='pass', role='HOD', department=cls.department
+        )
+        department = Department.objects.create(
+            department_name='Mathematics', department_code='MAT', college=cls.college
+        )
+        cls.other_course = Course.objects.create(
+            course_name='Calculus', course_code='MA101', department=department
+        )
+        cls.assigned = cls.make_issues(2, status='InProgress', assigned_to=cls.lecturer)
+        cls.pending = cls.make_issues(3)
+        cls.elsewhere = cls.make_issues(2, course=cls.other_course, assigned_to=cls.lecturer)
+
+    def queue(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse('issue-queue'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_lecturers_get_their_assigned_issues(self):
+        data = self.queue(self.lecturer)
+        self.assertEqual(
+            {issue['id'] for issue in data['results']}, {issue.pk for issue in self.assigned + self.elsewhere}
+        )
+        self.assertEqual(data['counts'], {'Pending': 2, 'InProgress': 2, 'Solved': 0})
+
+    def test_hods_get_their_departments_issues(self):
+        data = self.queue(self.hod)
+        self.assertEqual(
+            {issue['id'] for issue in data['results']}, {issue.pk for issue in self.assigned + self.pending}
+        )
+        self.assertEqual(data['counts'], {'Pending': 3, 'InProgress': 2, 'Solved': 0})
+        # Filters narrow the page, not the counts
+        data = self.queue(self.hod, status='Pending')
+        self.assertEqual({issue['id'] for issue in data['results']}, {issue.pk for issue in self.pending})
+        self.assertEqual(data['counts']['InProgress'], 2)
+
+    def test_always_paginated(self):
+        data = self.queue(self.hod, page_size=2)
+        seen = [issue['id'] for issue in data['results']]
+        while data['next_cursor']:
+            data = self.queue(self.hod, page_size=2, cursor=data['next_cursor'])
+            seen += [issue['id'] for issue in data['results']]
+        self.assertEqual(seen, [issue.pk for issue in sorted(
+            self.assigned + self.pending, key=lambda issue: (issue.created_at, issue.pk), reverse=True
+        )])
+        self.assertIsNone(self.queue(self.hod)['next_cursor'])
+
+    def test_query_count_does_not_grow_with_the_department(self):
+        self.client.force_authenticate(self.hod)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('issue-queue'))
+        self.make_issues(30, assigned_to=self.lecturer, status='Solved')
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('issue-queue'))
+        self.assertEqual(len(response.data['results']), 35)
+
+    def test_others_have_no_queue(self):
+        hod_without_department = User.objects.create_user(email='hod2@example.com', password='pass', role='HOD')
+        for user in (self.student, self.staff, hod_without_department):
+            self.client.force_authenticate(user)
+            self.assertEqual(self.client.get(reverse('issue-queue')).status_code, 403)
+
+
+class IssueEventTests(CatalogMixin, APITestCase):
+    def history(self, issue):
+        return list(issue.events.order_by('id').values_list('kind', 'from_status', 'to_status', 'assigned_to_id'))
+
+    def test_transitions_are_logged(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.post(reverse('issue-add'), {
+            'course': self.course.pk, 'issue_type': 'Appeals', 'title': 'Appeal', 'description': 'Appeal',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        issue = Issue.objects.latest('id')
+        self.client.force_authenticate(self.staff)
+        self.client.post(reverse('issue-assign', args=[issue.pk]), {'user_id': self.lecturer.pk}, format='json')
+        self.client.patch(reverse('issue-detail', args=[issue.pk]), {'title': 'Renamed'}, format='json')
+        self.client.patch(reverse('issue-update-status', args=[issue.pk]), {'status': 'Solved'}, format='json')
+        # Deferred columns are fetched to tell what changed
+        reopened = Issue.objects.only('id').get(pk=issue.pk)
+        reopened.status = 'InProgress'
+        reopened.save(update_fields=['status'])
+
+        self.assertEqual(self.history(issue), [
+            ('created', '', 'Pending', None),
+            ('assigned', 'Pending', 'InProgress', self.lecturer.pk),
+            ('status', 'InProgress', 'Solved', self.lecturer.pk),
+            ('status', 'Solved', 'InProgress', self.lecturer.pk),
+        ])
+        created, assigned, solved, _ = issue.events.order_by('id')
+        issue.refresh_from_db()
+        self.assertEqual(created.status_since, issue.created_at)
+        self.assertEqual(assigned.status_since, issue.created_at)
+        self.assertEqual(solved.status_since, assigned.created_at)
+
+    def test_bulk_transitions_are_logged(self):
+        self.client.force_authenticate(self.staff)
+        already, pending = self.make_issues(1, status='InProgress', assigned_to=self.lecturer) + self.make_issues(1)
+        self.client.post(reverse('issue-bulk'), {
+            'ids': [already.pk, pending.pk], 'action': 'assign', 'user_id': self.lecturer.pk,
+        }, format='json')
+        self.assertEqual(self.history(already)[1:], [])
+        self.assertEqual(self.history(pending)[1:], [('assigned', 'Pending', 'InProgress', self.lecturer.pk)])
+        self.client.post(reverse('issue-bulk'), {
+            'ids': [already.pk, pending.pk], 'action': 'update_status', 'status': 'Solved',
+        }, format='json')
+        self.assertEqual(self.history(pending)[-1], ('status', 'InProgress', 'Solved', self.lecturer.pk))
+        self.assertEqual(
+            pending.events.latest('id').status_since, pending.events.get(kind='assigned').created_at
+        )
+
+    def test_events_commit_with_their_change(self):
+        issue, = self.make_issues(1)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            issue.status = 'Solved'
+            issue.save()
+            raise RuntimeError
+        self.assertEqual(IssueEvent.objects.filter(issue=issue).count(), 1)
+        # Deleting an issue leaves its history alone
+        pk = issue.pk
+        issue.delete()
+        self.assertEqual(IssueEvent.objects.filter(issue_id=pk).count(), 1)
+
+    def solve(self, hours, course=None):
+        """
+        An issue opened `hours` ago, taken up halfway, and solved now.
+        """
+        issue, = self.make_issues(1, course=course or self.course)
+        issue.assigned_to, issue.status = self.lecturer, 'InProgress'
+        issue.save()
+        issue.status = 'Solved'
+        issue.save()
+        # Backdate the history written above
+        opened = timezone.now() - timedelta(hours=hours)
+        taken = opened + timedelta(hours=hours / 2)
+        Issue.objects.filter(pk=issue.pk).update(created_at=opened)
+        issue.events.filter(kind='created').update(created_at=opened, status_since=opened)
+        issue.events.filter(kind='assigned').update(created_at=taken, status_since=opened)
+        issue.events.filter(kind='status').update(status_since=taken)
+        return issue
+
+    def test_rollup_is_incremental(self):
+        for hours in (1, 2, 3):
+            self.solve(hours)
+        self.assertEqual(events.rollup(), 9)
+        self.assertEqual(events.rollup(), 0)
+        totals = dict(
+            IssueDurationStat.objects.values_list('metric').annotate(Sum('count')).order_by()
+        )
+        self.assertEqual(totals, {'resolution': 3, 'Pending': 3, 'InProgress': 3})
+        self.solve(4)
+        self.assertEqual(events.rollup(), 3)
+        self.assertEqual(
+            RollupMark.objects.get(name=events.ROLLUP).last_id, IssueEvent.objects.latest('id').pk
+        )
+        self.assertEqual(IssueDurationStat.objects.filter(metric='resolution').aggregate(n=Sum('count'))['n'], 4)
+
+    def test_rollup_waits_for_events_that_may_still_commit(self):
+        # As on a database that may commit events out of id order
+        with mock.patch('api.watermarks.commits_in_id_order', return_value=False):
+            settled, recent = self.solve(2), self.solve(1)
+            settled.events.filter(kind='status').update(created_at=timezone.now() - timedelta(minutes=1))
+            recent.events.update(created_at=timezone.now())
+            self.assertEqual(events.rollup(), 3)
+            self.assertEqual(RollupMark.objects.get(name=events.ROLLUP).last_id, settled.events.latest('id').pk)
+            recent.events.update(created_at=timezone.now() - timedelta(minutes=1))
+            self.assertEqual(events.rollup(), 3)
+
+    def test_percentiles(self):
+        self.assertEqual(events.percentiles([(5, 1), (9, 8), (20, 1)]), (10, {
+            'p50': round(events.bucket_value(9), 1), 'p90': round(events.bucket_value(9), 1),
+            'p99': round(events.bucket_value(20), 1),
+        }))
+        for seconds in (1, 59, 3600, 86400 * 30):
+            value = events.bucket_value(events.bucket_for(seconds))
+            self.assertLess(abs(value - seconds) / seconds, 0.1)
+
+        other = Course.objects.create(course_name='Calculus', course_code='MA101', department=self.department)
+        for hours in range(1, 101):
+            self.solve(hours, course=self.course if hours % 2 else other)
+        self.client.force_authenticate(self.staff)
+        # Reading the percentiles doesn't fold in new events
+        response = self.client.get(reverse('resolution-times'))
+        self.assertEqual((response.data['results'], response.data['as_of']), ([], None))
+        self.assertEqual(events.rollup(), 300)
+        response = self.client.get(reverse('resolution-times'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data['as_of'])
+        department, = response.data['results']
+        self.assertEqual((department['code'], department['count']), ('DCS', 100))
+        for key, hours in (('p50', 50), ('p90', 90), ('p99', 99)):
+            self.assertLess(abs(department[key] / 3600 - hours) / hours, 0.1)
+
+        response = self.client.get(reverse('resolution-times'), {'by': 'course', 'metric': 'Pending'})
+        by_course = {row['code']: row for row in response.data['results']}
+        self.assertEqual(set(by_course), {'CS101', 'MA101'})
+        self.assertEqual(by_course['CS101']['count'], 50)
+        # Half of each issue's life was spent in Pending
+        self.assertLess(abs(by_course['MA101']['p50'] / 3600 - 25) / 25, 0.15)
+
+    def test_resolution_times_are_for_staff(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get(reverse('resolution-times')).status_code, 403)
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('resolution-times'), {'by': 'college', 'metric': 'Solved'})
+        self.assertEqual(set(response.data), {'by', 'metric'})
+
+
+class AgingReportTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.issues = {}
+        for days in (3, 10, 20, 40):
+            issue, = self.make_issues(1)
+            self.backdate(issue, days)
+            self.issues[days] = issue
+
+    def backdate(self, issue, days):
+        at = self.now - timedelta(days=days)
+        Issue.objects.filter(pk=issue.pk).update(created_at=at, updated_at=at)
+
+    def expected(self, now):
+        """
+        The report worked out from every issue.
+        """
+        ages = [now - created for created in Issue.objects.exclude(status='Solved').values_list('created_at', flat=True)]
+        if not ages:
+            return []
+        return [{
+            'id': self.department.pk, 'code': 'DCS', 'open': len(ages),
+            **{f'over_{edge.days}_days': sum(age >= edge for age in ages) for edge in aging.EDGES},
+        }]
+
+    def test_refresh_reads_only_changed_issues(self):
+        self.assertEqual(aging.refresh(now=self.now), (4, 0))
+        self.assertEqual(aging.report(), self.expected(self.now))
+
+        later = self.now + timedelta(minutes=1)
+        issue = self.issues[40]
+        issue.status = 'Solved'
+        issue.save()
+        moved = self.issues[3]
+        moved.status = 'InProgress'
+        moved.save()
+        self.assertEqual(aging.refresh(now=later), (2, 0))
+        self.assertEqual(aging.report(), self.expected(later))
+        self.assertEqual(aging.report(status='InProgress')[0]['open'], 1)
+        self.assertEqual(OpenIssue.objects.count(), 3)
+        # Reading an issue twice changes nothing
+        self.assertEqual(aging.refresh(now=later + timedelta(seconds=1)), (2, 0))
+        self.assertEqual(aging.report(), self.expected(later))
+
+    def test_issues_age_between_refreshes(self):
+        aging.refresh(now=self.now)
+        for days, aged in ((1, 0), (8, 2), (40, 4)):
+            now = self.now + timedelta(days=days)
+            self.assertEqual(aging.refresh(now=now), (0, aged))
+            self.assertEqual(aging.report(), self.expected(now))
+        # One refresh can carry an issue past several edges
+        self.assertEqual(aging.report()[0]['over_30_days'], 4)
+
+    def test_deleted_issues_leave_the_report(self):
+        aging.refresh(now=self.now)
+        self.issues[10].delete()
+        self.assertEqual(aging.report(), self.expected(self.now))
+        Course.objects.filter(pk=self.course.pk).delete()
+        self.assertEqual(aging.report(), [])
+        self.assertFalse(OpenIssue.objects.exists())
+
+    def test_report_endpoint(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get(reverse('issue-aging')).status_code, 403)
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(reverse('issue-aging'), {'status': 'Solved'}).status_code, 400)
+        response = self.client.get(reverse('issue-aging'))
+        self.assertEqual((response.data['as_of'], response.data['results']), (None, []))
+
+        call_command('refresh_aging', stdout=StringIO())
+        # The watermark, the counters and the course codes
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('issue-aging'), {'by': 'course'})
+        row, = response.data['results']
+        self.assertEqual(
+            (row['code'], row['open'], row['over_7_days'], row['over_14_days'], row['over_30_days']),
+            ('CS101', 4, 3, 2, 1),
+        )
+        self.assertIsNotNone(response.data['as_of'])
+
+
+class IssueChangeFeedTests(CatalogMixin, APITestCase):
+    def poll(self, since=None, **params):
+        if since is not None:
+            params['since'] = since
+        response = self.client.get(reverse('issue-changes'), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_feed_returns_changes_and_tombstones(self):
+        self.client.force_authenticate(self.staff)
+        self.make_issues(2)
+        start = self.poll()
+        self.assertEqual((start['results'], start['cursor'] > 0), ([], True))
+
+        first, second, third = self.make_issues(3)
+        self.client.patch(reverse('issue-detail', args=[first.pk]), {'title': 'Renamed'}, format='json')
+        deleted = third.pk
+        third.delete()
+        feed = self.poll(start['cursor'])
+        # In the order they last changed
+        self.assertEqual([issue['id'] for issue in feed['results']], [second.pk, first.pk])
+        self.assertEqual(feed['results'][1]['title'], 'Renamed')
+        self.assertEqual((feed['deleted'], feed['has_more']), ([deleted], False))
+
+        self.assertEqual(self.poll(feed['cursor']), {
+            'results': [], 'deleted': [], 'cursor': feed['cursor'], 'has_more': False,
+        })
+        self.client.post(reverse('issue-bulk'), {
+            'ids': [first.pk, second.pk], 'action': 'update_status', 'status': 'Solved',
+        }, format='json')
+        feed = self.poll(feed['cursor'])
+        self.assertEqual({issue['id']: issue['status'] for issue in feed['results']}, {
+            first.pk: 'Solved', second.pk: 'Solved',
+        })
+
+    def test_feed_pages_through_changes(self):
+        self.client.force_authenticate(self.staff)
+        cursor = self.poll()['cursor']
+        issues = self.make_issues(5)
+        seen = []
+        for has_more in (True, True, False):
+            feed = self.poll(cursor, page_size=2)
+            self.assertEqual(feed['has_more'], has_more)
+            seen += [issue['id'] for issue in feed['results']]
+            cursor = feed['cursor']
+        self.assertEqual(seen, [issue.pk for issue in issues])
+
+    def test_feed_stays_behind_changes_that_may_still_commit(self):
+        self.client.force_authenticate(self.staff)
+        settled, recent = self.make_issues(2)
+        IssueChange.objects.filter(issue=settled).update(changed_at=timezone.now() - timedelta(minutes=1))
+        # As on a database that may commit changes out of seq order
+        with mock.patch('api.watermarks.commits_in_id_order', return_value=False):
+            start = self.poll()['cursor']
+            self.assertEqual(start, IssueChange.objects.get(issue=settled).seq)
+            feed = self.poll(0)
+            self.assertEqual(([issue['id'] for issue in feed['results']], feed['cursor']), ([settled.pk], start))
+            IssueChange.objects.filter(issue=recent).update(changed_at=timezone.now() - timedelta(minutes=1))
+            self.assertEqual([issue['id'] for issue in self.poll(feed['cursor'])['results']], [recent.pk])
+
+    def test_feed_is_scoped_like_the_issue_list(self):
+        other = User.objects.create_user(email='other@example.com', password='pass', role='STUDENT')
+        mine, = self.make_issues(1)
+        theirs, gone = self.make_issues(2, student=other)
+        gone.delete()
+        self.client.force_authenticate(self.student)
+        feed = self.poll(0)
+        self.assertEqual(([issue['id'] for issue in feed['results']], feed['deleted']), ([mine.pk], []))
+        # Only the changes past the cursor are read, through the student's index
+        plan = visible_changes(self.student).filter(seq__gt=feed['cursor']).order_by('seq').explain()
+        self.assertIn('USING INDEX issue_change_student_idx', plan)
+        with self.assertNumQueries(2):
+            self.poll(feed['cursor'] - 1)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(self.staff)
+        for since in ('-1', 'latest'):
+            response = self.client.get(reverse('issue-changes'), {'since': since})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('since', response.data)
+
+
+class LivePushTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    async def open(self, user):
+        request = self.factory.get(
+            reverse('issue-stream'), headers={'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        )
+        response = await async_views.issue_stream(request)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertEqual(await anext(stream), b'retry: 1000\n\n')
+        return stream
+
+    def parse(self, frame):
+        fields = dict(line.split(': ', 1) for line in frame.decode().strip().split('\n'))
+        return fields['event'], json.loads(fields['data'])
+
+    def test_transitions_reach_the_student_assignee_and_staff(self):
+        issue, = self.make_issues(1)
+        other = User.objects.create_user(email='other@example.com', password='pass', role='STUDENT')
+
+        def assign():
+            self.client.force_authenticate(self.staff)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('issue-assign', args=[issue.pk]), {'user_id': self.lecturer.pk}, format='json')
+            # Rolled back: nothing is pushed
+            with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+                Issue.objects.get(pk=issue.pk).delete()
+                self.make_issues(1)
+                raise RuntimeError
+
+        async def scenario():
+            users = (self.student, self.lecturer, self.staff, other)
+            streams = [await self.open(user) for user in users]
+            try:
+                await sync_to_async(assign)()
+                for stream in streams[:3]:
+                    event, data = self.parse(await asyncio.wait_for(anext(stream), 1))
+                    self.assertEqual(event, 'issue.assigned')
+                    self.assertEqual((data['issue'], data['from_status'], data['status'], data['assigned_to']), (
+                        issue.pk, 'Pending', 'InProgress', self.lecturer.pk,
+                    ))
+                self.assertEqual(push.hub.count, 4)
+                with self.assertRaises(TimeoutError):
+                    await asyncio.wait_for(anext(streams[3]), 0.05)
+            finally:
+                for stream in streams:
+                    await stream.aclose()
+                del stream, streams
+            # Closed streams leave the hub once the loop finalizes them
+            await asyncio.sleep(0.01)
+            self.assertEqual(push.hub.count, 0)
+
+        async_to_sync(scenario)()
+
+    @override_settings(PUSH_QUEUE_SIZE=2)
+    def test_slow_clients_are_dropped(self):
+        item = push.message(1, 1, 'status', 'Pending', 'Solved', None, self.course.pk, timezone.now(), self.student.pk)
+
+        async def scenario():
+            slow = await self.open(self.staff)
+            fast = push.hub.subscribe(self.student.pk)
+            try:
+                for _ in range(3):
+                    push.hub.publish([item])
+                    self.assertEqual(fast.queue.get_nowait(), item)
+                self.assertEqual(await anext(slow), b'event: dropped\ndata: {}\n\n')
+                with self.assertRaises(StopAsyncIteration):
+                    await anext(slow)
+                self.assertEqual(push.hub.count, 1)
+            finally:
+                push.hub.unsubscribe(fast)
+
+        async_to_sync(scenario)()
+
+    @override_settings(PUSH_BUS='api.push.EventLogBus', PUSH_POLL_SECONDS=0.01)
+    def test_event_log_bus_pushes_changes_from_other_processes(self):
+        async def scenario():
+            stream = await self.open(self.student)
+            try:
+                # Let the bus find where the log ends
+                await asyncio.sleep(0.1)
+                issue, = await sync_to_async(self.make_issues)(1)
+                event, data = self.parse(await asyncio.wait_for(anext(stream), 1))
+                self.assertEqual((event, data['issue'], data['status']), ('issue.created', issue.pk, 'Pending'))
+            finally:
+                await stream.aclose()
+
+        async_to_sync(scenario)()
+
+    @override_settings(PUSH_POLL_SECONDS=0.01)
+    def test_event_log_bus_waits_for_events_that_may_still_commit(self):
+        published = []
+        hub = mock.Mock(publish=published.extend)
+
+        async def scenario():
+            listener = asyncio.create_task(push.EventLogBus.listen(hub))
+            try:
+                await asyncio.sleep(0.05)
+                issue, = await sync_to_async(self.make_issues)(1)
+                await asyncio.sleep(0.1)
+                self.assertEqual(published, [])
+                await IssueEvent.objects.filter(issue=issue).aupdate(
+                    created_at=timezone.now() - timedelta(minutes=1)
+                )
+                for _ in range(100):
+                    if published:
+                        break
+                    await asyncio.sleep(0.01)
+                self.assertEqual([item.frame.count(b'issue.created') for item in published], [1])
+            finally:
+                listener.cancel()
+
+        # As on a database that may commit events out of id order
+        with mock.patch('api.watermarks.commits_in_id_order', return_value=False):
+            async_to_sync(scenario)()
+
+    def test_wsgi_requests_are_refused(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get(reverse('issue-stream')).status_code, 501)
+        self.assertEqual(self.client.post(reverse('issue-stream')).status_code, 405)
+
+
+class CatalogCacheTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        catalog_cache.reset_stats()
+
+    def test_second_read_is_served_from_cache(self):
+        first = self.client.get(reverse('course-list'))
+        self.assertEqual(first.status_code, 200)
+        # Only the version is read
+        with self.assertNumQueries(1):
+            second = self.client.get(reverse('course-list'))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(json.loads(second.content)[0]['department_code'], 'DCS')
+
+    def test_matching_etag_gets_304_reading_only_the_version(self):
+        etag = self.client.get(reverse('college_list'))['ETag']
+        token = RefreshToken.for_user(self.student).access_token
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('college_list'),
+                HTTP_IF_NONE_MATCH=etag,
+                HTTP_AUTHORIZATION=f'Bearer {token}',
+            )
+        self.assertEqual(response.status_code, 304)
+        stats = catalog_cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['not_modified']), (1, 1, 1))
+
+    def test_writes_invalidate_every_list(self):
+        department_etag = self.client.get(reverse('department-list'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.college.name = 'College of Natural Sciences'
+            self.college.save()
+        response = self.client.get(reverse('department-list'), HTTP_IF_NONE_MATCH=department_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)[0]['college_name'], 'College of Natural Sciences')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.delete()
+        self.assertEqual(json.loads(self.client.get(reverse('course-list')).content), [])
+
+    def test_writes_in_other_processes_invalidate_every_list(self):
+        etag = self.client.get(reverse('college_list'))['ETag']
+        # Another worker, or import_catalog, has a cache of its own
+        with mock.patch.object(catalog_cache, 'cache', LocMemCache('other-process', {})):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.college.name = 'College of Natural Sciences'
+                self.college.save()
+        response = self.client.get(reverse('college_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)[0]['name'], 'College of Natural Sciences')
+
+    def test_paginated_requests_bypass_cache(self):
+        response = self.client.get(reverse('college_list'), {'page_size': 10})
+        self.assertEqual(response.data['results'][0]['code'], 'SCI')
+        self.assertEqual(catalog_cache.get_stats()['misses'], 0)
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get(reverse('catalog-cache-stats')).status_code, 403)
+        self.client.force_authenticate(self.staff)
+        self.assertIn('hits', self.client.get(reverse('catalog-cache-stats')).data)
+
+
+class ImportCatalogTests(CatalogMixin, TestCase):
+    def write(self, name, content):
+        path = Path(self.tmp.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_import(self, **files):
+        out, err = StringIO(), StringIO()
+        call_command('import_catalog', batch_size=2, stdout=out, stderr=err, **files)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_hierarchy_and_upserts(self):
+        colleges = self.write('colleges.csv', (
+            'code,name,description\n'
+            'SCI,College of Natural Sciences,Updated\n'
+            'ENG,College of Engineering,\n'
+        ))
+        departments = self.write('departments.jsonl', (
+            '{"department_code": "DEE", "department_name": "Electrical", "college": "ENG"}\n'
+            '{"department_code": "DCS", "department_name": "Computer Science", "college": "SCI"}\n'
+        ))
+        courses = self.write('courses.csv', (
+            'course_code,course_name,department_code,details\n'
+            'EE101,Circuits,DEE,\n'
+            'CS101,Intro to Programming,DCS,Renamed details\n'
+            'EE102,Signals,DEE,\n'
+        ))
+        out, err = self.run_import(colleges=colleges, departments=departments, courses=courses)
+        self.assertEqual(err, '')
+        self.assertIn('courses: 3 rows read, 3 upserted, 0 rejected', out)
+
+        self.college.refresh_from_db()
+        self.assertEqual(self.college.name, 'College of Natural Sciences')
+        self.assertEqual(College.objects.count(), 2)
+        self.assertEqual(Course.objects.get(course_code='EE102').department.college.code, 'ENG')
+        self.assertEqual(Course.objects.get(pk=self.course.pk).details, 'Renamed details')
+
+    def test_bad_rows_are_reported_without_aborting_the_batch(self):
+        courses = self.write('courses.jsonl', (
+            '{"course_code": "CS201", "course_name": "Algorithms", "department_code": "DCS"}\n'
+            '{"course_code": "CS301", "course_name": "Networks", "department_code": "NOPE"}\n'
+            'not json\n'
+            '{"course_code": "CS999", "course_name": "Intro to Programming", "department_code": "DCS"}\n'
+            '{"course_code": "CS202", "course_name": "Databases", "department_code": "DCS"}\n'
+        ))
+        out, err = self.run_import(courses=courses)
+        self.assertIn('5 rows read, 2 upserted, 3 rejected', out)
+        self.assertIn("courses.jsonl:2: Unknown department code 'NOPE'", err)
+        self.assertIn('courses.jsonl:3:', err)
+        # Clashes with the existing course name, isolated from CS202 in the same batch
+        self.assertIn('courses.jsonl:4:', err)
+        self.assertEqual(
+            set(Course.objects.values_list('course_code', flat=True)), {'CS101', 'CS201', 'CS202'}
+        )
+
+
+class BulkTriageTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(self.staff)
+        self.issues = self.make_issues(3)
+        self.ids = [issue.pk for issue in self.issues]
+
+    def test_bulk_assign_reports_per_id_outcomes(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('issue-bulk'), {
+                'ids': self.ids + [999999, self.ids[0]], 'action': 'assign', 'user_id': self.lecturer.pk,
+            }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(
+            [row['result'] for row in response.data['results']],
+            ['updated', 'updated', 'updated', 'not_found'],
+        )
+        self.assertEqual(
+            Issue.objects.filter(assigned_to=self.lecturer, status='InProgress').count(), 3
+        )
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "api_issue" ')]
+        self.assertEqual(len(updates), 1)
+
+    def test_bulk_status_update(self):
+        response = self.client.post(reverse('issue-bulk'), {
+            'ids': self.ids[:2], 'action': 'update_status', 'status': 'Solved',
+        }, format='json')
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(Issue.objects.filter(status='Solved').count(), 2)
+
+    def test_assignee_role_is_validated(self):
+        response = self.client.post(reverse('issue-bulk'), {
+            'ids': self.ids, 'action': 'assign', 'user_id': self.student.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Issue.objects.filter(assigned_to__isnull=False).exists())
+
+    def test_students_cannot_bulk_update(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.post(reverse('issue-bulk'), {
+            'ids': self.ids, 'action': 'update_status', 'status': 'Solved',
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class DashboardStatsTests(CatalogMixin, APITestCase):
+    def dashboard(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_counters_follow_issue_and_user_writes(self):
+        issues = self.make_issues(3)
+        issues[0].status = 'Solved'
+        issues[0].save()
+        Issue.objects.only('id', 'status').get(pk=issues[1].pk).delete()
+        self.lecturer.role = 'HOD'
+        self.lecturer.save()
+
+        data = self.dashboard()
+        self.assertEqual(data['issues']['total'], 2)
+        self.assertEqual(data['issues']['by_status']['Solved'], 1)
+        self.assertEqual(data['issues']['by_status']['Pending'], 1)
+        row = data['issues']['by_department'][0]
+        self.assertEqual((row['college_name'], row['department_name']), ('College of Science', 'Computer Science'))
+        self.assertEqual(data['users'], {'total': 3, 'students': 1, 'lecturers': 0, 'hods': 1, 'admins': 1})
+
+    def test_stale_instances_count_from_the_stored_row(self):
+        issue = self.make_issues(1)[0]
+        first, second = Issue.objects.get(pk=issue.pk), Issue.objects.get(pk=issue.pk)
+        first.status = 'Solved'
+        first.save()
+        # Still holds Pending, which the issue has left
+        second.status = 'InProgress'
+        second.save()
+        self.assertEqual(self.dashboard()['issues']['by_status'], {'Pending': 0, 'InProgress': 1, 'Solved': 0})
+        self.assertEqual(IssueEvent.objects.filter(issue=issue).latest('pk').from_status, 'Solved')
+
+        first.delete()
+        second.delete()
+        self.assertEqual(self.dashboard()['issues']['total'], 0)
+        self.assertFalse(IssueStat.objects.exclude(count=0).exists())
+
+    def test_bulk_updates_keep_counters_in_step(self):
+        ids = [issue.pk for issue in self.make_issues(4)]
+        self.client.force_authenticate(self.staff)
+        self.client.post(reverse('issue-bulk'), {
+            'ids': ids[:3], 'action': 'assign', 'user_id': self.lecturer.pk,
+        }, format='json')
+        self.assertEqual(self.dashboard()['issues']['by_status'], {'Pending': 1, 'InProgress': 3, 'Solved': 0})
+
+    def test_dashboard_does_not_scan_issues(self):
+        self.make_issues(5)
+        self.client.force_authenticate(self.staff)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('admin_dashboard'))
+        self.assertFalse(any('"api_issue"' in q['sql'] for q in ctx.captured_queries))
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.make_issues(3)
+        before = self.dashboard()
+        IssueStat.objects.update(count=0)
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(self.dashboard(), before)
+
+    def test_students_are_refused(self):
+        self.client.force_authenticate(self.student)
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 403)
+
+
+class BenchmarkSuiteTests(TestCase):
+    def seed(self, **options):
+        options = {
+            'colleges': 2, 'departments': 2, 'courses': 3, 'students': 20, 'lecturers': 4,
+            'issues': 200, 'days': 30, **options,
+        }
+        call_command('seed_scale', stdout=StringIO(), **options)
+
+    def test_seed_scale_builds_a_consistent_hierarchy(self):
+        self.seed()
+        self.assertEqual(College.objects.count(), 2)
+        self.assertEqual(Department.objects.count(), 4)
+        self.assertEqual(Course.objects.count(), 12)
+        self.assertEqual(User.objects.filter(role='HOD', department__isnull=False).count(), 4)
+        self.assertEqual(Issue.objects.count(), 200)
+        # Students only raise issues against courses of their own college
+        self.assertFalse(Issue.objects.exclude(course__department__college=F('student__college')).exists())
+        self.assertFalse(Issue.objects.filter(status='Pending', assigned_to__isnull=False).exists())
+        self.assertFalse(Issue.objects.exclude(status='Pending').filter(assigned_to__isnull=True).exists())
+        oldest = Issue.objects.order_by('created_at').values_list('created_at', flat=True).first()
+        self.assertLess(oldest, timezone.now() - timedelta(days=1))
+        self.assertGreater(oldest, timezone.now() - timedelta(days=31))
+        # Bulk inserts bypass the signals, so the counters are rebuilt
+        self.assertEqual(IssueStat.objects.aggregate(n=Sum('count'))['n'], 200)
+
+    def test_seed_scale_refuses_a_used_prefix(self):
+        self.seed(issues=0)
+        with self.assertRaises(CommandError):
+            self.seed(issues=0)
+        self.seed(issues=0, prefix='T')
+        self.assertEqual(College.objects.count(), 4)
+
+    def test_every_route_has_a_benchmark_scenario(self):
+        from .management.commands.bench_routes import SCENARIOS, route_names
+        self.assertEqual(route_names() - {scenario.route for scenario in SCENARIOS}, set())
+
+    def test_bench_metrics_runs(self):
+        out = StringIO()
+        # In the test database rather than a scratch one
+        with mock.patch('api.management.commands.bench_metrics.scratch_database', nullcontext):
+            call_command('bench_metrics', requests=2, rounds=1, issues=20, stdout=out)
+        self.assertIn('issue-list page', out.getvalue())
+
+
+@skipUnless(connection.vendor == 'sqlite', "Reads SQLite EXPLAIN QUERY PLAN output")
+class IssueIndexBenchmarkTests(TransactionTestCase):
+    # Drops and re-adds indexes, which the SQLite schema editor can't do
+    # inside the TestCase transaction
+    def test_bench_issue_indexes_runs(self):
+        out = StringIO()
+        with mock.patch('api.management.commands.bench_issue_indexes.scratch_database', nullcontext):
+            call_command('bench_issue_indexes', rows=50, repeat=1, stdout=out)
+        self.assertIn('student: my issues, newest first', out.getvalue())
+        self.assertIn('USING INDEX issue_created_idx', out.getvalue())
+        self.assertEqual(
+            {index.name for index in Issue._meta.indexes} - {
+                index for index, info in connection.introspection.get_constraints(
+                    connection.cursor(), Issue._meta.db_table
+                ).items() if info['index']
+            },
+            set(),
+        )
+
+
+class IssueExportTests(CatalogMixin, APITestCase):
+    def export(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse('issue-export'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_is_scoped_like_the_list(self):
+        self.make_issues(2, assigned_to=self.lecturer)
+        other = User.objects.create_user(email='other@example.com', password='pass')
+        self.make_issues(1, student=other)
+
+        staff_rows = list(csv.DictReader(StringIO(self.export(self.staff))))
+        self.assertEqual(len(staff_rows), 3)
+        student_rows = list(csv.DictReader(StringIO(self.export(self.student, format='csv'))))
+        self.assertEqual(len(student_rows), 2)
+        self.assertEqual(student_rows[0]['course_code'], 'CS101')
+        self.assertEqual(student_rows[0]['assigned_to_email'], 'lecturer@example.com')
+
+    def test_ndjson_export_matches_api_values(self):
+        issue, = self.make_issues(1)
+        line, = self.export(self.staff, format='ndjson').splitlines()
+        row = json.loads(line)
+        api_row = self.client.get(reverse('issue-detail', args=[issue.pk])).data
+        self.assertEqual(row['created_at'], api_row['created_at'])
+        self.assertEqual(row['department_code'], 'DCS')
+        self.assertIsNone(row['assigned_to_id'])
+
+    def test_unknown_format_is_rejected(self):
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(reverse('issue-export'), {'format': 'xml'}).status_code, 404)
+
+
+class IssueSearchTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        self.hit, self.weaker, self.miss = (
+            Issue.objects.create(
+                student=self.student, course=self.course, issue_type='Appeals',
+                title=title, description=description,
+            )
+            for title, description in [
+                ('Coursework marks missing', 'My coursework marks are not on the portal'),
+                ('Exam regrade', 'Please review the coursework component of my exam'),
+                ('Wrong grade', 'The final grade is incorrect'),
+            ]
+        )
+        self.client.force_authenticate(self.student)
+
+    def search(self, q):
+        response = self.client.get(reverse('issue-search'), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data]
+
+    def test_results_are_ranked(self):
+        self.assertEqual(self.search('coursework'), [self.hit.pk, self.weaker.pk])
+        self.assertEqual(self.search('grade incorrect'), [self.miss.pk])
+
+    def test_prefix_and_punctuation(self):
+        self.assertEqual(self.search('"portal'), [self.hit.pk])
+        self.assertEqual(self.search('course'), [self.hit.pk, self.weaker.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.miss.description = 'Coursework was never graded'
+        self.miss.save()
+        self.assertIn(self.miss.pk, self.search('coursework'))
+        self.hit.delete()
+        self.assertNotIn(self.hit.pk, self.search('coursework'))
+
+    def test_search_is_scoped_to_the_owner(self):
+        other = User.objects.create_user(email='other@example.com', password='pass')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.search('coursework'), [])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get(reverse('issue-search'), {'q': '  '}).status_code, 400)
+
+
+class MetricsTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_server_timing_header_counts_queries(self):
+        self.client.force_authenticate(self.staff)
+        self.make_issues(2)
+        response = self.client.get(reverse('issue-list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+    def test_prometheus_text_is_keyed_by_url_name(self):
+        self.client.force_authenticate(self.staff)
+        self.client.get(reverse('issue-list'))
+        self.client.get(reverse('issue-list'))
+        self.client.get('/no/such/page/')
+        self.client.force_login(self.staff)
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn(
+            'aits_http_request_duration_seconds_count{endpoint="issue-list",method="GET"} 2', body
+        )
+        self.assertIn('aits_db_queries_total{endpoint="issue-list",method="GET"} 2', body)
+        self.assertIn('endpoint="unmatched"', body)
+        self.assertIn('aits_catalog_cache_hits_total', body)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_need_staff_or_the_scrape_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        for token, expected in (('wrong', 403), ('scrape-secret', 200)):
+            response = self.client.get(reverse('metrics'), headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(response.status_code, expected)
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+
+class SparseFieldsetTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.staff)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        return response, ctx
+
+    def test_default_payload_is_unchanged(self):
+        self.make_issues(1, assigned_to=self.lecturer)
+        issue = self.client.get(reverse('issue-list')).data[0]
+        self.assertEqual(issue['student']['email'], self.student.email)
+        self.assertEqual(issue['course']['department'], self.department.pk)
+
+    def test_fields_select_columns_and_skip_joins(self):
+        self.make_issues(3, assigned_to=self.lecturer)
+        full, _ = self.get(reverse('issue-list'))
+        sparse, ctx = self.get(reverse('issue-list'), {'fields': 'id,title,status'})
+        self.assertEqual(sparse.status_code, 200)
+        self.assertEqual(set(sparse.data[0]), {'id', 'title', 'status'})
+        self.assertLess(len(sparse.content), len(full.content) / 4)
+        self.assertEqual(len(ctx), 1)
+        sql = ctx.captured_queries[0]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"description"', sql)
+
+    def test_expand_inlines_named_relations_only(self):
+        self.make_issues(1, assigned_to=self.lecturer)
+        response, ctx = self.get(reverse('issue-list'), {'expand': 'course.department'})
+        issue = response.data[0]
+        self.assertEqual(issue['student'], self.student.pk)
+        self.assertEqual(issue['assigned_to'], self.lecturer.pk)
+        self.assertEqual(issue['course']['course_code'], 'CS101')
+        self.assertEqual(issue['course']['department']['department_code'], 'DCS')
+        self.assertEqual(issue['course']['department']['college'], self.college.pk)
+        self.assertEqual(len(ctx), 1)
+        self.assertNotIn('users_user', ctx.captured_queries[0]['sql'])
+
+    def test_unknown_names_are_rejected(self):
+        self.assertEqual(self.client.get(reverse('issue-list'), {'fields': 'id,secret'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('issue-list'), {'expand': 'title'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('department-list'), {'expand': 'nope'}).status_code, 400)
+
+    def test_sparse_pages_and_retrieve_stay_single_query(self):
+        self.make_issues(5)
+        response, ctx = self.get(reverse('issue-list'), {'fields': 'id', 'page_size': 2})
+        self.assertEqual(len(ctx), 1)
+        response, ctx = self.get(
+            reverse('issue-list'), {'fields': 'id', 'page_size': 2, 'cursor': response.data['next_cursor']}
+        )
+        self.assertEqual(len(ctx), 1)
+        self.assertEqual(len(response.data['results']), 2)
+
+        issue = Issue.objects.first()
+        self.client.force_authenticate(self.student)
+        response, ctx = self.get(reverse('issue-detail', args=[issue.pk]), {'fields': 'id,title'})
+        self.assertEqual(response.data, {'id': issue.pk, 'title': issue.title})
+        self.assertEqual(len(ctx), 1)
+
+    def test_catalog_and_user_lists(self):
+        departments = self.client.get(reverse('department-list'), {'expand': ''})
+        self.assertEqual(departments.json()[0]['college'], self.college.pk)
+        # Each selection is cached separately from the default body
+        self.assertEqual(
+            self.client.get(reverse('department-list')).json()[0]['college']['code'], 'SCI'
+        )
+        courses = self.client.get(reverse('course-list'), {'fields': 'course_code', 'expand': 'department'})
+        self.assertEqual(courses.json(), [{'course_code': 'CS101'}])
+
+        users, ctx = self.get(reverse('user-list'), {'fields': 'id,email', 'expand': 'college'})
+        self.assertEqual(set(users.data[0]), {'id', 'email'})
+        self.assertEqual(len(ctx), 1)
+        student = next(
+            user for user in self.client.get(reverse('user-list'), {'expand': 'college'}).data
+            if user['id'] == self.student.pk
+        )
+        self.assertEqual(student['college']['code'], 'SCI')
+
+
+class ProjectionTests(CatalogMixin, APITestCase):
+    def assertRendersLikeSerializer(self, queryset, serializer_class, **fieldset):
+        projection = project(serializer_class, **fieldset)
+        self.assertIsNotNone(projection)
+        expected = JSONRenderer().render(serializer_class(queryset, many=True, **fieldset).data)
+        self.assertEqual(projection.render_json(projection.values_list(queryset)), expected)
+
+    def test_output_matches_the_serializers(self):
+        self.make_issues(2)
+        self.make_issues(1, assigned_to=self.lecturer)
+        issues = Issue.objects.order_by('pk')
+        self.assertRendersLikeSerializer(issues, IssueSerializer)
+        self.assertRendersLikeSerializer(issues, IssueSerializer, expand=frozenset())
+        self.assertRendersLikeSerializer(
+            issues, IssueSerializer,
+            fields=frozenset({'id', 'course', 'assigned_to'}),
+            expand=frozenset({'course.department.college', 'assigned_to.college'}),
+        )
+        self.assertRendersLikeSerializer(User.objects.order_by('pk'), UserSerializer)
+        self.assertRendersLikeSerializer(Course.objects.all(), CourseSerializer)
+        self.assertRendersLikeSerializer(Department.objects.all(), DepartmentSerializer)
+        self.assertRendersLikeSerializer(College.objects.all(), CollegeSerializer)
+
+    def test_datetimes_follow_the_current_timezone(self):
+        self.make_issues(1)
+        with timezone.override('Africa/Kampala'):
+            self.assertRendersLikeSerializer(Issue.objects.all(), IssueSerializer)
+
+    def test_uncompilable_serializers_fall_back(self):
+        class TitledIssueSerializer(IssueSerializer):
+            shout = serializers.SerializerMethodField()
+
+            class Meta(IssueSerializer.Meta):
+                fields = ['id', 'shout']
+
+            def get_shout(self, obj):
+                return obj.title.upper()
+
+        self.make_issues(1)
+        self.assertIsNone(project(TitledIssueSerializer))
+        rows, render = list_source(Issue.objects.all(), TitledIssueSerializer)
+        self.assertEqual(render(rows)[0]['shout'], 'ISSUE 0')
+
+    def test_list_endpoints_serve_projected_rows(self):
+        self.make_issues(3, assigned_to=self.lecturer)
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('issue-list'), {'page_size': 2})
+        expected = IssueSerializer(Issue.objects.order_by('-created_at', '-id'), many=True).data
+        self.assertEqual(response.json()['results'], expected[:2])
+        response = self.client.get(reverse('issue-list'), {'cursor': response.data['next_cursor']})
+        self.assertEqual(response.json()['results'], expected[2:])
+        response = self.client.get(reverse('user-list'))
+        self.assertEqual(response.json(), UserSerializer(User.objects.order_by('pk'), many=True).data)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTests(CatalogMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def route(self, method, name, token='a', write=False):
+        """
+        Run a request through ReplicaRoutingMiddleware and return the alias
+        the router picked for a read inside the view.
+        """
+        seen = {}
+
+        def view(request):
+            middleware.process_view(request, None, (), {})
+            if write:
+                router.db_for_write(Issue)
+            seen['read'] = router.db_for_read(Issue)
+            with db_router.primary():
+                seen['primary'] = router.db_for_read(Issue)
+            return HttpResponse()
+
+        request = self.factory.generic(method, reverse(name), headers={'Authorization': f'Bearer {token}'})
+        request.resolver_match = resolve(request.path_info)
+        middleware = db_router.ReplicaRoutingMiddleware(view)
+        middleware(request)
+        self.assertEqual(seen['primary'], 'default')
+        return seen['read']
+
+    def test_safe_reads_of_listed_routes_use_a_replica(self):
+        self.assertEqual(self.route('GET', 'issue-list'), 'replica1')
+        self.assertEqual(self.route('GET', 'college_list'), 'replica1')
+        self.assertEqual(self.route('GET', 'user-list'), 'replica1')
+
+    def test_other_requests_read_the_primary(self):
+        self.assertEqual(self.route('POST', 'issue-list'), 'default')
+        self.assertEqual(self.route('GET', 'admin_dashboard'), 'default')
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.route('GET', 'issue-list'), 'default')
+
+    def test_writers_read_their_writes(self):
+        # The rest of the writing request reads from the primary...
+        self.assertEqual(self.route('POST', 'issue-list', write=True), 'default')
+        # ...and so does that client for a while, unlike others
+        self.assertEqual(self.route('GET', 'issue-list'), 'default')
+        self.assertEqual(self.route('GET', 'issue-list', token='b'), 'replica1')
+
+    def test_outside_requests_everything_uses_the_primary(self):
+        self.assertEqual(router.db_for_read(Issue), 'default')
+        self.assertEqual(router.db_for_write(Issue), 'default')
+        self.assertFalse(router.allow_migrate('replica1', 'api'))
+
+
+# Outside a test transaction, which would hold the source locked for the copy
+class SyncReplicasTests(TransactionTestCase):
+    def test_copies_the_primary(self):
+        College.objects.create(name='Science', code='SCI')
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'replica.sqlite3'
+            copy_database(connection, path)
+            with closing(sqlite3.connect(path)) as replica:
+                self.assertEqual(replica.execute('SELECT code FROM api_college').fetchall(), [('SCI',)])
+
+
+class SqliteProfileTests(TestCase):
+    def pragmas(self, name):
+        """
+        Open a connection to database `name` and read back the profile's pragmas.
+        """
+        wrapper = type(connections['default'])({**connection.settings_dict, 'NAME': name}, 'profile-test')
+        try:
+            with wrapper.cursor() as cursor:
+                return {
+                    pragma: cursor.execute(f'PRAGMA {pragma}').fetchone()[0]
+                    for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size')
+                }
+        finally:
+            wrapper.close()
+
+    def test_off_by_default(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pragmas = self.pragmas(str(Path(directory) / 'db.sqlite3'))
+        self.assertEqual(pragmas['journal_mode'], 'delete')
+        self.assertNotEqual(pragmas['cache_size'], sqlite_profile.PRAGMAS['cache_size'])
+
+    @override_settings(SQLITE_PROFILE=True)
+    def test_applied_to_new_connections(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pragmas = self.pragmas(str(Path(directory) / 'db.sqlite3'))
+        self.assertEqual(pragmas, {
+            'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+            'cache_size': sqlite_profile.PRAGMAS['cache_size'],
+        })
+        # In-memory databases keep their journal
+        self.assertEqual(self.pragmas(':memory:')['journal_mode'], 'memory')
+
+
+class JobQueueTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(self.staff)
+
+    def run_worker(self):
+        call_command('run_worker', once=True, stdout=StringIO())
+
+    def test_status_change_is_delivered_by_the_worker(self):
+        issue, = self.make_issues(1)
+        self.client.patch(reverse('issue-update-status', args=[issue.pk]), {'status': 'Solved'}, format='json')
+        # Nothing is sent inline
+        self.assertEqual(mail.outbox, [])
+        job = Job.objects.get()
+        self.assertEqual((job.kind, job.payload), ('issue.status_changed', {'issue_id': issue.pk, 'status': 'Solved'}))
+
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.student.email])
+        self.assertIn('Solved', mail.outbox[0].subject)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('done', 1))
+
+        # Re-sending the same status is not an event
+        self.client.patch(reverse('issue-update-status', args=[issue.pk]), {'status': 'Solved'}, format='json')
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_assignment_notifies_assignee_and_student(self):
+        issue, = self.make_issues(1)
+        self.client.post(reverse('issue-assign', args=[issue.pk]), {'user_id': self.lecturer.pk}, format='json')
+        self.run_worker()
+        self.assertEqual([message.to for message in mail.outbox], [[self.lecturer.email], [self.student.email]])
+
+    def test_bulk_queues_one_job_per_changed_issue(self):
+        solved, *pending = self.make_issues(3)
+        Issue.objects.filter(pk=solved.pk).update(status='Solved')
+        self.client.post(reverse('issue-bulk'), {
+            'ids': [issue.pk for issue in (solved, *pending)], 'action': 'update_status', 'status': 'Solved',
+        }, format='json')
+        self.assertEqual(
+            sorted(Job.objects.values_list('payload__issue_id', flat=True)),
+            sorted(issue.pk for issue in pending),
+        )
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        issue, = self.make_issues(1)
+        job = jobs.enqueue('issue.status_changed', {'issue_id': issue.pk, 'status': 'Solved'})
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('mail down')
+        ), self.assertLogs('api.jobs', 'WARNING'):
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertIn('mail down', job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=20))
+        # Not due yet
+        self.assertEqual(jobs.claim(10), [])
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('done', 2))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_jobs_give_up_after_max_attempts(self):
+        job = Job.objects.create(kind='issue.status_changed', payload={}, max_attempts=1)
+        with self.assertLogs('api.jobs', 'ERROR'):
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('KeyError', job.last_error)
+
+    def test_orphaned_jobs_are_reclaimed(self):
+        issue, = self.make_issues(1)
+        job = jobs.enqueue('issue.status_changed', {'issue_id': issue.pk, 'status': 'Solved'})
+        Job.objects.filter(pk=job.pk).update(status='running', locked_by='dead', locked_at=timezone.now())
+        self.assertEqual(jobs.claim(10), [])
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - jobs.LEASE * 2)
+        self.assertEqual([claimed.pk for claimed in jobs.claim(10)], [job.pk])
+
+
+class AsyncReadViewTests(CatalogMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.make_issues(3, assigned_to=self.lecturer)
+
+    def token(self, user):
+        return f'Bearer {AccessToken.for_user(user)}'
+
+    def assertSameResponse(self, view, url, params=None, user=None, **kwargs):
+        headers = {'Authorization': self.token(user)} if user else {}
+        expected = self.client.get(url, params or {}, headers=headers)
+        actual = async_to_sync(view)(self.factory.get(url, params or {}, headers=headers), **kwargs)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        self.assertEqual(actual['Content-Type'], expected['Content-Type'])
+        return actual
+
+    def test_catalog_lists_match_sync_views(self):
+        for name, view in (
+            ('college_list', async_views.college_list),
+            ('department-list', async_views.department_list),
+            ('course-list', async_views.course_list),
+        ):
+            for params in (None, {'page_size': 1}, {'fields': 'id', 'expand': ''}):
+                self.assertSameResponse(view, reverse(name), params)
+            self.assertSameResponse(view, reverse(name), {'fields': 'nope'})
+
+    def test_catalog_cache_is_shared_with_sync_views(self):
+        etag = self.client.get(reverse('course-list'))['ETag']
+        request = self.factory.get(reverse('course-list'), headers={'If-None-Match': etag})
+        with self.assertNumQueries(1):
+            response = async_to_sync(async_views.course_list)(request)
+        self.assertEqual(response.status_code, 304)
+
+    def test_issue_list_and_detail_match_sync_views(self):
+        issue = Issue.objects.first()
+        for user in (self.staff, self.student, self.lecturer):
+            self.assertSameResponse(async_views.issue_list, reverse('issue-list'), user=user)
+            self.assertSameResponse(async_views.issue_list, reverse('issue-list'), {'page_size': 2}, user=user)
+            self.assertSameResponse(
+                async_views.issue_list, reverse('issue-list'),
+                {'status': 'Pending', 'ordering': 'created_at', 'page_size': 2}, user=user,
+            )
+            self.assertSameResponse(async_views.issue_list, reverse('issue-list'), {'status': 'Closed'}, user=user)
+            self.assertSameResponse(
+                async_views.issue_detail, reverse('issue-detail', args=[issue.pk]),
+                {'fields': 'id,title', 'expand': 'course'}, user=user, pk=str(issue.pk),
+            )
+        self.assertSameResponse(
+            async_views.issue_detail, reverse('issue-detail', args=['x']), user=self.staff, pk='x'
+        )
+
+    @override_settings(UNPAGINATED_LIST_LIMIT=2)
+    def test_unpaginated_cap_matches_sync_views(self):
+        response = self.assertSameResponse(async_views.issue_list, reverse('issue-list'), user=self.staff)
+        self.assertEqual(response.status_code, 400)
+        Course.objects.create(course_name='Algorithms', course_code='CS201', department=self.department)
+        self.assertSameResponse(async_views.course_list, reverse('course-list'))
+        Course.objects.create(course_name='Databases', course_code='CS202', department=self.department)
+        cache.clear()
+        response = self.assertSameResponse(async_views.course_list, reverse('course-list'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_authentication_errors_match_sync_views(self):
+        self.assertSameResponse(async_views.issue_list, reverse('issue-list'))
+        response = async_to_sync(async_views.issue_list)(
+            self.factory.get(reverse('issue-list'), headers={'Authorization': 'Bearer junk'})
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer realm="api"')
+
+    def test_user_info_matches_sync_view(self):
+        self.assertSameResponse(user_async_views.user_info, reverse('user_info'), user=self.student)
+
+    @override_settings(ASYNC_READ_VIEWS=True)
+    def test_read_view_sends_writes_to_the_sync_view(self):
+        view = read_view(CollegeListView.as_view(), async_views.college_list)
+        self.assertTrue(iscoroutinefunction(view))
+        request = self.factory.post(
+            reverse('college_list'), {'name': 'College of Law', 'code': 'LAW'}, content_type='application/json'
+        )
+        response = async_to_sync(view)(request)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(College.objects.filter(code='LAW').exists())
+
+    def test_metrics_middleware_counts_async_queries(self):
+        async def get_response(request):
+            await Issue.objects.acount()
+            return HttpResponse()
+
+        middleware = metrics.MetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(self.factory.get('/'))
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
@@ -1,16 +1,21 @@
 # backend/api/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
+from .async_views import read_view, route_reads
 from .views import (
     # StudentDashboardView, 
     # LecturerDashboardView, 
-    # AdminDashboardView,
+    AdminDashboardView,
     CollegeListView,
     CollegeCreateView,
     DepartmentCreateView,
     DepartmentListView,
     CourseListView,
     CourseCreateView,
+    CatalogCacheStatsView,
+    ResolutionTimesView,
+    AgingReportView,
     IssueViewSet,
     IssueCreateView,
 )
@@ -22,15 +27,24 @@ router.register(r'issues', IssueViewSet, basename='issue')
 urlpatterns = [
     # path('dashboard/student/', StudentDashboardView.as_view(), name='student_dashboard'),
     # path('dashboard/lecturer/', LecturerDashboardView.as_view(), name='lecturer_dashboard'),
-    # path('dashboard/admin/', AdminDashboardView.as_view(), name='admin_dashboard'),
-    path('college/', CollegeListView.as_view(), name='college_list'),  
+    path('dashboard/admin/', AdminDashboardView.as_view(), name='admin_dashboard'),
+    path('college/', read_view(CollegeListView.as_view(), async_views.college_list), name='college_list'),  
     path('admin/api/college/add/', CollegeCreateView.as_view(), name='college-add'),
-    path('department/', DepartmentListView.as_view(), name='department-list'),
+    path('department/', read_view(DepartmentListView.as_view(), async_views.department_list), name='department-list'),
     path('admin/api/department/add/', DepartmentCreateView.as_view(), name='department-add'),
-    path('course/', CourseListView.as_view(), name='course-list'),
+    path('course/', read_view(CourseListView.as_view(), async_views.course_list), name='course-list'),
     path('admin/api/course/add/', CourseCreateView.as_view(), name='course-add'),
+    path('catalog/cache-stats/', CatalogCacheStatsView.as_view(), name='catalog-cache-stats'),
     path('admin/api/issue/add/', IssueCreateView.as_view(), name='issue-add'),
+    path('stats/resolution-times/', ResolutionTimesView.as_view(), name='resolution-times'),
+    path('stats/aging/', AgingReportView.as_view(), name='issue-aging'),
     
+    # Before the router, whose detail route would take "stream" for a pk
+    path('issues/stream/', async_views.issue_stream, name='issue-stream'),
+
     # Include the router URLs
-    path('', include(router.urls)),
+    path('', include(route_reads(router.urls, {
+        'issue-list': async_views.issue_list,
+        'issue-detail': async_views.issue_detail,
+    }))),
 ]
\ No newline at end of file
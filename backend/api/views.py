@@ -3,18 +3,36 @@ from rest_framework import status, permissions, viewsets
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import College, Department, Course, Issue
-from .serializers import CollegeSerializer, DepartmentSerializer, CourseSerializer, IssueSerializer, IssueCreateSerializer
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from .models import College, Department, Course, Issue, IssueChange, IssueDurationStat
+from .serializers import (
+    CollegeSerializer, DepartmentSerializer, CourseSerializer, IssueSerializer, IssueCreateSerializer,
+    IssueBulkActionSerializer, IssueChangesSerializer, AdminDashboardSerializer,
+)
+from . import aging, events, jobs, stats
+from . import changes as change_feed
+from .export import export_response
+from .search import search_issues
+from .renderers import CSVRenderer, NDJSONRenderer
+from .fieldsets import SparseFieldsetMixin
+from .filters import IssueFilterBackend
+from .pagination import KeysetPagination, PagedKeysetPagination
+from .projection import ProjectedListMixin
+from .catalog_cache import CachedCatalogListMixin, get_stats as get_catalog_cache_stats
 from rest_framework.permissions import IsAdminUser, AllowAny
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 
-class CollegeListView(APIView):
+class CollegeListView(CachedCatalogListMixin, APIView):
     permission_classes = [AllowAny]
+    catalog_name = 'college'
+    keyset_ordering = ('name', 'id')
     
     def get(self, request):
         colleges = College.objects.all()
-        serializer = CollegeSerializer(colleges, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(colleges, CollegeSerializer)
 
     def post(self, request):
         serializer = CollegeSerializer(data=request.data)
@@ -34,13 +52,14 @@ class CollegeCreateView(APIView):
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
-class DepartmentListView(APIView):
+class DepartmentListView(CachedCatalogListMixin, APIView):
     permission_classes = [AllowAny]
+    catalog_name = 'department'
+    keyset_ordering = ('department_name', 'id')
 
     def get(self, request):
         departments = Department.objects.all()
-        serializer = DepartmentSerializer(departments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(departments, DepartmentSerializer)
 
     def post(self, request):
         serializer = DepartmentSerializer(data=request.data)
@@ -59,13 +78,14 @@ class DepartmentCreateView(APIView):
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
     
-class CourseListView(APIView):
+class CourseListView(CachedCatalogListMixin, APIView):
     permission_classes = [AllowAny]
+    catalog_name = 'course'
+    keyset_ordering = ('course_name', 'id')
     
     def get(self, request):
         courses = Course.objects.all()
-        serializer = CourseSerializer(courses, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(courses, CourseSerializer)
     
     def post(self, request):
         serializer = CourseSerializer(data=request.data)
@@ -84,6 +104,69 @@ class CourseCreateView(APIView):
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
+class CatalogCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_catalog_cache_stats(), status=status.HTTP_200_OK)
+
+class ResolutionTimesView(APIView):
+    """
+    Issue duration percentiles per department or course (?by=), rolled up
+    from the issue event log: time from creation to Solved (the default
+    ?metric=resolution) or time spent in Pending or InProgress. Reads the
+    histograms kept by `manage.py rollup_issue_events`; as_of says when it
+    last caught up.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        by = request.query_params.get('by', 'department')
+        metric = request.query_params.get('metric', 'resolution')
+        errors = {}
+        if by not in ('department', 'course'):
+            errors['by'] = ['Must be "department" or "course".']
+        if metric not in dict(IssueDurationStat.METRIC_CHOICES):
+            errors['metric'] = [f'Must be one of: {", ".join(dict(IssueDurationStat.METRIC_CHOICES))}.']
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'by': by,
+            'metric': metric,
+            'unit': 'seconds',
+            'as_of': events.as_of(),
+            'results': events.duration_percentiles(by, metric),
+        })
+
+
+class AgingReportView(APIView):
+    """
+    Unsolved issues per department or course (?by=): how many are open and
+    how many have been open for over 7, 14 and 30 days, optionally for one
+    ?status=. Reads the counters kept by `manage.py refresh_aging`; as_of
+    says when they were last refreshed.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        by = request.query_params.get('by', 'department')
+        issue_status = request.query_params.get('status')
+        errors = {}
+        if by not in ('department', 'course'):
+            errors['by'] = ['Must be "department" or "course".']
+        if issue_status is not None and issue_status not in aging.OPEN_STATUSES:
+            errors['status'] = [f'Must be one of: {", ".join(aging.OPEN_STATUSES)}.']
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'by': by,
+            'status': issue_status,
+            'as_of': aging.as_of(),
+            'results': aging.report(by, issue_status),
+        })
+
 class IsOwnerOrStaff(permissions.BasePermission):
     """
     Custom permission to only allow owners of an object or staff to access it.
@@ -93,8 +176,39 @@ class IsOwnerOrStaff(permissions.BasePermission):
         if request.user.is_staff:
             return True
         
-        # Check if the object has a student attribute and it matches the request user
-        return hasattr(obj, 'student') and obj.student == request.user
+        # Check if the object has a student attribute and it matches the request user.
+        # Compare ids so the check doesn't need the student row loaded.
+        return hasattr(obj, 'student_id') and obj.student_id == request.user.pk
+
+def visible_issues(user):
+    """
+    The issues `user` may see: all of them for staff, otherwise only their own.
+    """
+    if user.is_staff:
+        return Issue.objects.all()
+    return Issue.objects.filter(student=user)
+
+
+def visible_changes(user):
+    """
+    The IssueChange rows of the issues visible_issues(user) covers.
+    """
+    if user.is_staff:
+        return IssueChange.objects.all()
+    return IssueChange.objects.filter(student=user)
+
+
+def work_queue(user):
+    """
+    The issues waiting on `user`: those assigned to a lecturer, or every
+    issue on the courses of an HOD's department. None for anyone else.
+    """
+    if user.is_lecturer():
+        return Issue.objects.filter(assigned_to=user)
+    if user.is_hod() and user.department_id is not None:
+        # One join on the course's department_id index
+        return Issue.objects.filter(course__department_id=user.department_id)
+    return None
 
 class IssueCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -106,22 +220,38 @@ class IssueCreateView(APIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(SparseFieldsetMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing issues.
     """
     serializer_class = IssueSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrStaff]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    # ?ordering= choices, both walks of issue_created_idx
+    keyset_orderings = {
+        '-created_at': ('-created_at', '-id'),
+        'created_at': ('created_at', 'id'),
+    }
+    filter_backends = [IssueFilterBackend]
     
+    def scoped_queryset(self):
+        if self.action == 'queue':
+            queue = work_queue(self.request.user)
+            if queue is None:
+                raise PermissionDenied("Only lecturers and heads of department have a work queue")
+            return queue
+        return visible_issues(self.request.user)
+
     def get_queryset(self):
         """
         This view should return a list of all issues for the currently authenticated user,
         or all issues for staff users.
         """
-        user = self.request.user
-        if user.is_staff:
-            return Issue.objects.all()
-        return Issue.objects.filter(student=user)
+        # Join and load exactly what IssueSerializer renders for the
+        # requested fieldset, so the query count doesn't grow with the
+        # number of rows. IsOwnerOrStaff reads student_id.
+        return self.plan_fieldset(self.scoped_queryset(), IssueSerializer, always=['student'])
     
     def get_serializer_class(self):
         """
@@ -130,7 +260,17 @@ class IssueViewSet(viewsets.ModelViewSet):
         if self.action == 'create':
             return IssueCreateSerializer
         return IssueSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        if self.get_serializer_class() is IssueSerializer:
+            kwargs.update(self.fieldset_options())
+        return super().get_serializer(*args, **kwargs)
     
+    def perform_update(self, serializer):
+        # The event log entry commits with the change
+        with transaction.atomic():
+            serializer.save()
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
@@ -161,8 +301,13 @@ class IssueViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        changed = issue.status != new_status
         issue.status = new_status
-        issue.save()
+        # The notification is queued in the same transaction as the change
+        with transaction.atomic(savepoint=False):
+            issue.save(update_fields=['status', 'updated_at'])
+            if changed:
+                jobs.enqueue('issue.status_changed', {'issue_id': issue.pk, 'status': new_status})
         serializer = self.get_serializer(issue)
         return Response(serializer.data)
 
@@ -201,9 +346,13 @@ class IssueViewSet(viewsets.ModelViewSet):
                 )
             
             # Assign the issue
+            changed = issue.assigned_to_id != assigned_user.pk
             issue.assigned_to = assigned_user
             issue.status = 'InProgress'  # Update status to in progress
-            issue.save()
+            with transaction.atomic(savepoint=False):
+                issue.save(update_fields=['assigned_to', 'status', 'updated_at'])
+                if changed:
+                    jobs.enqueue('issue.assigned', {'issue_id': issue.pk, 'assigned_to_id': assigned_user.pk})
             
             serializer = self.get_serializer(issue)
             return Response(serializer.data)
@@ -219,6 +368,149 @@ class IssueViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream every visible issue as CSV (default) or NDJSON in constant memory.
+        Unknown formats are rejected by content negotiation.
+        """
+        export_format = request.accepted_renderer.format
+        return export_response(self.scoped_queryset(), export_format)
+
+    @action(detail=False, methods=['get'], pagination_class=PagedKeysetPagination)
+    def queue(self, request):
+        """
+        The requesting lecturer's or HOD's work queue (see work_queue) in
+        keyset pages, with the filters and ordering of the issue list, plus
+        per-status counts over the whole queue.
+        """
+        response = self.list(request)
+        counts = dict.fromkeys(dict(Issue.STATUS_CHOICES), 0)
+        counts.update(self.scoped_queryset().values_list('status').annotate(Count('pk')).order_by())
+        response.data['counts'] = counts
+        return response
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Issues created, updated or deleted since ?since=, the cursor from an
+        earlier call: the current version of each changed issue, in the
+        order they changed, the ids of deleted ones, and the cursor to send
+        next. `has_more` means the next page is ready now. Without ?since=
+        only the current cursor comes back; take it before a full fetch of
+        the issue list, then poll from it.
+        """
+        params = IssueChangesSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        cursor = params.validated_data.get('since')
+        if cursor is None:
+            return Response({'results': [], 'deleted': [], 'cursor': change_feed.latest(), 'has_more': False})
+
+        changed, cursor, has_more = change_feed.since(
+            visible_changes(request.user), cursor, self.paginator.get_page_size(request)
+        )
+        live = [issue_id for issue_id, deleted in changed.items() if not deleted]
+        issues = {issue.pk: issue for issue in self.get_queryset().filter(pk__in=live)}
+        # An issue deleted since its row was read is left out; its
+        # tombstone comes with the next call
+        serializer = self.get_serializer([issues[pk] for pk in live if pk in issues], many=True)
+        return Response({
+            'results': serializer.data,
+            'deleted': [issue_id for issue_id, deleted in changed.items() if deleted],
+            'cursor': cursor,
+            'has_more': has_more,
+        })
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over title and description, within the
+        issues the user can see.
+        """
+        queryset = search_issues(self.get_queryset(), request.query_params.get('q', ''))
+        if queryset is None:
+            return Response(
+                {"detail": "A search query 'q' is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            limit = 20
+        serializer = self.get_serializer(queryset[:limit], many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Assign or re-status many issues at once.
+        Applies one set-based UPDATE in a single transaction and reports
+        the outcome for every requested id.
+        """
+        if not request.user.is_staff:
+            return Response(
+                {"detail": "You do not have permission to perform this action."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = IssueBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if data['action'] == 'assign':
+            changes = {'assigned_to': data['assignee'], 'status': 'InProgress'}
+            # Notify on the field the action is about
+            event, watched, target = 'issue.assigned', 'assigned_to_id', data['assignee'].pk
+        else:
+            changes = {'status': data['status']}
+            event, watched, target = 'issue.status_changed', 'status', data['status']
+        # QuerySet.update() skips auto_now, so stamp it explicitly
+        changes['updated_at'] = timezone.now()
+
+        with transaction.atomic():
+            # Locked, so a concurrent change can't move the rows out of the
+            # buckets they are counted out of here
+            rows = list(
+                Issue.objects.filter(pk__in=data['ids']).select_for_update()
+                .values('pk', 'status', 'assigned_to_id', 'course_id', 'created_at', 'student_id')
+            )
+            current = {row['pk']: row[watched] for row in rows}
+            found = set(current)
+            # The UPDATE sends no signals, so move the dashboard counters,
+            # log the transitions and feed the change feed here
+            stats.move_issues_to_status(found, changes['status'])
+            events.record_bulk(
+                rows, changes['status'], changes.get('assigned_to') and changes['assigned_to'].pk,
+                at=changes['updated_at'],
+            )
+            updated = Issue.objects.filter(pk__in=found).update(**changes)
+            change_feed.record_many(rows)
+            jobs.enqueue_many(event, [
+                {'issue_id': issue_id, watched: target}
+                for issue_id, value in current.items() if value != target
+            ])
+
+        results = [
+            {"id": issue_id, "result": "updated" if issue_id in found else "not_found"}
+            for issue_id in data['ids']
+        ]
+        return Response({"updated": updated, "results": results})
+
+
+class AdminDashboardView(APIView):
+    """
+    Live issue and user counts, read from the incrementally maintained
+    summary tables in api.stats.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not (request.user.is_staff or request.user.is_admin()):
+            return Response({"error": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = AdminDashboardSerializer(stats.dashboard())
+        return Response(serializer.data)
+
 
 # class StudentDashboardView(APIView):
 #     permission_classes = [permissions.IsAuthenticated]
@@ -268,35 +560,3 @@ class IssueViewSet(viewsets.ModelViewSet):
 #             ]
 #         }
 #         return Response(data)
-
-# class AdminDashboardView(APIView):
-#     permission_classes = [permissions.IsAuthenticated]
-    
-#     def get(self, request):
-#         if not request.user.is_admin():
-#             return Response({"error": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
-        
-#         # Mock data for admin dashboard
-#         data = {
-#             "users": {
-#                 "total": 540,
-#                 "students": 500,
-#                 "lecturers": 35,
-#                 "admins": 5
-#             },
-#             "courses": {
-#                 "active": 42,
-#                 "archived": 15
-#             },
-#             "system_health": {
-#                 "status": "Good",
-#                 "uptime": "99.8%",
-#                 "recent_issues": []
-#             },
-#             "recent_activities": [
-#                 {"id": 1, "type": "User Registration", "details": "5 new users registered", "date": "2025-03-08"},
-#                 {"id": 2, "type": "Course Created", "details": "New course: Machine Learning", "date": "2025-03-07"},
-#                 {"id": 3, "type": "Grade Update", "details": "Introduction to Programming grades posted", "date": "2025-03-06"}
-#             ]
-#         }
-#         return Response(data)
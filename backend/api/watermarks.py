@@ -0,0 +1,60 @@
+"""
+How far a reader following an autoincrement id may safely go.
+
+The event rollup (api.events), the change feed (api.changes) and the event
+log bus (api.push) each keep the highest id they have read and next read
+the rows past it. That only works if no row can turn up below an id a
+reader has already passed.
+
+SQLite lets one writer at a time hold the database until it commits, so
+rows commit in id order there. Other databases (PostgreSQL) let writers
+draw ids and commit in any order: a transaction holding id N can commit
+after N + 1 has been read. There, readers stop at settled(): the highest id
+of a row created at least settings.COMMIT_SETTLE_SECONDS ago. Whichever
+transaction drew a lower id inserted its row before that one, so it has
+been open for longer than this application's writes take, and has
+committed or rolled back. Newer rows wait for a later read.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+def commits_in_id_order(using):
+    return connections[using].vendor == 'sqlite'
+
+
+def settled(queryset, created_field):
+    """
+    The highest pk of `queryset` a reader may go up to, or None if rows
+    commit in id order and it may go up to the last one.
+    """
+    if commits_in_id_order(queryset.db):
+        return None
+    cutoff = timezone.now() - timedelta(seconds=settings.COMMIT_SETTLE_SECONDS)
+    # Walks back from the newest row, over the last few seconds' rows only
+    return queryset.filter(**{f'{created_field}__lte': cutoff}).order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+
+
+async def asettled(queryset, created_field):
+    """
+    settled() for async code.
+    """
+    if commits_in_id_order(queryset.db):
+        return None
+    cutoff = timezone.now() - timedelta(seconds=settings.COMMIT_SETTLE_SECONDS)
+    return await queryset.filter(**{f'{created_field}__lte': cutoff}).order_by('-pk').values_list(
+        'pk', flat=True
+    ).afirst() or 0
+
+
+def up_to_settled(queryset, created_field):
+    """
+    `queryset` without the rows a reader may not go up to yet.
+    """
+    bound = settled(queryset, created_field)
+    return queryset if bound is None else queryset.filter(pk__lte=bound)
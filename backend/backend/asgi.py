@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Route the read endpoints to their async views (api.async_views)
+os.environ.setdefault('AITS_ASYNC_READ_VIEWS', '1')
+# Requests don't reuse threads here, so a persistent connection would never
+# be reused either
+os.environ.setdefault('AITS_DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -32,6 +32,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'api.metrics.MetricsMiddleware',
+    'api.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -68,9 +71,38 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests (backend/asgi.py sets 0:
+        # under ASGI every request runs in a new thread)
+        'CONN_MAX_AGE': int(os.environ.get('AITS_DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Opt-in production tuning for SQLite: WAL, pragmas and BEGIN IMMEDIATE for
+# write transactions (see api.sqlite_profile)
+SQLITE_PROFILE = os.environ.get('AITS_SQLITE_PROFILE') == '1'
+if SQLITE_PROFILE:
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE'}
+
+# Read replicas (api.db_router). AITS_DB_REPLICAS is a comma separated list
+# of SQLite files standing in for replicas locally; `manage.py sync_replicas`
+# copies the primary into them. Tests read them through `default`.
+DATABASE_REPLICAS = []
+for number, path in enumerate(filter(None, os.environ.get('AITS_DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path.strip(),
+        'OPTIONS': {'init_command': 'PRAGMA query_only = 1'},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+
+# After a write, a client reads from the primary for this long, which must
+# cover the replicas' lag
+REPLICA_PIN_SECONDS = 10
+
 # django.contrib.sites
 SITE_ID = 1
 
@@ -80,7 +112,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.TokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -88,6 +120,17 @@ REST_FRAMEWORK = {
     ],
 }
 
+# List endpoints (api.pagination.KeysetPagination). A list requested without
+# ?cursor= or ?page_size= comes back whole. Set this to refuse lists longer
+# than that many rows, so they have to be read in pages; only once the
+# clients page (the frontend's dashboards still read whole lists).
+UNPAGINATED_LIST_LIMIT = (
+    int(os.environ['AITS_UNPAGINATED_LIST_LIMIT']) if os.environ.get('AITS_UNPAGINATED_LIST_LIMIT') else None
+)
+# Page every list, even when the client asks for neither. For clients that
+# follow cursors; the frontend still expects plain lists.
+PAGINATE_LISTS_BY_DEFAULT = os.environ.get('AITS_PAGINATE_LISTS') == '1'
+
 # JWT Settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -95,6 +138,33 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Serve the hot GET endpoints with async views (api.async_views).
+# backend/asgi.py turns this on; WSGI processes keep the sync DRF views.
+ASYNC_READ_VIEWS = os.environ.get('AITS_ASYNC_READ_VIEWS') == '1'
+
+# Bearer token a Prometheus scraper sends for /metrics (api.metrics). Without
+# it, only staff signed in to the admin can read the metrics.
+METRICS_TOKEN = os.environ.get('AITS_METRICS_TOKEN')
+
+# Readers that follow an autoincrement id (the event rollup, the change feed,
+# the event log bus) stay this far behind the newest rows on databases that
+# may commit them out of id order; see api.watermarks. SQLite doesn't.
+COMMIT_SETTLE_SECONDS = 5
+
+# Live issue updates over server-sent events (api.push)
+PUSH_BUS = os.environ.get('AITS_PUSH_BUS', 'api.push.LocalBus')
+# Messages a client may fall behind by before it is dropped
+PUSH_QUEUE_SIZE = 256
+# Comment lines sent on idle streams, so proxies keep them open
+PUSH_HEARTBEAT_SECONDS = 15
+# How often each process checks the event log (api.push.EventLogBus)
+PUSH_POLL_SECONDS = 1.0
+
+# Per-process cache of users resolved from access tokens
+# (users.authentication.CachedJWTAuthentication)
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60  # seconds
+
 # CORS settings
 # For development only - allows all origins (not recommended for production)
 CORS_ALLOW_ALL_ORIGINS = True
@@ -134,6 +204,11 @@ USE_TZ = True
 
 FRONTEND_URL = "http://localhost:5173"
 
+# Notification emails are sent by `manage.py run_worker` (api.jobs).
+# The console backend prints them; point this at SMTP in production.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'AITS <no-reply@aits.local>'
+
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = 'static/'
 
@@ -2,9 +2,11 @@
 # backend/backend/urls.py
 from django.contrib import admin
 from django.urls import path, include
+from api.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/users/', include('users.urls')),
     path('api/', include('api.urls')),
     path('', include('users.urls')),
@@ -0,0 +1,11 @@
+from api.async_views import api_view, authenticate, json_response
+from .serializers import UserSerializer
+
+
+@api_view
+async def user_info(request):
+    """
+    Async GET for UserInfoView (see api.async_views).
+    """
+    user = await authenticate(request)
+    return json_response(UserSerializer(user).data)
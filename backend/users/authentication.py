@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.db_router import primary
+
+
+class UserSnapshotCache:
+    """
+    Bounded per-process LRU cache of user rows with a TTL.
+
+    Stores column values rather than model instances, so every request gets
+    its own fresh User object. Entries are dropped on User save/delete and
+    again once the write commits (see users.signals); the TTL bounds how long another process can serve a row
+    it never saw change.
+    """
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            db, values = entry[1], entry[2]
+
+        from .models import User
+        return User.from_db(db, [field.attname for field in User._meta.concrete_fields], values)
+
+    def put(self, user):
+        values = [getattr(user, field.attname) for field in user._meta.concrete_fields]
+        with self._lock:
+            self._entries[str(user.pk)] = (time.monotonic() + self.ttl, user._state.db, values)
+            self._entries.move_to_end(str(user.pk))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+user_cache = UserSnapshotCache(
+    max_size=getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user from user_cache, so
+    authenticated requests skip the users_user lookup.
+    """
+    def get_user(self, validated_token):
+        user = user_cache.get(self.get_user_id(validated_token))
+        if user is None:
+            # Full lookup and checks, then remember the row. Read from the
+            # primary, so an account created moments ago is already there.
+            with primary():
+                user = super().get_user(validated_token)
+            user_cache.put(user)
+            return user
+        self.check_user(user, validated_token)
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        authenticate() for async views, looking the user up with the async ORM.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        # Decoding and verifying an access token doesn't touch the database
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                with primary():
+                    user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            self.check_user(user, validated_token)
+            user_cache.put(user)
+            return user
+        self.check_user(user, validated_token)
+        return user
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    @staticmethod
+    def check_user(user, validated_token):
+        # Same checks JWTAuthentication applies after its lookup
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.benchmarks import scratch_database
+from users.authentication import CachedJWTAuthentication, user_cache
+from users.models import User
+from users.views import UserInfoView
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/second of GET /users/me/ authenticated with a JWT, "
+        "with and without the per-process user cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--users', type=int, default=100, help="Distinct users cycling through the tokens")
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        with scratch_database():
+            User.objects.bulk_create(
+                User(email=f'bench-jwt-{i}@example.com', username=f'bench-jwt-{i}', password='!') for i in range(options['users'])
+            )
+            requests = [
+                factory.get('/users/me/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+                for user in User.objects.all()
+            ]
+
+            self.stdout.write(f"{'authentication':>24} {'req/s':>10} {'queries/req':>12}")
+            for label, auth_class in (
+                ('JWTAuthentication', JWTAuthentication),
+                ('CachedJWTAuthentication', CachedJWTAuthentication),
+            ):
+                user_cache.clear()
+                view = UserInfoView.as_view(authentication_classes=[auth_class])
+                count = options['requests']
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    for i in range(count):
+                        view(requests[i % len(requests)]).render()
+                    elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{label:>24} {count / elapsed:>10,.0f} {len(queries) / count:>12.2f}"
+                )
@@ -0,0 +1,153 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils.crypto import get_random_string
+
+from api import stats
+from api.management.commands.import_catalog import optional, parse_record, read_records, required
+from api.models import College, Department
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a roster (CSV or JSONL: email, password, first_name, last_name, phone, "
+        "role, college_code, department_code) and create the users in batches, hashing "
+        "passwords in a process pool. Emails that already exist are skipped, so the "
+        "command can be re-run on the same roster."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Override format detection by file extension")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help="Password hashing processes (0 hashes in this process)",
+        )
+
+    def handle(self, *args, **options):
+        path = options['roster']
+        # Codes resolved once instead of one query per row
+        self.college_ids = dict(College.objects.values_list('code', 'id'))
+        self.department_ids = dict(Department.objects.values_list('department_code', 'id'))
+        self.seen = set()
+        self.workers = options['workers']
+        self.created = self.skipped = self.errors = 0
+        rows = 0
+        batch = []
+        start = time.perf_counter()
+
+        pool = ProcessPoolExecutor(options['workers'], initializer=django.setup) if options['workers'] else None
+        try:
+            for line_num, record in read_records(path, options['format']):
+                rows += 1
+                try:
+                    user, password = self.build_user(parse_record(record))
+                    user.clean_fields(exclude=['password', 'college', 'department'])
+                except (ValueError, ValidationError) as exc:
+                    self.report(path, line_num, exc)
+                    continue
+                if user.email in self.seen:
+                    self.skipped += 1
+                    continue
+                self.seen.add(user.email)
+                batch.append((line_num, user, password))
+                if len(batch) >= options['batch_size']:
+                    self.flush(path, batch, pool)
+                    batch = []
+            if batch:
+                self.flush(path, batch, pool)
+        except (OSError, UnicodeDecodeError, csv.Error) as exc:
+            raise CommandError(f"{path}: {exc}")
+        finally:
+            if pool:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{rows} rows read, {self.created} created, {self.skipped} already present, {self.errors} rejected "
+            f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+        ))
+        if self.errors:
+            self.stderr.write(self.style.WARNING(f"Finished with {self.errors} rejected row(s)"))
+
+    def build_user(self, row):
+        email = User.objects.normalize_email(required(row, 'email'))
+        role = optional(row, 'role') or User.Role.STUDENT
+        college_code = optional(row, 'college_code')
+        department_code = optional(row, 'department_code')
+
+        # Same rules as RegistrationSerializer
+        if role == User.Role.HOD and not department_code:
+            raise ValueError("Department code is required for Head of Department users")
+        if college_code and college_code not in self.college_ids:
+            raise ValueError(f"Unknown college code {college_code!r}")
+        if role == User.Role.HOD and department_code not in self.department_ids:
+            raise ValueError(f"Unknown department code {department_code!r}")
+
+        user = User(
+            email=email,
+            username=email.split('@')[0] + get_random_string(length=8),
+            first_name=optional(row, 'first_name') or '',
+            last_name=optional(row, 'last_name') or '',
+            phone=optional(row, 'phone'),
+            role=role,
+            college_id=self.college_ids.get(college_code),
+            department_id=self.department_ids[department_code] if role == User.Role.HOD else None,
+            is_verified=True,
+        )
+        # No password leaves the account unusable until it is reset
+        return user, optional(row, 'password')
+
+    def flush(self, path, batch, pool):
+        existing = set(User.objects.filter(email__in=[user.email for _, user, _ in batch]).values_list('email', flat=True))
+        batch = [entry for entry in batch if entry[1].email not in existing]
+        self.skipped += len(existing)
+        passwords = [password for _, _, password in batch]
+        if pool:
+            hashes = pool.map(make_password, passwords, chunksize=max(len(passwords) // (self.workers * 4), 1))
+        else:
+            hashes = map(make_password, passwords)
+        for (_, user, _), hashed in zip(batch, hashes):
+            user.password = hashed
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user, _ in batch])
+                self.count_roles([user for _, user, _ in batch])
+            self.created += len(batch)
+        except DatabaseError:
+            # A unique clash, e.g. an email created since the check above.
+            # Retry row by row so only the offending rows are rejected.
+            for line_num, user, _ in batch:
+                try:
+                    with transaction.atomic():
+                        User.objects.bulk_create([user])
+                        self.count_roles([user])
+                    self.created += 1
+                except DatabaseError as exc:
+                    self.report(path, line_num, exc)
+
+    @staticmethod
+    def count_roles(users):
+        # bulk_create doesn't send post_save, so keep UserRoleStat in step here
+        roles = {}
+        for user in users:
+            roles[user.role] = roles.get(user.role, 0) + 1
+        for role, count in roles.items():
+            stats.move_user(None, role, count)
+
+    def report(self, path, line_num, exc):
+        self.errors += 1
+        if isinstance(exc, ValidationError):
+            exc = '; '.join(f"{field}: {', '.join(messages)}" for field, messages in exc.message_dict.items())
+        self.stderr.write(f"{path}:{line_num}: {exc}")
@@ -1,12 +1,14 @@
 # backend/users/serializers.py
 from rest_framework import serializers
+from api.fieldsets import DynamicFieldsMixin
 from .models import User
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'first_name', 'last_name', 'phone', 'role', 'college', 'is_verified']
         read_only_fields = ['is_verified']
+        expandable = {'college': 'api.serializers.CollegeSerializer'}
 
 class RegistrationSerializer(serializers.ModelSerializer):
     college_code = serializers.CharField(write_only=True, required=False, allow_blank=True)
@@ -0,0 +1,17 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    user_cache.invalidate(instance.pk)
+    # Until the write commits, other requests still read the old row and
+    # may cache it again
+    transaction.on_commit(partial(user_cache.invalidate, instance.pk), using=using)
@@ -1,3 +1,155 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.models import College, Department, UserRoleStat
+from .authentication import CachedJWTAuthentication, UserSnapshotCache, user_cache
+from .models import User
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = User.objects.create_user(
+            email='cached@example.com', password='pass12345', role=User.Role.STUDENT,
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+    def authenticate(self):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return CachedJWTAuthentication().authenticate(request)[0]
+
+    def test_repeat_requests_skip_user_lookup(self):
+        with self.assertNumQueries(1):
+            first = self.authenticate()
+        with self.assertNumQueries(0):
+            second = self.authenticate()
+        self.assertEqual(second.pk, self.user.pk)
+        self.assertEqual(second.email, self.user.email)
+        self.assertIsNot(first, second)
+        self.assertFalse(second._state.adding)
+
+    def test_saving_user_invalidates_entry(self):
+        self.authenticate()
+        self.user.role = User.Role.LECTURER
+        self.user.is_staff = True
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            user = self.authenticate()
+        self.assertEqual(user.role, User.Role.LECTURER)
+        self.assertTrue(user.is_staff)
+
+    def test_entry_cached_before_commit_is_dropped_on_commit(self):
+        stale = User.objects.get(pk=self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = User.Role.LECTURER
+            self.user.save()
+            # A concurrent request, which still sees the committed row
+            user_cache.put(stale)
+        self.assertIsNone(user_cache.get(self.user.pk))
+
+    def test_deactivated_user_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleted_user_rejected(self):
+        self.authenticate()
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_user_info_reflects_role_change(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(client.get(reverse('user_info')).data['role'], User.Role.STUDENT)
+        self.user.role = User.Role.HOD
+        self.user.save()
+        self.assertEqual(client.get(reverse('user_info')).data['role'], User.Role.HOD)
+
+
+class UserSnapshotCacheTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(email=f'u{i}@example.com') for i in range(3)]
+
+    def test_evicts_least_recently_used(self):
+        cache = UserSnapshotCache(max_size=2, ttl=60)
+        cache.put(self.users[0])
+        cache.put(self.users[1])
+        cache.get(self.users[0].pk)
+        cache.put(self.users[2])
+        self.assertIsNotNone(cache.get(self.users[0].pk))
+        self.assertIsNone(cache.get(self.users[1].pk))
+        self.assertIsNotNone(cache.get(self.users[2].pk))
+
+    def test_entries_expire(self):
+        cache = UserSnapshotCache(max_size=10, ttl=-1)
+        cache.put(self.users[0])
+        self.assertIsNone(cache.get(self.users[0].pk))
+
+
+class ProvisionUsersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.college = College.objects.create(name='College of Science', code='SCI')
+        cls.department = Department.objects.create(
+            department_name='Computer Science', department_code='DCS', college=cls.college
+        )
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.roster = Path(self.tmp.name) / 'roster.csv'
+        self.roster.write_text(
+            'email,password,first_name,last_name,phone,role,college_code,department_code\n'
+            'amy@example.com,secret-one,Amy,Okello,,STUDENT,SCI,\n'
+            'ben@example.com,,Ben,Mugisha,,LECTURER,SCI,\n'
+            'hod@example.com,secret-two,Hope,Nankya,,HOD,SCI,DCS\n'
+            'amy@example.com,other,Amy,Again,,STUDENT,SCI,\n'
+            'nodept@example.com,x,No,Dept,,HOD,SCI,\n'
+            'badcollege@example.com,x,Bad,College,,STUDENT,NOPE,\n'
+            'not-an-email,x,Bad,Email,,STUDENT,,\n'
+        )
+
+    def provision(self, **options):
+        out, err = StringIO(), StringIO()
+        call_command('provision_users', str(self.roster), stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_users_and_rejects_bad_rows(self):
+        out, err = self.provision(batch_size=2, workers=2)
+        self.assertIn('7 rows read, 3 created, 1 already present, 3 rejected', out)
+        self.assertIn('roster.csv:6:', err)
+        self.assertIn('roster.csv:7:', err)
+        self.assertIn('roster.csv:8:', err)
+
+        amy = User.objects.get(email='amy@example.com')
+        self.assertTrue(amy.check_password('secret-one'))
+        self.assertEqual(amy.first_name, 'Amy')
+        self.assertEqual(amy.college, self.college)
+        self.assertTrue(amy.is_verified)
+        self.assertFalse(User.objects.get(email='ben@example.com').has_usable_password())
+        self.assertEqual(User.objects.get(email='hod@example.com').department, self.department)
+
+        self.assertEqual(
+            dict(UserRoleStat.objects.values_list('role', 'count')),
+            {'STUDENT': 1, 'LECTURER': 1, 'HOD': 1},
+        )
 
-# Create your tests here.
+    def test_rerun_is_idempotent(self):
+        self.provision(workers=0)
+        out, _ = self.provision(workers=0)
+        self.assertIn('0 created, 4 already present', out)
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(sum(UserRoleStat.objects.values_list('count', flat=True)), 3)
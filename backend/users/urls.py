@@ -1,12 +1,14 @@
 # backend/users/urls.py
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from api.async_views import read_view
+from .async_views import user_info
 from .views import UserInfoView, RegistrationView, UserListView
 
 urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('me/', UserInfoView.as_view(), name='user_info'),
+    path('me/', read_view(UserInfoView.as_view(), user_info), name='user_info'),
     path('register/', RegistrationView.as_view(), name='user_register'),  
     path("users/", UserListView.as_view(), name="user-list"),
 ]
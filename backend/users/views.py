@@ -8,6 +8,9 @@ from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import NotFound
 
+from api.fieldsets import SparseFieldsetMixin
+from api.pagination import KeysetPagination
+from api.projection import ProjectedListMixin
 from .models import User
 from .serializers import UserSerializer, RegistrationSerializer
 
@@ -21,12 +24,18 @@ class UserInfoView(RetrieveAPIView):
             raise NotFound("User not found.")
         return user
 
-class UserListView(generics.ListAPIView):
+class UserListView(SparseFieldsetMixin, ProjectedListMixin, generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('id',)
 
     def get_queryset(self):
-        return User.objects.all()
+        return self.plan_fieldset(User.objects.all(), UserSerializer)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(self.fieldset_options())
+        return super().get_serializer(*args, **kwargs)
 
 class RegistrationView(APIView):
     permission_classes = [AllowAny]